@@ -34,92 +34,20 @@ import {
   Menu,
   X,
 } from "lucide-react";
-// --- Data imports (CSV files) ---
-import nifty50CSV from "./data/NIFTY50_Historical.csv?raw";
-import momentum50CSV from "./data/NIFTY500_MOMENTUM_50_Historical.csv?raw";
-import quality50CSV from "./data/NIFTY500_MULTICAP_MOMENTUM_QUALITY_50_Historical.csv?raw";
+// --- Precomputed data (written by src/data/export_dashboard.py) ---
+// Monthly series, fund metrics, rolling stats and the date-aligned strategy inputs.
+import dashboard from "./data/dashboard.json";
 
 // --- Helper & Calculation Functions ---
 
-const parseCSV = (csvText) => {
-  const lines = csvText
-    .split(/\r?\n/)
-    .map((l) => l.trim())
-    .filter((l) => l.length > 0);
-  if (lines.length === 0) return [];
-  const headers = lines[0].split(",").map((h) => h.trim());
-  return lines.slice(1).map((line) => {
-    const values = line.split(",");
-    const obj = {};
-    headers.forEach((header, i) => {
-      let value = values[i]?.trim();
-      if (header.toLowerCase().includes("date")) {
-        if (value) {
-          // Robust parse for formats like '01 Apr 2005'
-          const parts = value.split(" ");
-          if (parts.length === 3) {
-            const [ddStr, monStr, yyyyStr] = parts;
-            const day = Number(ddStr);
-            const monthNames = [
-              "Jan",
-              "Feb",
-              "Mar",
-              "Apr",
-              "May",
-              "Jun",
-              "Jul",
-              "Aug",
-              "Sep",
-              "Oct",
-              "Nov",
-              "Dec",
-            ];
-            const month = monthNames.findIndex(
-              (m) => m.toLowerCase() === monStr.toLowerCase()
-            );
-            const year = Number(yyyyStr);
-            value =
-              month >= 0 && Number.isFinite(day) && Number.isFinite(year)
-                ? new Date(year, month, day)
-                : new Date(value);
-          } else {
-            value = new Date(value);
-          }
-        } else {
-          value = undefined;
-        }
-      } else if (header.toLowerCase() === "close") {
-        value = value ? parseFloat(value) : undefined;
-      }
-      obj[header] = value;
-    });
-    return obj;
-  });
+// "YYYY-MM-DD" -> local Date at midnight, matching how the CSV dates used to be parsed
+const parseISODate = (value) => {
+  const [year, month, day] = value.split("-").map(Number);
+  return new Date(year, month - 1, day);
 };
 
-// Convert high-frequency series (daily) into monthly series.
-// Uses the last available close within each year-month and normalizes date to the 1st of that month.
-const resampleToMonthly = (rows) => {
-  if (!rows || rows.length === 0) return [];
-  const monthKeyToRecord = new Map();
-  for (const row of rows) {
-    const date = row.HistoricalDate;
-    const close = row.CLOSE;
-    if (!(date instanceof Date) || isNaN(date) || !isFinite(close)) continue;
-    const year = date.getFullYear();
-    const month = date.getMonth();
-    const key = `${year}-${month}`;
-    const time = date.getTime();
-    const prev = monthKeyToRecord.get(key);
-    if (!prev || time > prev.time) {
-      monthKeyToRecord.set(key, { year, month, time, close });
-    }
-  }
-  const monthly = Array.from(monthKeyToRecord.values())
-    .sort((a, b) => a.time - b.time)
-    .map((r) => ({ date: new Date(r.year, r.month + 1, 0), value: r.close }));
-  return monthly;
-};
+const toSeries = (dates, values) =>
+  dates.map((d, i) => ({ date: parseISODate(d), value: values[i] }));
 
 const downsampleData = (data, maxPoints = 200) => {
   if (data.length <= maxPoints) return data;
@@ -233,64 +161,28 @@ const App = () => {
 
   // --- Data Processing on Load ---
   useEffect(() => {
-    const niftyRaw = parseCSV(nifty50CSV);
-    const momentumRaw = parseCSV(momentum50CSV);
-    const qualityRaw = parseCSV(quality50CSV);
-
-    const processFund = (name, rawData) => {
-      // Resample to month-end values for consistency with existing calculations
-      const monthly = resampleToMonthly(rawData);
-      const data = monthly
-        .filter(
-          (d) => d.date instanceof Date && !isNaN(d.date) && isFinite(d.value)
-        )
-        .sort((a, b) => a.date.getTime() - b.date.getTime());
-      const sampled = downsampleData(data);
-      const metrics = calculateMetrics(data);
-      const rollingReturns = {
-        "3yr": calculateRollingReturns(data, 3),
-        "5yr": calculateRollingReturns(data, 5),
-        "10yr": calculateRollingReturns(data, 10),
+    // Fund series, metrics and rolling stats are precomputed; only rebuild Date objects
+    const funds = {};
+    for (const [key, fund] of Object.entries(dashboard.funds)) {
+      const data = toSeries(fund.dates, fund.values);
+      funds[key] = {
+        name: fund.name,
+        data,
+        sampled: downsampleData(data),
+        metrics: fund.metrics,
+        rollingReturns: fund.rollingReturns,
       };
-      return { name, data, sampled, metrics, rollingReturns };
-    };
-
-    const nifty = processFund("Nifty 50", niftyRaw);
-    const momentum = processFund("Momentum 50", momentumRaw);
-    const quality = processFund("Quality 50", qualityRaw);
-
-    setFundData({ nifty, momentum, quality });
+    }
+    setFundData(funds);
 
     // --- Backtesting Strategies ---
-    const allDates = [
-      ...new Set([
-        ...nifty.data.map((d) => d.date.getTime()),
-        ...momentum.data.map((d) => d.date.getTime()),
-        ...quality.data.map((d) => d.date.getTime()),
-      ]),
-    ].sort();
-    const combinedData = allDates
-      .map((time) => {
-        const date = new Date(time);
-        const findValue = (fund, d) => {
-          if (!fund || !fund.data || fund.data.length === 0) return null;
-          let record = fund.data.find(
-            (point) => point.date.getTime() === d.getTime()
-          );
-          if (record) return record.value;
-          let prev = fund.data.filter(
-            (point) => point.date.getTime() < d.getTime()
-          );
-          return prev.length > 0 ? prev[prev.length - 1].value : null;
-        };
-        return {
-          date,
-          Nifty: findValue(nifty, date),
-          Momentum: findValue(momentum, date),
-          Quality: findValue(quality, date),
-        };
-      })
-      .filter((d) => d.Nifty && d.Momentum && d.Quality);
+    const aligned = dashboard.aligned;
+    const combinedData = aligned.dates.map((d, i) => ({
+      date: parseISODate(d),
+      Nifty: aligned.Nifty[i],
+      Momentum: aligned.Momentum[i],
+      Quality: aligned.Quality[i],
+    }));
 
     if (combinedData.length === 0) {
       setStrategyData([]);
@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from price_series import PriceSeries
+
+
+# Merge-joins N date-sorted series onto one calendar. The per-date find/filter scan the
+# strategy code used is quadratic; here every input point is touched a constant number of
+# times: a stable sort of the concatenated (already sorted) ordinals is timsort merging S runs,
+# and the forward-fill is a running maximum over "last seen row" indices.
+
+UNION = 'union'
+INTERSECTION = 'intersection'
+
+
+@dataclass
+class AlignedPanel:
+    # values[t, j] is series names[j] on day ordinal ordinals[t]; NaN where it has no value
+    ordinals: np.ndarray
+    names: List[str]
+    values: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:, self.names.index(name)]
+
+    def dates(self) -> List[date]:
+        return [date.fromordinal(int(o)) for o in self.ordinals]
+
+
+def align_arrays(
+    columns: Sequence[Tuple[np.ndarray, np.ndarray]],
+    how: str = UNION,
+    forward_fill: bool = True,
+    drop_incomplete: bool = True,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # columns: (ordinals, values) per series, each sorted by ordinal; a repeated ordinal within
+    # a series keeps its last value. Returns (calendar ordinals, (T, S) value matrix).
+    #   how=UNION         every date any series has; INTERSECTION: dates all series have
+    #   forward_fill      carry each series' latest value onto later calendar dates
+    #   drop_incomplete   drop calendar rows where any series is still NaN (before it starts)
+    if how not in (UNION, INTERSECTION):
+        raise ValueError(f"how must be {UNION!r} or {INTERSECTION!r}, got {how!r}")
+    ordinal_cols = [np.asarray(o, dtype=np.int64) for o, _ in columns]
+    value_cols = [np.asarray(v, dtype=np.float64) for _, v in columns]
+    if not ordinal_cols:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0))
+    everything = np.concatenate(ordinal_cols)
+    order = np.argsort(everything, kind='stable')
+    merged = everything[order]
+    is_new = np.empty(merged.size, dtype=bool)
+    is_new[:1] = True
+    np.not_equal(merged[1:], merged[:-1], out=is_new[1:])
+    calendar = merged[is_new]
+    # Calendar row of every input point, in input order
+    row_of = np.empty(everything.size, dtype=np.int64)
+    row_of[order] = np.cumsum(is_new) - 1
+
+    size = calendar.size
+    matrix = np.full((size, len(columns)), np.nan)
+    observed = np.zeros((size, len(columns)), dtype=bool)
+    start = 0
+    for j, (ordinals, values) in enumerate(zip(ordinal_cols, value_cols)):
+        rows = row_of[start:start + values.size]
+        start += values.size
+        # Keep only the last point of each repeated ordinal, so the scatters below never
+        # depend on which of several writes to the same cell lands
+        last_of_run = np.empty(ordinals.size, dtype=bool)
+        last_of_run[-1:] = True
+        np.not_equal(ordinals[1:], ordinals[:-1], out=last_of_run[:-1])
+        rows, values = rows[last_of_run], values[last_of_run]
+        observed[rows, j] = True
+        if forward_fill:
+            last = np.full(size, -1, dtype=np.int64)
+            last[rows] = np.arange(values.size)
+            np.maximum.accumulate(last, out=last)
+            has_value = last >= 0
+            matrix[has_value, j] = values[last[has_value]]
+        else:
+            matrix[rows, j] = values
+
+    keep: Optional[np.ndarray] = None
+    if how == INTERSECTION:
+        keep = observed.all(axis=1)
+    if drop_incomplete:
+        complete = ~np.isnan(matrix).any(axis=1)
+        keep = complete if keep is None else keep & complete
+    if keep is not None:
+        calendar, matrix = calendar[keep], matrix[keep]
+    return calendar, matrix
+
+
+def align_series(
+    series_by_name: Dict[str, PriceSeries],
+    how: str = UNION,
+    forward_fill: bool = True,
+    drop_incomplete: bool = True,
+) -> AlignedPanel:
+    columns = [(s.ordinals, s.closes) for s in series_by_name.values()]
+    ordinals, values = align_arrays(columns, how, forward_fill, drop_incomplete)
+    return AlignedPanel(ordinals, list(series_by_name), values)
+
+
+def load_panel(
+    csv_paths: Dict[str, str],
+    how: str = UNION,
+    monthly: bool = False,
+    forward_fill: bool = True,
+    drop_incomplete: bool = True,
+) -> AlignedPanel:
+    # Align index CSVs by name; monthly=True first resamples each to month-end closes
+    from compute_sip_markdown import read_prices
+    from risk_metrics import monthly_closes
+
+    series_by_name: Dict[str, PriceSeries] = {}
+    for name, path in csv_paths.items():
+        series = read_prices(path)
+        if monthly:
+            month_ends, closes = monthly_closes(series)
+            series = PriceSeries(month_ends, closes)
+        series_by_name[name] = series
+    return align_series(series_by_name, how, forward_fill, drop_incomplete)
+
+
+def alignment_benchmark(csv_paths: Dict[str, str], repeat: int = 3) -> None:
+    # Check against the per-date scan the dashboard used (on month-end closes, as it ran) and
+    # time both; the daily panel is only timed, the scan is far too slow for it
+    import time
+    from compute_sip_markdown import read_prices
+    from risk_metrics import monthly_closes
+
+    daily = {name: read_prices(path) for name, path in csv_paths.items()}
+    monthly = {name: PriceSeries(*monthly_closes(s)) for name, s in daily.items()}
+
+    def scan_align() -> Tuple[List[int], List[List[float]]]:
+        # For each union date, find each series' latest point on or before it by scanning
+        # (findValue), then keep rows where every series has a value
+        points = {name: list(zip(s.ordinals, s.closes)) for name, s in monthly.items()}
+        calendar = sorted({o for s in monthly.values() for o in s.ordinals})
+        out_dates: List[int] = []
+        out_rows: List[List[float]] = []
+        for o in calendar:
+            row = []
+            for name in points:
+                candidates = [v for d, v in points[name] if d <= o]
+                row.append(candidates[-1] if candidates else None)
+            if all(v is not None for v in row):
+                out_dates.append(int(o))
+                out_rows.append(row)
+        return out_dates, out_rows
+
+    def timed(fn) -> float:
+        best = float('inf')
+        for _ in range(repeat):
+            t_start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t_start)
+        return best
+
+    panel = align_series(monthly)
+    ref_dates, ref_rows = scan_align()
+    assert ref_dates == panel.ordinals.tolist() and ref_rows == panel.values.tolist()
+    print(f"Monthly: {len(monthly)} series -> {len(panel)} aligned rows (matches the scan)")
+    print(f"  scan        {timed(scan_align) * 1000:8.2f} ms")
+    print(f"  merge-join  {timed(lambda: align_series(monthly)) * 1000:8.2f} ms")
+
+    total = sum(len(s) for s in daily.values())
+    print(f"Daily: {total} points -> {len(align_series(daily))} union rows, "
+          f"{len(align_series(daily, how=INTERSECTION))} intersection rows")
+    print(f"  merge-join  {timed(lambda: align_series(daily)) * 1000:8.2f} ms")
+
+
+if __name__ == '__main__':
+    import argparse
+    import glob
+    import os
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Align index CSVs on a shared calendar and compare with the per-date scan.')
+    parser.add_argument('csv_paths', nargs='*', help='CSV files to align (default: every *.csv next to this script)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions')
+    args = parser.parse_args()
+    paths = args.csv_paths or sorted(glob.glob(os.path.join(base_dir, '*.csv')))
+    alignment_benchmark({os.path.splitext(os.path.basename(p))[0]: p for p in paths}, args.repeat)
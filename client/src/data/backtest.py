@@ -0,0 +1,240 @@
+from dataclasses import dataclass
+from datetime import date
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from alignment import AlignedPanel
+from risk_metrics import EPOCH_ORDINAL, risk_metrics
+
+
+# Backtests K weight vectors over an aligned (T, A) price panel at once. Weights that sum to
+# less than 1 keep the remainder in cash at a zero return, which is what the dashboard's
+# sum(w * r) strategies did (Equal Weight is 3 x 0.333).
+#
+# Calendar schedules rebalance at the close of the last row of each period. Between
+# rebalances holdings drift, so a segment's growth is (P[t] / P[anchor]) @ W.T: one matmul
+# for every strategy and row, chained across segments with a cumulative product. Threshold
+# rebalancing is path dependent per strategy, so it steps through time but stays vectorized
+# across strategies.
+
+MONTHLY = 'monthly'
+QUARTERLY = 'quarterly'
+ANNUAL = 'annual'
+THRESHOLD = 'threshold'
+NEVER = 'never'
+SCHEDULES = (MONTHLY, QUARTERLY, ANNUAL, THRESHOLD, NEVER)
+
+# The dashboard's strategies (App.tsx); MidSmall and Arbitrage are synthetic columns, see
+# with_dashboard_proxies
+DASHBOARD_STRATEGIES: Dict[str, Dict[str, float]] = {
+    "Conservative": {"Nifty": 0.5, "Quality": 0.25, "Momentum": 0.25},
+    "Equal Weight": {"Nifty": 0.333, "Quality": 0.333, "Momentum": 0.333},
+    "Aggressive": {"Nifty": 0.2, "Quality": 0.4, "Momentum": 0.4},
+    "Hyper-Aggressive": {"Nifty": 0, "Quality": 0.5, "Momentum": 0.5},
+    "Rajat's Strategy": {"Nifty": 0.25, "Quality": 0.2, "Momentum": 0.2, "MidSmall": 0.15, "Arbitrage": 0.2},
+    "Rajat's (No Arbitrage)": {"Nifty": 0.3125, "Quality": 0.25, "Momentum": 0.25, "MidSmall": 0.1875},
+}
+ARBITRAGE_ANNUAL_RETURN = 0.065
+MIDSMALL_BETA = 1.2
+
+
+@dataclass
+class BacktestResult:
+    # values[t, k]: portfolio value of strategy k at ordinals[t]; rebalances[k]: trades made
+    ordinals: np.ndarray
+    values: np.ndarray
+    rebalances: np.ndarray
+
+    def dates(self) -> List[date]:
+        return [date.fromordinal(int(o)) for o in self.ordinals]
+
+    def years(self) -> float:
+        return float(self.ordinals[-1] - self.ordinals[0]) / 365.25
+
+
+def weight_matrix(strategies: Dict[str, Dict[str, float]], assets: Sequence[str]) -> np.ndarray:
+    # (K, A) weights from {strategy: {asset: weight}}; unknown assets are an error
+    matrix = np.zeros((len(strategies), len(assets)))
+    for k, weights in enumerate(strategies.values()):
+        for asset, w in weights.items():
+            matrix[k, list(assets).index(asset)] = w
+    return matrix
+
+
+def weight_grid(assets: int, step: float = 0.05) -> np.ndarray:
+    # Every long-only weight vector on the simplex with increments of `step` (stars and bars)
+    units = int(round(1 / step))
+    rows = []
+    for bars in combinations(range(units + assets - 1), assets - 1):
+        edges = (-1,) + bars + (units + assets - 1,)
+        rows.append([edges[i + 1] - edges[i] - 1 for i in range(assets)])
+    return np.array(rows, dtype=np.float64) / units
+
+
+def _period_keys(ordinals: np.ndarray, schedule: str) -> np.ndarray:
+    months = (np.asarray(ordinals, dtype=np.int64) - EPOCH_ORDINAL).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    if schedule == MONTHLY:
+        return months
+    if schedule == QUARTERLY:
+        return months // 3
+    if schedule == ANNUAL:
+        return months // 12
+    return np.zeros(len(ordinals), dtype=np.int64)
+
+
+def _calendar_backtest(prices: np.ndarray, weights: np.ndarray, keys: np.ndarray, initial: float) -> Tuple[np.ndarray, int]:
+    size = prices.shape[0]
+    # Anchor rows: row 0 plus the last row of every period that is followed by another
+    ends = np.flatnonzero(keys[1:] != keys[:-1])
+    anchors = np.concatenate(([0], ends[ends > 0])).astype(np.int64)
+    mark = np.full(size, -1, dtype=np.int64)
+    mark[anchors] = np.arange(anchors.size)
+    np.maximum.accumulate(mark, out=mark)
+    # Index (into anchors) of the rebalance that row t's holdings came from
+    segment = np.empty(size, dtype=np.int64)
+    segment[0] = 0
+    segment[1:] = mark[:-1]
+
+    cash = 1.0 - weights.sum(axis=1)
+    growth = (prices / prices[anchors[segment]]) @ weights.T + cash
+    start = np.empty((anchors.size, weights.shape[0]))
+    start[0] = initial
+    if anchors.size > 1:
+        start[1:] = initial * np.cumprod(growth[anchors[1:]], axis=0)
+    return start[segment] * growth, anchors.size - 1
+
+
+def _threshold_backtest(prices: np.ndarray, weights: np.ndarray, band: float, initial: float) -> Tuple[np.ndarray, np.ndarray]:
+    # Check drift at every row's close; a strategy rebalances when any weight (cash included)
+    # is more than `band` away from its target
+    size, strategies = prices.shape[0], weights.shape[0]
+    target = np.hstack([weights, (1.0 - weights.sum(axis=1))[:, None]])
+    row_prices = np.hstack([prices, np.ones((size, 1))])
+    units = initial * target / row_prices[0]
+    values = np.empty((size, strategies))
+    rebalances = np.zeros(strategies, dtype=np.int64)
+    for t in range(size):
+        holdings = units * row_prices[t]
+        value = holdings.sum(axis=1)
+        values[t] = value
+        if t == size - 1:
+            break
+        drifted = (np.abs(holdings / value[:, None] - target) > band).any(axis=1)
+        if drifted.any():
+            units[drifted] = value[drifted, None] * target[drifted] / row_prices[t]
+            rebalances += drifted
+    return values, rebalances
+
+
+def run_backtest(
+    panel: AlignedPanel,
+    weights: np.ndarray,
+    schedule: str = MONTHLY,
+    band: float = 0.05,
+    initial: float = 100.0,
+    assets: Optional[Sequence[str]] = None,
+) -> BacktestResult:
+    # weights: (K, A) over `assets` (default: every panel column, in order)
+    if schedule not in SCHEDULES:
+        raise ValueError(f"schedule must be one of {SCHEDULES}, got {schedule!r}")
+    columns = [panel.names.index(a) for a in assets] if assets is not None else list(range(len(panel.names)))
+    prices = panel.values[:, columns]
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    if weights.shape[1] != prices.shape[1]:
+        raise ValueError(f"weights have {weights.shape[1]} columns for {prices.shape[1]} assets")
+    if np.isnan(prices).any():
+        raise ValueError("panel has missing prices; align with drop_incomplete=True")
+    if prices.shape[0] == 0:
+        # No rows to anchor a rebalance on
+        return BacktestResult(panel.ordinals, np.empty((0, weights.shape[0])), np.zeros(weights.shape[0], dtype=np.int64))
+    if schedule == THRESHOLD:
+        values, rebalances = _threshold_backtest(prices, weights, band, initial)
+    else:
+        values, count = _calendar_backtest(prices, weights, _period_keys(panel.ordinals, schedule), initial)
+        rebalances = np.full(weights.shape[0], count, dtype=np.int64)
+    return BacktestResult(panel.ordinals, values, rebalances)
+
+
+def with_dashboard_proxies(panel: AlignedPanel, base: str = "Nifty") -> AlignedPanel:
+    # Add the dashboard's synthetic MidSmall (1.2x the base's per-row return) and Arbitrage
+    # (6.5% a year, accrued monthly per row) columns as price indices starting at 1
+    base_prices = panel.column(base)
+    midsmall = np.ones(len(panel))
+    midsmall[1:] = np.cumprod(1 + MIDSMALL_BETA * (base_prices[1:] / base_prices[:-1] - 1))
+    arbitrage = (1 + ARBITRAGE_ANNUAL_RETURN / 12) ** np.arange(len(panel), dtype=np.float64)
+    return AlignedPanel(
+        panel.ordinals,
+        panel.names + ["MidSmall", "Arbitrage"],
+        np.column_stack([panel.values, midsmall, arbitrage]),
+    )
+
+
+def dashboard_parity(dashboard_path: str) -> float:
+    # Replay App.tsx's strategy loop on dashboard.json's aligned data and compare with the
+    # monthly-rebalanced matrix backtest; returns the worst relative difference
+    import json
+
+    with open(dashboard_path, encoding='utf-8') as f:
+        aligned = json.load(f)["aligned"]
+    names = ["Nifty", "Momentum", "Quality"]
+    ordinals = np.array([date.fromisoformat(d).toordinal() for d in aligned["dates"]])
+    panel = with_dashboard_proxies(AlignedPanel(ordinals, names, np.column_stack([aligned[n] for n in names])))
+    result = run_backtest(panel, weight_matrix(DASHBOARD_STRATEGIES, panel.names), MONTHLY)
+
+    worst = 0.0
+    for k, (name, w) in enumerate(DASHBOARD_STRATEGIES.items()):
+        history = [100.0]
+        for i in range(1, len(ordinals)):
+            nifty = aligned["Nifty"][i] / aligned["Nifty"][i - 1] - 1
+            quality = aligned["Quality"][i] / aligned["Quality"][i - 1] - 1
+            momentum = aligned["Momentum"][i] / aligned["Momentum"][i - 1] - 1
+            monthly = w["Nifty"] * nifty + w["Quality"] * quality + w["Momentum"] * momentum
+            monthly += w.get("MidSmall", 0) * nifty * MIDSMALL_BETA + w.get("Arbitrage", 0) * ARBITRAGE_ANNUAL_RETURN / 12
+            history.append(history[-1] * (1 + monthly))
+        diff = float(np.max(np.abs(result.values[:, k] - history) / np.abs(history)))
+        worst = max(worst, diff)
+        print(f"{name:<24} final {history[-1]:12.4f}  max rel diff {diff:.3e}")
+    return worst
+
+
+def sweep(panel: AlignedPanel, step: float, schedules: Sequence[str], band: float, top: int) -> None:
+    import time
+
+    grid = weight_grid(len(panel.names), step)
+    print(f"{len(grid)} weight vectors over {panel.names}, {len(panel)} rows "
+          f"({panel.dates()[0]} to {panel.dates()[-1]})")
+    for schedule in schedules:
+        t_start = time.perf_counter()
+        result = run_backtest(panel, grid, schedule, band)
+        metrics = risk_metrics(result.values.T, result.years())
+        elapsed = time.perf_counter() - t_start
+        print(f"\n{schedule}: {elapsed * 1000:.1f} ms for backtest + metrics")
+        for k in np.argsort(-metrics["sharpeRatio"])[:top]:
+            mix = ", ".join(f"{n} {w:.0%}" for n, w in zip(panel.names, grid[k]) if w)
+            print(f"  Sharpe {metrics['sharpeRatio'][k]:5.2f}  CAGR {metrics['cagr'][k]:6.2%}  "
+                  f"MaxDD {metrics['maxDrawdown'][k]:7.2%}  rebalances {result.rebalances[k]:4d}  {mix}")
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    from alignment import load_panel
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Sweep weight grids over the index CSVs with a rebalancing schedule.')
+    parser.add_argument('--step', type=float, default=0.05, help='Weight grid increment')
+    parser.add_argument('--schedule', nargs='+', default=[MONTHLY, QUARTERLY, ANNUAL, THRESHOLD], choices=SCHEDULES)
+    parser.add_argument('--band', type=float, default=0.05, help='Drift band for threshold rebalancing')
+    parser.add_argument('--daily', action='store_true', help='Backtest on daily closes instead of month-end closes')
+    parser.add_argument('--top', type=int, default=5, help='Strategies to list per schedule')
+    args = parser.parse_args()
+
+    panel = load_panel({
+        "Nifty": os.path.join(base_dir, "NIFTY50_Historical.csv"),
+        "Momentum": os.path.join(base_dir, "NIFTY500_MOMENTUM_50_Historical.csv"),
+        "Quality": os.path.join(base_dir, "NIFTY500_MULTICAP_MOMENTUM_QUALITY_50_Historical.csv"),
+        "Value": os.path.join(base_dir, "NIFTY500_VALUE_50_combined.csv"),
+    }, monthly=not args.daily)
+    sweep(panel, args.step, args.schedule, args.band, args.top)
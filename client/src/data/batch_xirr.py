@@ -0,0 +1,142 @@
+from typing import Union
+
+import numpy as np
+
+from xirr_solver import BRACKET_LOW, solve_irr
+
+
+def xnpv_batch(rates: np.ndarray, amounts: np.ndarray, years: np.ndarray) -> np.ndarray:
+    # rates: (S,), amounts: (S, N), years: (N,) shared by every row or (S, N) per row
+    rates = np.asarray(rates, dtype=np.float64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    years = np.asarray(years, dtype=np.float64)
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        log_base = np.log1p(rates)[:, None]
+        total = (amounts * np.exp(-years * log_base)).sum(axis=1)
+    return np.where(rates <= -1.0, np.inf, total)
+
+
+def xirr_batch(
+    amounts: np.ndarray,
+    years: np.ndarray,
+    guess: Union[float, np.ndarray] = 0.1,
+    tol: float = 1e-12,
+    max_iter: int = 50,
+    fallback: bool = True,
+) -> np.ndarray:
+    # Solve the IRR of every row of `amounts` at once with vectorized Newton iterations.
+    # Zero amounts are allowed, so ragged cash-flow sets can be padded to a common width.
+    # Rows Newton cannot settle are re-solved one at a time by xirr_solver (Brent) when
+    # `fallback` is set; rows without both an outflow and an inflow are NaN.
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=np.float64))
+    years = np.asarray(years, dtype=np.float64)
+    n_rows = amounts.shape[0]
+    shared_years = years.ndim == 1
+
+    rates = np.empty(n_rows, dtype=np.float64)
+    rates[:] = guess
+    solvable = (amounts < 0).any(axis=1) & (amounts > 0).any(axis=1)
+    converged = np.zeros(n_rows, dtype=bool)
+    active = solvable.copy()
+
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        for _ in range(max_iter):
+            idx = np.flatnonzero(active)
+            if idx.size == 0:
+                break
+            r = rates[idx]
+            t = years if shared_years else years[idx]
+            disc = amounts[idx] * np.exp(-t * np.log1p(r)[:, None])
+            f = disc.sum(axis=1)
+            df = -(t * disc).sum(axis=1) / (1.0 + r)
+            new_r = r - f / df
+            # Damp steps that would leave the domain of (1 + rate) ** -t
+            new_r = np.where(new_r <= -1.0, (r - 1.0) / 2.0, new_r)
+
+            bad = ~np.isfinite(new_r) | (df == 0.0)
+            done = (f == 0.0) | (np.abs(new_r - r) <= tol * (1.0 + np.abs(r)))
+            rates[idx] = np.where(f == 0.0, r, new_r)
+            converged[idx[done & ~bad]] = True
+            active[idx[done | bad]] = False
+
+    ok = converged & (rates >= BRACKET_LOW)
+    rates[~ok] = np.nan
+    if fallback:
+        for i in np.flatnonzero(solvable & ~ok):
+            t = years if shared_years else years[i]
+            rates[i] = solve_irr(t.tolist(), amounts[i].tolist()).rate
+    return rates
+
+
+def _rolling_window_matrix(csv_path: str, months: int, sip_amount: float = 1000.0):
+    # Every rolling SIP window of an index history as one (S, months + 1) batch
+    from compute_sip_markdown import compute_monthly_sip, read_prices
+
+    records, _, _, _ = compute_monthly_sip(read_prices(csv_path), sip_amount)
+    n = len(records) - months + 1
+    if n <= 0:
+        return records, np.empty((0, months + 1)), np.empty((0, months + 1))
+    sip_ord = np.array([r.sip_date.toordinal() for r in records], dtype=np.float64)
+    end_ord = np.array([r.month_end.toordinal() for r in records], dtype=np.float64)
+    units = np.array([r.units_bought for r in records])
+    navs = np.array([r.month_end_nav for r in records])
+
+    starts = np.arange(n)
+    cols = starts[:, None] + np.arange(months)[None, :]
+    ends = starts + months - 1
+    t0 = sip_ord[starts][:, None]
+    years = np.empty((n, months + 1))
+    years[:, :months] = (sip_ord[cols] - t0) / 365.0
+    years[:, months] = (end_ord[ends] - t0[:, 0]) / 365.0
+    amounts = np.full((n, months + 1), -sip_amount)
+    amounts[:, months] = units[cols].sum(axis=1) * navs[ends]
+    return records, amounts, years
+
+
+def cross_check(csv_path: str, horizons=(1, 3, 5, 7, 10, 15)) -> float:
+    # Compare the batch solver with the pure-Python reference xirr on every rolling window
+    import time
+    from datetime import datetime
+    from compute_sip_markdown import xirr
+
+    worst = 0.0
+    for h in horizons:
+        records, amounts, years = _rolling_window_matrix(csv_path, 12 * h)
+        if amounts.shape[0] == 0:
+            continue
+        t_start = time.perf_counter()
+        batch = xirr_batch(amounts, years)
+        t_batch = time.perf_counter() - t_start
+
+        t_start = time.perf_counter()
+        reference = []
+        for row_amounts, row_years in zip(amounts, years):
+            base = records[0].sip_date.toordinal()
+            cashflows = [
+                (datetime.fromordinal(base + int(round(t * 365.0))), float(cf))
+                for t, cf in zip(row_years, row_amounts)
+            ]
+            reference.append(xirr(cashflows))
+        t_reference = time.perf_counter() - t_start
+
+        ref = np.array(reference)
+        mismatch = np.isnan(ref) != np.isnan(batch)
+        diff = np.nanmax(np.abs(ref - batch)) if (~np.isnan(ref)).any() else 0.0
+        if mismatch.any():
+            diff = float('inf')
+        worst = max(worst, float(diff))
+        print(f"{h:>2}Y: {amounts.shape[0]} windows, batch {t_batch * 1000:.1f} ms, "
+              f"reference {t_reference * 1000:.1f} ms, max abs diff {diff:.3e}")
+    return worst
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Cross-check the NumPy batch XIRR solver against the reference xirr.')
+    parser.add_argument('--csv', dest='csv_path', default='./NIFTY500_VALUE_50_combined.csv', help='Path to CSV input file')
+    parser.add_argument('--tolerance', type=float, default=1e-8, help='Maximum allowed absolute rate difference')
+    args = parser.parse_args()
+    worst = cross_check(args.csv_path)
+    if worst > args.tolerance:
+        raise SystemExit(f"Batch XIRR differs from reference by {worst:.3e}")
@@ -1,53 +1,73 @@
 import csv
 import glob
+import heapq
 import os
-from datetime import datetime
-from typing import List, Dict
+from typing import Iterable, Iterator, List, Optional, Tuple
 
+from date_parsing import parse_index_date
+from index_csv import iter_index_rows
 
-def read_and_collect_rows(csv_file_paths: List[str]) -> List[Dict[str, str]]:
-	collected_rows: List[Dict[str, str]] = []
 
-	for file_path in csv_file_paths:
-		with open(file_path, mode="r", encoding="utf-8-sig", newline="") as f:
-			reader = csv.DictReader(f)
-			expected_fields = ["Index Name", "Date", "Open", "High", "Low", "Close"]
+FIELDNAMES = ["Index Name", "Date", "Open", "High", "Low", "Close"]
 
-			# If the header is missing any expected fields, skip this file
-			if not reader.fieldnames or not all(field in reader.fieldnames for field in expected_fields):
-				continue
 
-			for row in reader:
-				date_str = row.get("Date", "").strip()
-				if not date_str:
-					continue
+def _read_dated_rows(file_path: str) -> Iterator[Tuple[int, List[str]]]:
+	# Files whose header has no recognizable date or close column yield nothing
+	for columns, row in iter_index_rows(file_path):
+		date_str = columns.date_str(row)
+		if not date_str.strip():
+			continue
 
-				try:
-					parsed_date = datetime.strptime(date_str, "%d %b %Y")
-				except ValueError:
-					# Skip rows with unparseable dates
-					continue
+		parsed_date = parse_index_date(date_str)
+		if parsed_date is None:
+			# Skip rows with unparseable dates
+			continue
 
-				# Carry the parsed date for sorting; keep original columns as-is
-				row["_parsed_date"] = parsed_date
-				collected_rows.append(row)
+		# Normalize to the output column order; columns a source lacks are left empty
+		yield parsed_date.toordinal(), [columns.name_str(row), date_str, *columns.ohlc(row)]
 
-	return collected_rows
 
+def _is_ascending(file_path: str) -> bool:
+	previous = None
+	for ordinal, _ in _read_dated_rows(file_path):
+		if previous is not None and ordinal < previous:
+			return False
+		previous = ordinal
+	return True
 
-def write_sorted_rows(rows: List[Dict[str, str]], output_path: str) -> None:
-	# Sort ascending by date
-	rows.sort(key=lambda r: r["_parsed_date"])  # type: ignore[arg-type]
 
-	fieldnames = ["Index Name", "Date", "Open", "High", "Low", "Close"]
+def iter_file_rows(file_path: str) -> Iterator[Tuple[int, List[str]]]:
+	# Yearly exports are normally ascending and are streamed as-is; a file in any other
+	# order (e.g. newest first) is sorted on its own, which holds at most one year in memory
+	if _is_ascending(file_path):
+		return _read_dated_rows(file_path)
+	return iter(sorted(_read_dated_rows(file_path), key=lambda item: item[0]))
 
+
+def merge_sorted_rows(csv_file_paths: List[str]) -> Iterator[List[str]]:
+	# k-way merge of the per-file streams, holding one pending row per file. Rows sharing a
+	# date are deduplicated with the last one winning: heapq.merge breaks ties in input
+	# order, so a later file (and a later row within a file) overrides an earlier one.
+	merged = heapq.merge(*(iter_file_rows(path) for path in csv_file_paths), key=lambda item: item[0])
+	pending_date = None
+	pending_row: Optional[List[str]] = None
+	for ordinal, row in merged:
+		if pending_row is not None and ordinal != pending_date:
+			yield pending_row
+		pending_date, pending_row = ordinal, row
+	if pending_row is not None:
+		yield pending_row
+
+
+def write_merged_rows(rows: Iterable[List[str]], output_path: str) -> int:
+	count = 0
 	with open(output_path, mode="w", encoding="utf-8", newline="") as f_out:
-		writer = csv.DictWriter(f_out, fieldnames=fieldnames, quoting=csv.QUOTE_MINIMAL)
-		writer.writeheader()
+		writer = csv.writer(f_out, quoting=csv.QUOTE_MINIMAL)
+		writer.writerow(FIELDNAMES)
 		for row in rows:
-			# Exclude helper key
-			row_to_write = {key: row.get(key, "") for key in fieldnames}
-			writer.writerow(row_to_write)
+			writer.writerow(row)
+			count += 1
+	return count
 
 
 def main() -> None:
@@ -57,16 +77,13 @@ def main() -> None:
 	pattern = os.path.join(base_dir, "NIFTY500 VALUE 50_Historical_PR_*.csv")
 	csv_file_paths = sorted(glob.glob(pattern))
 
-	# Collect and sort rows
-	rows = read_and_collect_rows(csv_file_paths)
-
-	# Write combined output
+	# Merge the date-sorted files and write the combined output in one pass
 	output_path = os.path.join(base_dir, "NIFTY500_VALUE_50_combined.csv")
-	write_sorted_rows(rows, output_path)
+	total_rows = write_merged_rows(merge_sorted_rows(csv_file_paths), output_path)
 
 	# Simple stdout summary
 	print(f"Combined {len(csv_file_paths)} files into: {output_path}")
-	print(f"Total rows (excluding header): {len(rows)}")
+	print(f"Total rows (excluding header): {total_rows}")
 
 
 if __name__ == "__main__":
@@ -1,14 +1,24 @@
-import csv
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
+import csv
+import glob
+import hashlib
+import io
+import json
 import math
+import os
+import tempfile
+import time
 
-
-@dataclass
-class PricePoint:
-    date: datetime
-    close: float
+from index_csv import read_index_series
+from month_index import MonthIndex, build_month_index, month_index_for
+from price_cache import load_price_cache, write_price_cache
+from price_series import PricePoint, PriceSeries
+from rolling_xirr import rolling_by_horizon
+from xirr_solver import PrefixXirr, XirrResult, solve_xirr
 
 
 @dataclass
@@ -25,121 +35,68 @@ class MonthlyRecord:
     units_bought: float
 
 
-def read_prices(csv_path: str) -> List[PricePoint]:
-    prices: List[PricePoint] = []
-    with open(csv_path, newline='') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # Handle either VALUE format (has 'Close') or MOMENTUM format (has 'Total Returns Index')
-            date_str = row.get('Date') or row.get('date')
-            close_str = (
-                row.get('Close')
-                or row.get('Total Returns Index')
-                or row.get('Close Price')
-                or row.get('close')
-            )
-            if not date_str or not close_str:
-                continue
-            try:
-                dt = datetime.strptime(date_str.strip(), '%d %b %Y')
-            except ValueError:
-                # Skip unparseable dates
-                continue
-            try:
-                close = float(str(close_str).replace(',', '').strip())
-            except ValueError:
-                # Skip rows without numeric close
-                continue
-            prices.append(PricePoint(date=dt, close=close))
-    prices.sort(key=lambda p: p.date)
-    return prices
-
-
-def compute_monthly_sip(prices: List[PricePoint], monthly_investment: float) -> Tuple[List[MonthlyRecord], List[Tuple[datetime, float]], datetime, float]:
-    if not prices:
+def read_prices(csv_path: str, use_cache: bool = True) -> PriceSeries:
+    # A fresh binary cache next to the CSV is memory-mapped instead of reparsing the text
+    if use_cache:
+        cached = load_price_cache(csv_path)
+        if cached is not None:
+            return cached
+    series = read_index_series(csv_path)
+    if use_cache:
+        write_price_cache(csv_path, series)
+    return series
+
+
+def compute_monthly_sip(
+    prices: Union[PriceSeries, List[PricePoint]],
+    monthly_investment: float,
+    incremental: bool = True,
+    months: Optional[MonthIndex] = None,
+) -> Tuple[List[MonthlyRecord], List[Tuple[datetime, float]], datetime, float]:
+    series = prices if isinstance(prices, PriceSeries) else PriceSeries.from_points(prices)
+    if not len(series):
         return [], [], datetime.today(), 0.0
+    # Month boundaries come from the index (persisted next to the CSV when the caller has
+    # one), so only each month's first and last rows are touched
+    if months is None or months.rows != len(series):
+        months = build_month_index(series)
+    ordinals = series.ordinals
+    closes = series.closes
 
     monthly_records: List[MonthlyRecord] = []
     cashflows: List[Tuple[datetime, float]] = []
     negative_cashflows_to_date: List[Tuple[datetime, float]] = []
+    # Incremental mode keeps running aggregates of the prefix instead of re-solving a copy of it
+    prefix_xirr = PrefixXirr() if incremental else None
 
     cumulative_units = 0.0
     cumulative_invested = 0.0
 
-    prev_year_month = None
-    current_month_end_nav = None
-    current_month_end_date = None
+    month_start = None
+    month_end_ord = None
+    month_end_nav = None
     sip_date_for_month = None
     sip_nav_for_month = None
     units_bought_for_month = 0.0
 
-    for p in prices:
-        year_month = (p.date.year, p.date.month)
-
-        # New month boundary
-        if prev_year_month is None:
-            # First month: invest on first trading day encountered
-            sip_units = monthly_investment / p.close
-            cumulative_units += sip_units
-            cumulative_invested += monthly_investment
-            cashflows.append((p.date, -monthly_investment))
-            negative_cashflows_to_date.append((p.date, -monthly_investment))
-            sip_date_for_month = p.date
-            sip_nav_for_month = p.close
-            units_bought_for_month = sip_units
-            prev_year_month = year_month
-        elif year_month != prev_year_month:
-            # Finalize previous month record before moving to new month
-            if current_month_end_nav is not None and current_month_end_date is not None and sip_date_for_month is not None:
-                portfolio_value = cumulative_units * current_month_end_nav
-                # XIRR up to this month-end
-                cf_until_now = list(negative_cashflows_to_date)
-                cf_until_now.append((current_month_end_date, portfolio_value))
-                xirr_to_date_val = xirr(cf_until_now)
-                monthly_records.append(
-                    MonthlyRecord(
-                        month_start=datetime(prev_year_month[0], prev_year_month[1], 1),
-                        month_end=current_month_end_date,
-                        sip_date=sip_date_for_month,
-                        cumulative_invested=cumulative_invested,
-                        cumulative_units=cumulative_units,
-                        month_end_nav=current_month_end_nav,
-                        portfolio_value=portfolio_value,
-                        xirr_to_date=xirr_to_date_val,
-                        sip_nav=sip_nav_for_month if sip_nav_for_month is not None else float('nan'),
-                        units_bought=units_bought_for_month,
-                    )
-                )
-
-            # New month: invest on its first trading day
-            sip_units = monthly_investment / p.close
-            cumulative_units += sip_units
-            cumulative_invested += monthly_investment
-            cashflows.append((p.date, -monthly_investment))
-            negative_cashflows_to_date.append((p.date, -monthly_investment))
-            sip_date_for_month = p.date
-            sip_nav_for_month = p.close
-            units_bought_for_month = sip_units
-            prev_year_month = year_month
-
-        # Update month-end trackers (last seen in the month)
-        current_month_end_nav = p.close
-        current_month_end_date = p.date
-
-    # Finalize last month
-    if prev_year_month is not None and current_month_end_nav is not None and current_month_end_date is not None and sip_date_for_month is not None:
-        portfolio_value = cumulative_units * current_month_end_nav
-        cf_until_now = list(negative_cashflows_to_date)
-        cf_until_now.append((current_month_end_date, portfolio_value))
-        xirr_to_date_val = xirr(cf_until_now)
+    def finalize_month() -> None:
+        portfolio_value = cumulative_units * month_end_nav
+        month_end_date = datetime.fromordinal(month_end_ord)
+        # XIRR up to this month-end
+        if prefix_xirr is not None:
+            xirr_to_date_val = prefix_xirr.solve(month_end_date, portfolio_value).rate
+        else:
+            cf_until_now = list(negative_cashflows_to_date)
+            cf_until_now.append((month_end_date, portfolio_value))
+            xirr_to_date_val = xirr(cf_until_now, method='newton')
         monthly_records.append(
             MonthlyRecord(
-                month_start=datetime(prev_year_month[0], prev_year_month[1], 1),
-                month_end=current_month_end_date,
+                month_start=month_start,
+                month_end=month_end_date,
                 sip_date=sip_date_for_month,
                 cumulative_invested=cumulative_invested,
                 cumulative_units=cumulative_units,
-                month_end_nav=current_month_end_nav,
+                month_end_nav=month_end_nav,
                 portfolio_value=portfolio_value,
                 xirr_to_date=xirr_to_date_val,
                 sip_nav=sip_nav_for_month if sip_nav_for_month is not None else float('nan'),
@@ -147,8 +104,30 @@ def compute_monthly_sip(prices: List[PricePoint], monthly_investment: float) ->
             )
         )
 
-    last_date = prices[-1].date
-    last_nav = prices[-1].close
+    for key, first, last in zip(months.month_keys, months.month_first, months.month_last):
+        # Invest on the month's first trading day
+        close = closes[first]
+        sip_date = datetime.fromordinal(ordinals[first])
+        sip_units = monthly_investment / close
+        cumulative_units += sip_units
+        cumulative_invested += monthly_investment
+        cashflows.append((sip_date, -monthly_investment))
+        if prefix_xirr is not None:
+            prefix_xirr.add(sip_date, -monthly_investment)
+        else:
+            negative_cashflows_to_date.append((sip_date, -monthly_investment))
+        sip_date_for_month = sip_date
+        sip_nav_for_month = close
+        units_bought_for_month = sip_units
+        month_start = datetime(key // 12, key % 12 + 1, 1)
+
+        # Value the month at its last trading day
+        month_end_nav = closes[last]
+        month_end_ord = ordinals[last]
+        finalize_month()
+
+    last_date = series.date(len(series) - 1)
+    last_nav = series.closes[len(series) - 1]
     final_value = cumulative_units * last_nav
     # Positive terminal cashflow at last available date
     cashflows.append((last_date, final_value))
@@ -168,148 +147,557 @@ def xnpv(rate: float, cashflows: List[Tuple[datetime, float]]) -> float:
     return total
 
 
-def xirr(cashflows: List[Tuple[datetime, float]], tol: float = 1e-7, max_iter: int = 200) -> float:
+def xirr(
+    cashflows: List[Tuple[datetime, float]],
+    tol: Optional[float] = None,
+    max_iter: Optional[int] = None,
+    method: str = 'bisect',
+) -> float:
+    return xirr_result(cashflows, tol=tol, max_iter=max_iter, method=method).rate
+
+
+def xirr_result(
+    cashflows: List[Tuple[datetime, float]],
+    tol: Optional[float] = None,
+    max_iter: Optional[int] = None,
+    method: str = 'bisect',
+    guess: float = 0.1,
+) -> XirrResult:
+    # 'bisect' is the reference solver; 'newton' precomputes year fractions and uses
+    # Newton with an analytic derivative, falling back to Brent. tol and max_iter default
+    # to each solver's own (bisect: |NPV| < 1e-7 within 200 halvings; newton: step < 1e-12
+    # within 50 iterations) and are passed through when given.
+    if method == 'newton':
+        options = {k: v for k, v in (('tol', tol), ('max_iter', max_iter)) if v is not None}
+        return solve_xirr(cashflows, guess=guess, **options)
+    if method != 'bisect':
+        raise ValueError(f"Unknown XIRR method: {method}")
+    tol = 1e-7 if tol is None else tol
+    max_iter = 200 if max_iter is None else max_iter
+
     # Ensure there is at least one negative and one positive cashflow
     has_neg = any(cf < 0 for _, cf in cashflows)
     has_pos = any(cf > 0 for _, cf in cashflows)
     if not (has_neg and has_pos):
-        return float('nan')
+        return XirrResult(float('nan'), 0, 0, 'none')
 
     # Bracket search for sign change
     low = -0.9999
     high = 1.0
     f_low = xnpv(low, cashflows)
     f_high = xnpv(high, cashflows)
+    evaluations = 2
 
     # Expand high until sign change or limit
     expand_steps = 0
     while f_low * f_high > 0 and expand_steps < 60:
         high = high * 2.0 + 0.5  # grow fast
         f_high = xnpv(high, cashflows)
+        evaluations += 1
         expand_steps += 1
 
     if f_low * f_high > 0:
         # Try shrinking low a bit more (towards -1)
         low = -0.999999
         f_low = xnpv(low, cashflows)
+        evaluations += 1
 
     if f_low * f_high > 0:
         # Give up and return NaN
-        return float('nan')
+        return XirrResult(float('nan'), 0, evaluations, 'none')
 
     # Bisection
-    for _ in range(max_iter):
+    for it in range(1, max_iter + 1):
         mid = (low + high) / 2.0
         f_mid = xnpv(mid, cashflows)
+        evaluations += 1
         if abs(f_mid) < tol:
-            return mid
+            return XirrResult(mid, it, evaluations, 'bisect')
         if f_low * f_mid < 0:
             high = mid
             f_high = f_mid
         else:
             low = mid
             f_low = f_mid
-    return (low + high) / 2.0
+    return XirrResult((low + high) / 2.0, max_iter, evaluations, 'bisect')
 
 
 def format_currency(value: float) -> str:
     return f"{value:,.2f}"
 
 
-def generate_markdown(md_path: str, records: List[MonthlyRecord], xirr_value: float, last_date: datetime, index_label: str):
-    with open(md_path, 'w') as f:
-        f.write(f"## Monthly SIP valuation for {index_label}\n\n")
-        f.write(f"- Monthly SIP amount: Rs 1,000\n")
-        f.write(f"- First data month: {records[0].month_start.strftime('%b %Y') if records else 'N/A'}\n")
-        f.write(f"- Valuation date (last available): {last_date.strftime('%d %b %Y')}\n")
-        if xirr_value == xirr_value:  # not NaN
-            f.write(f"- XIRR to date: {xirr_value*100:.2f}%\n\n")
-        else:
-            f.write("- XIRR to date: Not available\n\n")
-
-        f.write("| Month | SIP Date | Invested (Cumulative) | Units (Cumulative) | Month-end NAV | Portfolio Value | XIRR to Date |\n")
-        f.write("|---|---:|---:|---:|---:|---:|---:|\n")
-        for r in records:
-            month_label = r.month_end.strftime('%Y-%m')
-            f.write(
-                f"| {month_label} | {r.sip_date.strftime('%d %b %Y')} | Rs {format_currency(r.cumulative_invested)} | "
-                f"{r.cumulative_units:.6f} | {format_currency(r.month_end_nav)} | Rs {format_currency(r.portfolio_value)} | "
-                f"{(r.xirr_to_date*100):.2f}% |\n"
+def format_sip_amount(value: float) -> str:
+    # 1000 -> '1,000'; fractional amounts keep their paise
+    return f"{value:,.0f}" if value == int(value) else format_currency(value)
+
+
+HORIZONS_YEARS = [1, 3, 5, 7, 10, 15]
+
+# Bump when the compute stage changes, so cached results are recomputed
+SIP_RESULT_VERSION = 1
+SIP_RESULT_CACHE_DIR = os.environ.get(
+    'NIFTY_SIP_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sip_cache'),
+)
+
+
+@dataclass
+class RollingSummary:
+    count: int
+    average: float
+    minimum: float
+    maximum: float
+
+
+@dataclass
+class SipResult:
+    # Everything the renderers need; computing it is the expensive part, rendering is formatting only
+    monthly_investment: float
+    records: List[MonthlyRecord]
+    xirr: float
+    last_date: datetime
+    horizons_years: List[int]
+    rolling: Dict[int, List[float]]
+    summary: Dict[int, Optional[RollingSummary]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Dates as day ordinals; floats round-trip exactly through JSON
+        return {
+            'version': SIP_RESULT_VERSION,
+            'monthly_investment': self.monthly_investment,
+            'records': [
+                [
+                    r.month_start.toordinal(), r.month_end.toordinal(), r.sip_date.toordinal(),
+                    r.cumulative_invested, r.cumulative_units, r.month_end_nav, r.portfolio_value,
+                    r.xirr_to_date, r.sip_nav, r.units_bought,
+                ]
+                for r in self.records
+            ],
+            'xirr': self.xirr,
+            'last_date': self.last_date.toordinal(),
+            'horizons_years': self.horizons_years,
+            'rolling': {str(h): series for h, series in self.rolling.items()},
+            'summary': {
+                str(h): None if s is None else [s.count, s.average, s.minimum, s.maximum]
+                for h, s in self.summary.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SipResult':
+        records = [
+            MonthlyRecord(
+                month_start=datetime.fromordinal(r[0]),
+                month_end=datetime.fromordinal(r[1]),
+                sip_date=datetime.fromordinal(r[2]),
+                cumulative_invested=r[3],
+                cumulative_units=r[4],
+                month_end_nav=r[5],
+                portfolio_value=r[6],
+                xirr_to_date=r[7],
+                sip_nav=r[8],
+                units_bought=r[9],
             )
+            for r in data['records']
+        ]
+        return cls(
+            monthly_investment=data['monthly_investment'],
+            records=records,
+            xirr=data['xirr'],
+            last_date=datetime.fromordinal(data['last_date']),
+            horizons_years=list(data['horizons_years']),
+            rolling={int(h): series for h, series in data['rolling'].items()},
+            summary={
+                int(h): None if s is None else RollingSummary(*s)
+                for h, s in data['summary'].items()
+            },
+        )
 
-        # Rolling returns section (SIP XIRR over fixed windows)
-        horizons_years = [1, 3, 5, 7, 10, 15]
-        f.write("\n\n## Rolling returns (XIRR) based on monthly SIP cashflows\n\n")
-        f.write("Assumes monthly SIP of Rs 1,000; each window uses SIP cashflows within the window and terminal value at that month-end.\n\n")
-        # Header
-        header_cols = ["Month", "Month-end NAV"] + [f"{h}Y" for h in horizons_years]
-        f.write("| " + " | ".join(header_cols) + " |\n")
-        f.write("|" + "---|" * len(header_cols) + "\n")
-
-        # Precompute arrays for convenience
-        month_navs = [r.month_end_nav for r in records]
-        # Collect rolling SIP XIRR series for stats
-        rolling_series = {h: [] for h in horizons_years}
-
-        for i in range(len(records)):
-            row = []
-            row.append(records[i].month_end.strftime('%Y-%m'))
-            row.append(format_currency(month_navs[i]))
-            for h in horizons_years:
-                months_back = 12 * h
-                start_idx = i - months_back + 1
-                if start_idx >= 0:
-                    # Build cashflows within the window
-                    window_units = 0.0
-                    cashflows_window = []
-                    for k in range(start_idx, i + 1):
-                        cashflows_window.append((records[k].sip_date, -1000.0))
-                        window_units += records[k].units_bought
-                    terminal_value = window_units * records[i].month_end_nav
-                    cashflows_window.append((records[i].month_end, terminal_value))
-                    rate_win = xirr(cashflows_window)
-                    if rate_win == rate_win:  # not NaN
-                        row.append(f"{rate_win*100:.2f}%")
-                        rolling_series[h].append(rate_win)
-                    else:
-                        row.append("NA")
-                else:
-                    row.append("NA")
-            f.write("| " + " | ".join(row) + " |\n")
-
-        # Summary statistics for rolling SIP XIRR
-        f.write("\n### Rolling returns summary (XIRR)\n\n")
-        f.write("| Horizon | Average | Minimum | Maximum |\n")
-        f.write("|---|---:|---:|---:|\n")
+
+def summarize_rolling(series: List[float]) -> Optional[RollingSummary]:
+    valid = [rate for rate in series if rate == rate]  # drop NaN
+    if not valid:
+        return None
+    return RollingSummary(len(valid), sum(valid) / len(valid), min(valid), max(valid))
+
+
+def build_sip_result(
+    records: List[MonthlyRecord],
+    xirr_value: float,
+    last_date: datetime,
+    monthly_investment: float = 1000.0,
+    horizons_years: List[int] = HORIZONS_YEARS,
+    horizon_workers: int = 1,
+) -> SipResult:
+    # Rolling SIP XIRR for every horizon; horizon_workers > 1 solves each in its own process
+    by_months = rolling_by_horizon(
+        [r.sip_date for r in records],
+        [r.units_bought for r in records],
+        [r.month_end for r in records],
+        [r.month_end_nav for r in records],
+        [12 * h for h in horizons_years],
+        monthly_investment,
+        workers=horizon_workers,
+    )
+    rolling = {h: by_months[12 * h] for h in horizons_years}
+    return SipResult(
+        monthly_investment=monthly_investment,
+        records=records,
+        xirr=xirr_value,
+        last_date=last_date,
+        horizons_years=list(horizons_years),
+        rolling=rolling,
+        summary={h: summarize_rolling(rolling[h]) for h in horizons_years},
+    )
+
+
+def compute_sip_result(
+    prices: PriceSeries,
+    monthly_investment: float = 1000.0,
+    horizons_years: List[int] = HORIZONS_YEARS,
+    horizon_workers: int = 1,
+    months: Optional[MonthIndex] = None,
+) -> SipResult:
+    records, cashflows, last_date, _ = compute_monthly_sip(prices, monthly_investment, months=months)
+    rate = xirr(cashflows, method='newton')
+    return build_sip_result(records, rate, last_date, monthly_investment, horizons_years, horizon_workers)
+
+
+def sip_result_key(prices: PriceSeries, monthly_investment: float, horizons_years: List[int]) -> str:
+    # Hash of the price columns themselves, so reformatting a CSV without changing data still hits
+    h = hashlib.sha256()
+    h.update(array('i', prices.ordinals).tobytes())
+    h.update(array('d', prices.closes).tobytes())
+    h.update(json.dumps([SIP_RESULT_VERSION, monthly_investment, list(horizons_years)]).encode('utf-8'))
+    return h.hexdigest()
+
+
+def load_or_compute_sip_result(
+    prices: PriceSeries,
+    monthly_investment: float = 1000.0,
+    horizons_years: List[int] = HORIZONS_YEARS,
+    cache_dir: Optional[str] = SIP_RESULT_CACHE_DIR,
+    horizon_workers: int = 1,
+    months: Optional[MonthIndex] = None,
+) -> Tuple[SipResult, bool]:
+    # Returns (result, cache_hit); cache_dir=None always computes and stores nothing
+    if cache_dir is None:
+        return compute_sip_result(prices, monthly_investment, horizons_years, horizon_workers, months), False
+    path = os.path.join(cache_dir, sip_result_key(prices, monthly_investment, horizons_years) + '.json')
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == SIP_RESULT_VERSION:
+            return SipResult.from_dict(data), True
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        pass
+    result = compute_sip_result(prices, monthly_investment, horizons_years, horizon_workers, months)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(result.to_dict(), f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return result, False
+
+
+def render_markdown(result: SipResult, index_label: str) -> str:
+    records = result.records
+    sip_label = format_sip_amount(result.monthly_investment)
+    lines = [f"## Monthly SIP valuation for {index_label}\n\n"]
+    lines.append(f"- Monthly SIP amount: Rs {sip_label}\n")
+    lines.append(f"- First data month: {records[0].month_start.strftime('%b %Y') if records else 'N/A'}\n")
+    lines.append(f"- Valuation date (last available): {result.last_date.strftime('%d %b %Y')}\n")
+    if result.xirr == result.xirr:  # not NaN
+        lines.append(f"- XIRR to date: {result.xirr*100:.2f}%\n\n")
+    else:
+        lines.append("- XIRR to date: Not available\n\n")
+
+    lines.append("| Month | SIP Date | Invested (Cumulative) | Units (Cumulative) | Month-end NAV | Portfolio Value | XIRR to Date |\n")
+    lines.append("|---|---:|---:|---:|---:|---:|---:|\n")
+    for r in records:
+        month_label = r.month_end.strftime('%Y-%m')
+        lines.append(
+            f"| {month_label} | {r.sip_date.strftime('%d %b %Y')} | Rs {format_currency(r.cumulative_invested)} | "
+            f"{r.cumulative_units:.6f} | {format_currency(r.month_end_nav)} | Rs {format_currency(r.portfolio_value)} | "
+            f"{(r.xirr_to_date*100):.2f}% |\n"
+        )
+
+    # Rolling returns section (SIP XIRR over fixed windows)
+    horizons_years = result.horizons_years
+    lines.append("\n\n## Rolling returns (XIRR) based on monthly SIP cashflows\n\n")
+    lines.append(f"Assumes monthly SIP of Rs {sip_label}; each window uses SIP cashflows within the window and terminal value at that month-end.\n\n")
+    header_cols = ["Month", "Month-end NAV"] + [f"{h}Y" for h in horizons_years]
+    lines.append("| " + " | ".join(header_cols) + " |\n")
+    lines.append("|" + "---|" * len(header_cols) + "\n")
+    for i, r in enumerate(records):
+        row = [r.month_end.strftime('%Y-%m'), format_currency(r.month_end_nav)]
         for h in horizons_years:
-            series = rolling_series[h]
-            if len(series) == 0:
-                f.write(f"| {h}Y | NA | NA | NA |\n")
-                continue
-            avg = sum(series) / len(series)
-            mn = min(series)
-            mx = max(series)
-            f.write(f"| {h}Y | {avg*100:.2f}% | {mn*100:.2f}% | {mx*100:.2f}% |\n")
+            rate_win = result.rolling[h][i]
+            row.append(f"{rate_win*100:.2f}%" if rate_win == rate_win else "NA")
+        lines.append("| " + " | ".join(row) + " |\n")
+
+    # Summary statistics for rolling SIP XIRR
+    lines.append("\n### Rolling returns summary (XIRR)\n\n")
+    lines.append("| Horizon | Average | Minimum | Maximum |\n")
+    lines.append("|---|---:|---:|---:|\n")
+    for h in horizons_years:
+        s = result.summary[h]
+        if s is None:
+            lines.append(f"| {h}Y | NA | NA | NA |\n")
+            continue
+        lines.append(f"| {h}Y | {s.average*100:.2f}% | {s.minimum*100:.2f}% | {s.maximum*100:.2f}% |\n")
+    return ''.join(lines)
+
+
+def _nan_to_none(value: float) -> Optional[float]:
+    return value if value == value else None
+
+
+def render_csv(result: SipResult) -> str:
+    # One row per month: the monthly table plus one rolling XIRR column per horizon
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(
+        ['month', 'sip_date', 'invested', 'units', 'month_end_nav', 'portfolio_value', 'xirr_to_date']
+        + [f'rolling_{h}y' for h in result.horizons_years]
+    )
+    for i, r in enumerate(result.records):
+        rates = [r.xirr_to_date] + [result.rolling[h][i] for h in result.horizons_years]
+        writer.writerow(
+            [r.month_end.strftime('%Y-%m'), r.sip_date.strftime('%Y-%m-%d'), r.cumulative_invested,
+             r.cumulative_units, r.month_end_nav, r.portfolio_value]
+            + ['' if rate != rate else rate for rate in rates]
+        )
+    return out.getvalue()
+
+
+def render_json(result: SipResult, index_label: str) -> str:
+    # Plain JSON for the front-end: ISO dates and null instead of NaN
+    horizons = [str(h) for h in result.horizons_years]
+    payload = {
+        'index': index_label,
+        'monthlyInvestment': result.monthly_investment,
+        'valuationDate': result.last_date.strftime('%Y-%m-%d'),
+        'xirr': _nan_to_none(result.xirr),
+        'months': [
+            {
+                'month': r.month_end.strftime('%Y-%m'),
+                'sipDate': r.sip_date.strftime('%Y-%m-%d'),
+                'invested': r.cumulative_invested,
+                'units': r.cumulative_units,
+                'monthEndNav': r.month_end_nav,
+                'portfolioValue': r.portfolio_value,
+                'xirrToDate': _nan_to_none(r.xirr_to_date),
+                'rolling': {f'{h}Y': _nan_to_none(result.rolling[int(h)][i]) for h in horizons},
+            }
+            for i, r in enumerate(result.records)
+        ],
+        'rollingSummary': {
+            f'{h}Y': None if s is None else {
+                'count': s.count, 'average': s.average, 'minimum': s.minimum, 'maximum': s.maximum,
+            }
+            for h, s in result.summary.items()
+        },
+    }
+    return json.dumps(payload, allow_nan=False)
+
+
+RENDERERS = {
+    'markdown': lambda result, label: render_markdown(result, label),
+    'csv': lambda result, label: render_csv(result),
+    'json': lambda result, label: render_json(result, label),
+}
+
+
+def generate_markdown(
+    md_path: str,
+    records: List[MonthlyRecord],
+    xirr_value: float,
+    last_date: datetime,
+    index_label: str,
+    horizon_workers: int = 1,
+    monthly_investment: float = 1000.0,
+):
+    result = build_sip_result(records, xirr_value, last_date, monthly_investment, HORIZONS_YEARS, horizon_workers)
+    with open(md_path, 'w') as f:
+        f.write(render_markdown(result, index_label))
+
+
+@dataclass
+class ReportJob:
+    csv_path: str
+    md_path: str
+    index_label: str
+    monthly_investment: float = 1000.0
+    use_cache: bool = True
+
+
+@dataclass
+class ReportTiming:
+    index_label: str
+    md_path: str
+    rows: int = 0
+    months: int = 0
+    read_seconds: float = 0.0
+    compute_seconds: float = 0.0
+    render_seconds: float = 0.0
+    # Inputs without any price rows (e.g. unrelated CSVs matched by a glob) are skipped, not failed
+    skipped: bool = False
+    error: str = ''
+
+    @property
+    def total_seconds(self) -> float:
+        return self.read_seconds + self.compute_seconds + self.render_seconds
+
+
+def run_report(job: ReportJob) -> ReportTiming:
+    # One index end to end; top-level so it can be shipped to a worker process
+    timing = ReportTiming(job.index_label, job.md_path)
+    try:
+        t_start = time.perf_counter()
+        prices = read_prices(job.csv_path, use_cache=job.use_cache)
+        timing.read_seconds = time.perf_counter() - t_start
+        timing.rows = len(prices)
+        if not timing.rows:
+            timing.skipped = True
+            timing.error = 'no price rows'
+            return timing
+
+        t_start = time.perf_counter()
+        cache_dir = SIP_RESULT_CACHE_DIR if job.use_cache else None
+        months = month_index_for(job.csv_path, prices, use_cache=job.use_cache)
+        result, _ = load_or_compute_sip_result(prices, job.monthly_investment, HORIZONS_YEARS, cache_dir, months=months)
+        timing.compute_seconds = time.perf_counter() - t_start
+        timing.months = len(result.records)
+
+        t_start = time.perf_counter()
+        with open(job.md_path, 'w') as f:
+            f.write(render_markdown(result, job.index_label))
+        timing.render_seconds = time.perf_counter() - t_start
+    except Exception as e:
+        timing.error = f"{type(e).__name__}: {e}"
+    return timing
+
+
+def _default_label_and_output(csv_path: str, out_dir: Optional[str] = None) -> Tuple[str, str]:
+    # NIFTY500_MOMENTUM_50_Historical.csv -> ('NIFTY500 MOMENTUM 50', '<dir>/NIFTY500_MOMENTUM_50_SIP.md')
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    for suffix in ('_Historical', '_combined'):
+        if stem.endswith(suffix):
+            stem = stem[:-len(suffix)]
+    out_dir = out_dir or os.path.dirname(os.path.abspath(csv_path))
+    return stem.replace('_', ' '), os.path.join(out_dir, f'{stem}_SIP.md')
+
+
+def jobs_from_glob(
+    pattern: str,
+    monthly_investment: float = 1000.0,
+    out_dir: Optional[str] = None,
+    use_cache: bool = True,
+) -> List[ReportJob]:
+    jobs = []
+    for csv_path in sorted(glob.glob(pattern)):
+        label, md_path = _default_label_and_output(csv_path, out_dir)
+        jobs.append(ReportJob(csv_path, md_path, label, monthly_investment, use_cache))
+    return jobs
+
+
+def jobs_from_manifest(
+    manifest_path: str,
+    monthly_investment: float = 1000.0,
+    out_dir: Optional[str] = None,
+    use_cache: bool = True,
+) -> List[ReportJob]:
+    # JSON list of {"csv": ..., "out": ..., "title": ..., "sip": ...}; only "csv" is required and
+    # relative paths are resolved against the manifest's directory
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, encoding='utf-8') as f:
+        entries = json.load(f)
+    jobs = []
+    for entry in entries:
+        csv_path = os.path.join(base_dir, entry['csv'])
+        label, md_path = _default_label_and_output(csv_path, out_dir)
+        if entry.get('out'):
+            md_path = os.path.join(base_dir, entry['out'])
+        jobs.append(ReportJob(
+            csv_path,
+            md_path,
+            entry.get('title') or label,
+            float(entry.get('sip', monthly_investment)),
+            use_cache,
+        ))
+    return jobs
+
+
+def run_batch(jobs: List[ReportJob], workers: int = 1) -> List[ReportTiming]:
+    # Indices are independent and the XIRR work is CPU-bound, so each runs in its own process
+    if workers <= 1 or len(jobs) <= 1:
+        return [run_report(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(run_report, jobs))
+
+
+def print_batch_summary(timings: List[ReportTiming], wall_seconds: float, workers: int) -> None:
+    width = max([len('Index')] + [len(t.index_label) for t in timings])
+    print(f"{'Index':<{width}}  {'Rows':>6}  {'Months':>6}  {'Read ms':>8}  {'SIP ms':>8}  {'Markdown ms':>11}  {'Total ms':>9}")
+    for t in timings:
+        if t.error:
+            print(f"{t.index_label:<{width}}  {'skipped' if t.skipped else 'failed'}: {t.error}")
+            continue
+        print(
+            f"{t.index_label:<{width}}  {t.rows:>6}  {t.months:>6}  {t.read_seconds * 1000:>8.1f}  "
+            f"{t.compute_seconds * 1000:>8.1f}  {t.render_seconds * 1000:>11.1f}  {t.total_seconds * 1000:>9.1f}"
+        )
+    busy = sum(t.total_seconds for t in timings)
+    print(f"{len(timings)} indices, {workers} worker(s): {wall_seconds:.2f} s wall, {busy:.2f} s of report work")
 
 
 def main():
     import argparse
 
-    parser = argparse.ArgumentParser(description='Generate SIP markdown for an index time series CSV.')
+    parser = argparse.ArgumentParser(description='Generate a SIP report (markdown, CSV or JSON) for an index time series CSV.')
     parser.add_argument('--csv', dest='csv_path', default='./NIFTY500_VALUE_50_combined.csv', help='Path to CSV input file')
-    parser.add_argument('--out', dest='md_path', default='./NIFTY500_VALUE_50_SIP.md', help='Path to output markdown file')
+    parser.add_argument('--out', dest='md_path', default='./NIFTY500_VALUE_50_SIP.md', help='Path to output report file')
     parser.add_argument('--title', dest='index_label', default='NIFTY500 VALUE 50', help='Index label to show in markdown header')
     parser.add_argument('--sip', dest='monthly_investment', type=float, default=1000.0, help='Monthly SIP amount')
+    parser.add_argument('--format', dest='output_format', choices=sorted(RENDERERS), default='markdown', help='Report format')
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false', help='Always parse and recompute; do not read or write the price or result caches')
+    parser.add_argument('--horizon-workers', type=int, default=1, help='Worker processes for the rolling-return horizons (1 = serial)')
+    batch = parser.add_argument_group('batch mode', 'Generate reports for many indices at once; --csv/--out/--title are ignored')
+    batch.add_argument('--manifest', help='JSON list of {"csv", "out", "title", "sip"} entries')
+    batch.add_argument('--glob', dest='glob_pattern', help="CSV glob, e.g. './*.csv'; titles and outputs are derived from file names")
+    batch.add_argument('--out-dir', help='Directory for batch markdown outputs (default: next to each CSV)')
+    batch.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Worker processes for batch mode')
 
     args = parser.parse_args()
 
-    prices = read_prices(args.csv_path)
-    records, cashflows, last_date, _ = compute_monthly_sip(prices, args.monthly_investment)
-    rate = xirr(cashflows)
-    generate_markdown(args.md_path, records, rate, last_date, args.index_label)
+    if args.manifest or args.glob_pattern:
+        if args.manifest:
+            jobs = jobs_from_manifest(args.manifest, args.monthly_investment, args.out_dir, args.use_cache)
+        else:
+            jobs = jobs_from_glob(args.glob_pattern, args.monthly_investment, args.out_dir, args.use_cache)
+        t_start = time.perf_counter()
+        timings = run_batch(jobs, args.jobs)
+        print_batch_summary(timings, time.perf_counter() - t_start, args.jobs)
+        if any(t.error and not t.skipped for t in timings):
+            raise SystemExit("Some reports failed")
+        return
+
+    prices = read_prices(args.csv_path, use_cache=args.use_cache)
+    result, _ = load_or_compute_sip_result(
+        prices,
+        args.monthly_investment,
+        HORIZONS_YEARS,
+        SIP_RESULT_CACHE_DIR if args.use_cache else None,
+        args.horizon_workers,
+        month_index_for(args.csv_path, prices, use_cache=args.use_cache),
+    )
+    with open(args.md_path, 'w') as f:
+        f.write(RENDERERS[args.output_format](result, args.index_label))
 
 
 if __name__ == '__main__':
     main()
-
-
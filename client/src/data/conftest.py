@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import pytest
+
+
+class StubBackpage:
+    # Stand-in for niftyindices.com: any GET sets a cookie, a POST with a cinfo payload returns
+    # {"d": "<JSON array>"} with one row per weekday of the requested range, newest first
+    def __init__(self) -> None:
+        self.requests: List[Dict] = []
+        self.fail_next: List[int] = []
+        self.mode = 'rows'
+        self.delay = 0.0
+        self.inflight = 0
+        self.max_inflight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                with stub.lock:
+                    stub.requests.append({'method': 'GET', 'path': self.path, 'headers': dict(self.headers)})
+                self._send(200, 'text/html', '<html></html>', {'Set-Cookie': 'ASP.NET_SessionId=stub; Path=/'})
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with stub.lock:
+                    stub.requests.append({
+                        'method': 'POST',
+                        'path': self.path,
+                        'headers': dict(self.headers),
+                        'cinfo': body.get('cinfo', ''),
+                        'time': time.monotonic(),
+                    })
+                    status = stub.fail_next.pop(0) if stub.fail_next else None
+                    stub.inflight += 1
+                    stub.max_inflight = max(stub.max_inflight, stub.inflight)
+                try:
+                    if stub.delay:
+                        time.sleep(stub.delay)
+                    if status is not None:
+                        self._send(status, 'text/plain', 'busy')
+                    elif stub.mode == 'blocked':
+                        self._send(200, 'application/json', json.dumps({'d': '<html>Access Denied</html>'}))
+                    else:
+                        rows = [] if stub.mode == 'empty' else stub.rows(body.get('cinfo', ''))
+                        self._send(200, 'application/json', json.dumps({'d': json.dumps(rows)}))
+                finally:
+                    with stub.lock:
+                        stub.inflight -= 1
+
+            def _send(self, status: int, content_type: str, body: str, extra: Optional[Dict[str, str]] = None) -> None:
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                for k, v in (extra or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.url = f"{self.base_url}/Backpage.aspx/getHistoricaldatatabletoString"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    @staticmethod
+    def parse_cinfo(cinfo: str) -> Dict[str, str]:
+        return dict(part.split(':', 1) for part in cinfo.strip('{}').replace("'", '').split(','))
+
+    @classmethod
+    def rows(cls, cinfo: str) -> List[Dict[str, str]]:
+        info = cls.parse_cinfo(cinfo)
+        first = datetime.strptime(info['startDate'], '%d-%b-%Y')
+        d = datetime.strptime(info['endDate'], '%d-%b-%Y')
+        out = []
+        while d >= first:
+            if d.weekday() < 5:
+                out.append({
+                    'INDEX_NAME': info['indexName'],
+                    'HistoricalDate': d.strftime('%d %b %Y'),
+                    'CLOSE': f"{100 + d.toordinal() % 97:.2f}",
+                })
+            d -= timedelta(days=1)
+        return out
+
+    def posts(self) -> List[Dict]:
+        return [r for r in self.requests if r['method'] == 'POST']
+
+
+@pytest.fixture
+def backpage():
+    stub = StubBackpage()
+    stub.thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
@@ -0,0 +1,117 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+
+# Accepted shapes, all day-first: '%d %b %Y', '%d-%b-%Y', '%d %B %Y', '%d-%B-%Y' and '%d-%m-%Y'
+_MONTHS = {
+    name.lower(): i + 1
+    for i, name in enumerate(
+        ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    )
+}
+_MONTHS.update(
+    {
+        name.lower(): i + 1
+        for i, name in enumerate(
+            [
+                "January", "February", "March", "April", "May", "June",
+                "July", "August", "September", "October", "November", "December",
+            ]
+        )
+    }
+)
+
+# Distinct trading dates are few (~250 a year) and repeat across every index file
+CACHE_SIZE = 32768
+
+
+def _parse(s: str) -> Optional[datetime]:
+    s = s.strip()
+    sep = " " if " " in s else "-"
+    parts = s.split(sep)
+    if len(parts) != 3:
+        return None
+    day_str, month_str, year_str = parts
+    if not (day_str.isdigit() and year_str.isdigit() and len(day_str) <= 2 and len(year_str) == 4):
+        return None
+    if month_str.isdigit():
+        if sep != "-" or len(month_str) > 2:
+            return None
+        month = int(month_str)
+    else:
+        month = _MONTHS.get(month_str.lower())
+        if month is None:
+            return None
+    try:
+        return datetime(int(year_str), month, int(day_str))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_index_date(s: str) -> Optional[datetime]:
+    return _parse(s)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_index_ordinal(s: str) -> Optional[int]:
+    d = parse_index_date(s)
+    return d.toordinal() if d is not None else None
+
+
+def microbenchmark(csv_path: str, repeat: int = 5) -> None:
+    import csv
+    import time
+
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        from index_csv import ColumnMap
+
+        columns = ColumnMap.sniff(next(reader))
+        if columns is None:
+            raise SystemExit(f"No date column found in {csv_path}")
+        col = columns.date[0]
+        values = [row[col] for row in reader if len(row) > col]
+
+    def strptime_any(s: str) -> Optional[datetime]:
+        for fmt in ("%d %b %Y", "%d-%b-%Y", "%d-%m-%Y", "%d %B %Y", "%d-%B-%Y"):
+            try:
+                return datetime.strptime(s.strip(), fmt)
+            except ValueError:
+                pass
+        return None
+
+    def timed(fn) -> float:
+        best = float('inf')
+        for _ in range(repeat):
+            t_start = time.perf_counter()
+            for v in values:
+                fn(v)
+            best = min(best, time.perf_counter() - t_start)
+        return best
+
+    assert all(strptime_any(v) == _parse(v) for v in values)
+    t_strptime = timed(lambda v: datetime.strptime(v.strip(), "%d %b %Y"))
+    t_strptime_any = timed(strptime_any)
+    t_hand = timed(_parse)
+    parse_index_date.cache_clear()
+    t_cached = timed(parse_index_date)
+    n = len(values)
+    print(f"Parsed {n} dates, best of {repeat}")
+    for label, t in (
+        ("strptime (single format)", t_strptime),
+        ("strptime (format loop)", t_strptime_any),
+        ("hand-written parser", t_hand),
+        ("hand-written + LRU cache", t_cached),
+    ):
+        print(f"{label:>26}: {t * 1000:7.2f} ms ({t / n * 1e9:6.0f} ns/date)")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark index date parsing against datetime.strptime.')
+    parser.add_argument('--csv', dest='csv_path', default='./NIFTY500_VALUE_50_combined.csv', help='Path to CSV input file')
+    args = parser.parse_args()
+    microbenchmark(args.csv_path)
@@ -1,13 +1,20 @@
+import io
 import os
 import csv
 import time
 import json
+import shutil
+import tempfile
 import datetime as dt
 from typing import List, Dict, Optional, Tuple
 import argparse
 
 import requests
 
+from date_parsing import parse_index_date
+from index_csv import DATE_COLUMNS, find_column
+from http_cache import default_cache, ttl_for_range
+
 
 URL = "https://niftyindices.com/Backpage.aspx/getHistoricaldatatabletoString"
 
@@ -50,45 +57,54 @@ def build_cinfo(start_date: dt.date, end_date: dt.date) -> str:
 
 def fetch_year_payload(start_date: dt.date, end_date: dt.date, session: requests.Session) -> str:
     global _SESSION_WARMED_UP
-    if not _SESSION_WARMED_UP:
-        try:
-            session.get(HEADERS.get("Referer", "https://niftyindices.com/"), headers={
-                k: v for k, v in HEADERS.items() if k not in ("Content-Type",)
-            }, timeout=30)
-        except Exception:
-            pass
-        _SESSION_WARMED_UP = True
-
     payload = {"cinfo": build_cinfo(start_date, end_date)}
-    headers = dict(HEADERS)
-    if COOKIE_HEADER:
-        headers["Cookie"] = COOKIE_HEADER
-
-    last_exc: Optional[Exception] = None
-    for attempt in range(3):
-        try:
-            resp = session.post(URL, headers=headers, json=payload, timeout=60)
-            if resp.status_code >= 500:
-                time.sleep(1.0 * (attempt + 1))
-                continue
-            resp.raise_for_status()
-            data = resp.json()
-            break
-        except Exception as e:
-            last_exc = e
-            time.sleep(1.0 * (attempt + 1))
+    cache = default_cache()
+    key = cache.key("POST", URL, payload=payload)
+    resp = cache.get(key)
+    from_cache = resp is not None
+    if from_cache:
+        data = resp.json()
     else:
-        if last_exc:
-            raise last_exc
-        raise RuntimeError("Failed to fetch after retries")
+        if not _SESSION_WARMED_UP:
+            try:
+                session.get(HEADERS.get("Referer", "https://niftyindices.com/"), headers={
+                    k: v for k, v in HEADERS.items() if k not in ("Content-Type",)
+                }, timeout=30)
+            except Exception:
+                pass
+            _SESSION_WARMED_UP = True
+
+        headers = dict(HEADERS)
+        if COOKIE_HEADER:
+            headers["Cookie"] = COOKIE_HEADER
+
+        last_exc: Optional[Exception] = None
+        for attempt in range(3):
+            try:
+                resp = session.post(URL, headers=headers, json=payload, timeout=60)
+                if resp.status_code >= 500:
+                    time.sleep(1.0 * (attempt + 1))
+                    continue
+                resp.raise_for_status()
+                data = resp.json()
+                break
+            except Exception as e:
+                last_exc = e
+                time.sleep(1.0 * (attempt + 1))
+        else:
+            if last_exc:
+                raise last_exc
+            raise RuntimeError("Failed to fetch after retries")
     html_or_json = data.get("d") if isinstance(data, dict) else None
     if not html_or_json:
         html_or_json = data.get("Data") if isinstance(data, dict) else None
     if not html_or_json or not isinstance(html_or_json, str):
         try:
-            return resp.text
+            html_or_json = resp.text
         except Exception:
             raise RuntimeError(f"Unexpected response schema: {json.dumps(data)[:500]}")
+    if not from_cache and yields_rows(html_or_json):
+        cache.put(key, resp, ttl_for_range(end_date))
     return html_or_json
 
 
@@ -170,6 +186,15 @@ def parse_table_or_json_to_rows(content: str) -> Tuple[List[str], List[Dict[str,
         ) from e
 
 
+def yields_rows(content: str) -> bool:
+    # Only payloads that parse into at least one row are cached, so block pages and empty
+    # tables are refetched next time
+    try:
+        return bool(parse_table_or_json_to_rows(content)[1])
+    except Exception:
+        return False
+
+
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
@@ -182,11 +207,162 @@ def write_csv(path: str, headers: List[str], rows: List[Dict[str, str]]) -> None
             writer.writerow(row)
 
 
+def find_date_key(headers: List[str]) -> Optional[str]:
+    return find_column(headers, DATE_COLUMNS)
+
+
+def parse_date_any(s: str) -> Tuple[int, int, int]:
+    d = parse_index_date(s)
+    if d is None:
+        return (0, 0, 0)
+    return (d.year, d.month, d.day)
+
+
+def read_csv(path: str) -> Tuple[List[str], List[Dict[str, str]]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        return list(reader.fieldnames or []), rows
+
+
+def latest_date(headers: List[str], rows: List[Dict[str, str]]) -> Optional[dt.date]:
+    date_key = find_date_key(headers)
+    if date_key is None:
+        return None
+    parsed = [parse_index_date(r.get(date_key, "")) for r in rows]
+    dates = [d.date() for d in parsed if d is not None]
+    return max(dates) if dates else None
+
+
+def merge_rows(
+    cached: Tuple[List[str], List[Dict[str, str]]],
+    fresh: Tuple[List[str], List[Dict[str, str]]],
+) -> Tuple[List[str], List[Dict[str, str]]]:
+    # Union of headers; rows de-duplicated by date with fresh rows winning
+    headers = list(cached[0])
+    for h in fresh[0]:
+        if h not in headers:
+            headers.append(h)
+    date_key = find_date_key(headers)
+    if date_key is None:
+        return headers, cached[1] + fresh[1]
+    by_date: Dict[str, Dict[str, str]] = {}
+    for r in cached[1] + fresh[1]:
+        by_date[r.get(date_key, "")] = r
+    return headers, list(by_date.values())
+
+
+def _read_csv_tail(path: str) -> Tuple[List[str], Optional[List[str]], Optional[List[str]], str, bool]:
+    # Header, first and last data rows, line terminator and whether the file ends with a
+    # newline, without reading the whole file
+    with open(path, "rb") as f:
+        first_line = f.readline()
+        terminator = "\r\n" if first_line.endswith(b"\r\n") else "\n"
+        header = next(csv.reader([first_line.decode("utf-8-sig")]), [])
+        second_line = f.readline().decode("utf-8", errors="ignore")
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 4096))
+        tail = f.read()
+    ends_with_newline = tail.endswith(b"\n")
+    lines = [ln for ln in tail.decode("utf-8", errors="ignore").splitlines() if ln.strip()]
+    if not second_line.strip() or (len(lines) < 2 and size <= 4096):
+        return header, None, None, terminator, ends_with_newline
+    first = next(csv.reader([second_line]), None)
+    last = next(csv.reader([lines[-1]]), None)
+    return header, first, last, terminator, ends_with_newline
+
+
+def append_to_combined(
+    combined_csv: str,
+    headers: List[str],
+    rows: List[Dict[str, str]],
+    sort_order: str = "asc",
+) -> Optional[int]:
+    # Add the rows dated after the combined CSV's newest row without re-sorting or re-parsing
+    # the file. Ascending files get the rows appended at the end; descending files get them
+    # as a block under the header, written to a temp file with the old body copied byte for
+    # byte, then renamed over the original. Only possible when the file is already in
+    # `sort_order` and every one of its columns is present in `headers`.
+    # Returns the number of rows added, or None if the file has to be rewritten instead.
+    if not os.path.exists(combined_csv):
+        return None
+    header, first, last, terminator, ends_with_newline = _read_csv_tail(combined_csv)
+    date_key = find_date_key(header)
+    if date_key is None or first is None or last is None:
+        return None
+    if len(first) != len(header) or len(last) != len(header):
+        return None
+    if not all(h in headers for h in header):
+        return None
+    first_key = parse_date_any(first[header.index(date_key)])
+    last_key = parse_date_any(last[header.index(date_key)])
+    if last_key == (0, 0, 0) or first_key == (0, 0, 0):
+        return None
+    descending = sort_order.lower() == "desc"
+    if (first_key < last_key and descending) or (first_key > last_key and not descending):
+        # The file is in the other order: rewrite it
+        return None
+    newest = first_key if descending else last_key
+    keyed = [(parse_date_any(r.get(date_key, "")), r) for r in rows]
+    new_rows = sorted((kr for kr in keyed if kr[0] > newest), key=lambda kr: kr[0], reverse=descending)
+    if not new_rows:
+        return 0
+
+    if not descending:
+        with open(combined_csv, "a", newline="", encoding="utf-8") as f:
+            if not ends_with_newline:
+                # Do not glue the first appended row onto an unterminated last line
+                f.write(terminator)
+            writer = csv.DictWriter(f, fieldnames=header, extrasaction="ignore", lineterminator=terminator)
+            for _, row in new_rows:
+                writer.writerow(row)
+        return len(new_rows)
+
+    block = io.StringIO()
+    writer = csv.DictWriter(block, fieldnames=header, extrasaction="ignore", lineterminator=terminator)
+    for _, row in new_rows:
+        writer.writerow(row)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(combined_csv)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out, open(combined_csv, "rb") as src:
+            out.write(src.readline())
+            out.write(block.getvalue().encode("utf-8"))
+            shutil.copyfileobj(src, out)
+        os.replace(tmp_path, combined_csv)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(new_rows)
+
+
+def _last_weekday(year: int) -> dt.date:
+    d = dt.date(year, 12, 31)
+    while d.weekday() >= 5:
+        d -= dt.timedelta(days=1)
+    return d
+
+
+def closed_year_complete(year: int, cached: Tuple[List[str], List[Dict[str, str]]], path: str) -> bool:
+    # A cached closed year is final only if it reaches the year's last weekday (the last
+    # possible trading day) or was written after the year ended; a file fetched while the year
+    # was still running would otherwise stay frozen without its final sessions
+    last_cached = latest_date(*cached)
+    if last_cached is not None and last_cached >= _last_weekday(year):
+        return True
+    try:
+        written = dt.date.fromtimestamp(os.path.getmtime(path))
+    except OSError:
+        return False
+    return written > dt.date(year, 12, 31)
+
+
 def main(
     user_start_year: Optional[int] = None,
     user_end_year: Optional[int] = None,
     only_years: Optional[List[int]] = None,
     sort_order: str = "desc",
+    incremental: bool = False,
 ) -> None:
     workspace_root = os.path.dirname(os.path.abspath(__file__))
     data_dir = os.path.join(workspace_root, "data_NIFTY500_MOMENTUM_50")
@@ -195,10 +371,11 @@ def main(
     current_year = dt.date.today().year
     today = dt.date.today()
     start_year = 2005 if user_start_year is None else user_start_year
-    end_year = 2025 if user_end_year is None else user_end_year
+    end_year = current_year if user_end_year is None else user_end_year
 
     all_rows: List[Dict[str, str]] = []
     unified_headers: List[str] = []
+    requests_made = 0
 
     with requests.Session() as session:
         if only_years is not None and len(only_years) > 0:
@@ -217,56 +394,70 @@ def main(
             else:
                 end_date = today
 
-            print(
-                f"Fetching {year}: {format_nse_date(start_date)} to {format_nse_date(end_date)}"
-            )
-
-            body = fetch_year_payload(start_date, end_date, session)
-
-            # Save raw response per year
-            raw_path = os.path.join(data_dir, f"historical_{year}.raw")
-            with open(raw_path, "w", encoding="utf-8") as f:
-                f.write(body)
-
-            headers, rows = parse_table_or_json_to_rows(body)
-
-            # Persist per-year CSV
             year_csv_path = os.path.join(data_dir, f"historical_{year}.csv")
-            write_csv(year_csv_path, headers, rows)
+            cached = read_csv(year_csv_path) if incremental and os.path.exists(year_csv_path) else None
+
+            if cached is not None and year < current_year and closed_year_complete(year, cached, year_csv_path):
+                # Complete closed years never change, so the per-year CSV is an immutable cache hit
+                headers, rows = cached
+                print(f"Cached {year}: {len(rows)} rows")
+            else:
+                fetch_start = start_date
+                if cached is not None:
+                    last_cached = latest_date(*cached)
+                    if last_cached is not None:
+                        fetch_start = max(start_date, last_cached + dt.timedelta(days=1))
+
+                if cached is not None and fetch_start > end_date:
+                    headers, rows = cached
+                    print(f"Up to date {year}: {len(rows)} rows")
+                else:
+                    print(
+                        f"Fetching {year}: {format_nse_date(fetch_start)} to {format_nse_date(end_date)}"
+                    )
+
+                    body = fetch_year_payload(fetch_start, end_date, session)
+                    requests_made += 1
+
+                    headers, rows = parse_table_or_json_to_rows(body)
+
+                    if cached is None:
+                        # Save raw response per year (delta responses only cover part of the year)
+                        raw_path = os.path.join(data_dir, f"historical_{year}.raw")
+                        with open(raw_path, "w", encoding="utf-8") as f:
+                            f.write(body)
+                    else:
+                        headers, rows = merge_rows(cached, (headers, rows))
+
+                    # Persist per-year CSV
+                    write_csv(year_csv_path, headers, rows)
+                    time.sleep(0.6)
 
             for h in headers:
                 if h not in unified_headers:
                     unified_headers.append(h)
 
             all_rows.extend(rows)
-            time.sleep(0.6)
+
+    combined_csv = os.path.join(workspace_root, "NIFTY500_MOMENTUM_50_Historical.csv")
+    if incremental:
+        appended = append_to_combined(combined_csv, unified_headers, all_rows, sort_order)
+        if appended is not None:
+            print(f"Added {appended} new rows to combined CSV: {combined_csv} ({requests_made} requests)")
+            print(f"Per-year files located in: {data_dir}")
+            print(default_cache().stats_line())
+            return
 
     # Try to sort by a date-like column if present
-    date_key_candidates = [
-        "Date",
-        "DATE",
-        "Index Date",
-        "Index date",
-        "HistoricalDate",
-    ]
-    date_key: Optional[str] = next((k for k in date_key_candidates if k in unified_headers), None)
+    date_key = find_date_key(unified_headers)
     if date_key:
-        def parse_date_any(s: str) -> Tuple[int, int, int]:
-            for fmt in ("%d-%b-%Y", "%d %b %Y", "%d-%B-%Y", "%d %B %Y"):
-                try:
-                    d = dt.datetime.strptime(s, fmt).date()
-                    return (d.year, d.month, d.day)
-                except Exception:
-                    pass
-            return (0, 0, 0)
-
         all_rows.sort(key=lambda r: parse_date_any(r.get(date_key, "")), reverse=(sort_order.lower() == "desc"))
 
-    combined_csv = os.path.join(workspace_root, "NIFTY500_MOMENTUM_50_Historical.csv")
     write_csv(combined_csv, unified_headers, all_rows)
 
     print(f"Combined CSV written to: {combined_csv}")
     print(f"Per-year files located in: {data_dir}")
+    print(default_cache().stats_line())
 
 
 if __name__ == "__main__":
@@ -293,6 +484,12 @@ if __name__ == "__main__":
         type=int,
         help="Last year to download (inclusive)",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse cached per-year CSVs for closed years, only fetch the current year from its last cached date, "
+        "and add just the new rows to a combined CSV already in --sort order",
+    )
     parser.add_argument(
         "--sort",
         type=str,
@@ -312,10 +509,10 @@ if __name__ == "__main__":
                 raise SystemExit(f"Invalid year in --years: {p}")
         if not year_list:
             raise SystemExit("No valid years provided to --years")
-        main(only_years=year_list, sort_order=args.sort)
+        main(only_years=year_list, sort_order=args.sort, incremental=args.incremental)
     elif args.year is not None:
-        main(args.year, args.year, sort_order=args.sort)
+        main(args.year, args.year, sort_order=args.sort, incremental=args.incremental)
     else:
-        main(args.start_year, args.end_year, sort_order=args.sort)
+        main(args.start_year, args.end_year, sort_order=args.sort, incremental=args.incremental)
 
 
@@ -3,10 +3,14 @@ import csv
 import time
 import json
 import datetime as dt
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Tuple
 
 import requests
 
+from date_parsing import parse_index_date
+from index_csv import DATE_COLUMNS, find_column
+from http_cache import default_cache, ttl_for_range
+
 
 URL = "https://niftyindices.com/Backpage.aspx/getHistoricaldatatabletoString"
 
@@ -50,8 +54,13 @@ def fetch_year_payload(start_date: dt.date, end_date: dt.date, session: requests
     headers = dict(HEADERS)
     if COOKIE_HEADER:
         headers["Cookie"] = COOKIE_HEADER
-    resp = session.post(URL, headers=headers, json=payload, timeout=60)
-    resp.raise_for_status()
+    cache = default_cache()
+    key = cache.key("POST", URL, payload=payload)
+    resp = cache.get(key)
+    from_cache = resp is not None
+    if resp is None:
+        resp = session.post(URL, headers=headers, json=payload, timeout=60)
+        resp.raise_for_status()
     data = resp.json()
     html_or_json = data.get("d") if isinstance(data, dict) else None
     if not html_or_json:
@@ -60,9 +69,11 @@ def fetch_year_payload(start_date: dt.date, end_date: dt.date, session: requests
         # Some responses directly return a JSON array as string (already saved in raw)
         # Try to return stringified body
         try:
-            return resp.text
+            html_or_json = resp.text
         except Exception:
             raise RuntimeError(f"Unexpected response schema: {json.dumps(data)[:500]}")
+    if not from_cache and yields_rows(html_or_json):
+        cache.put(key, resp, ttl_for_range(end_date))
     return html_or_json
 
 
@@ -144,6 +155,15 @@ def parse_table_or_json_to_rows(content: str) -> Tuple[List[str], List[Dict[str,
         ) from e
 
 
+def yields_rows(content: str) -> bool:
+    # Only payloads that parse into at least one row are cached, so block pages and empty
+    # tables are refetched next time
+    try:
+        return bool(parse_table_or_json_to_rows(content)[1])
+    except Exception:
+        return False
+
+
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
@@ -206,24 +226,13 @@ def main() -> None:
             time.sleep(0.6)
 
     # Try to sort by a date-like column if present
-    date_key_candidates = [
-        "Date",
-        "DATE",
-        "Index Date",
-        "Index date",
-        "HistoricalDate",
-    ]
-    date_key: Optional[str] = next((k for k in date_key_candidates if k in unified_headers), None)
+    date_key = find_column(unified_headers, DATE_COLUMNS)
     if date_key:
         def parse_date_any(s: str) -> Tuple[int, int, int]:
-            # Try multiple common formats
-            for fmt in ("%d-%b-%Y", "%d %b %Y", "%d-%B-%Y", "%d %B %Y"):
-                try:
-                    d = dt.datetime.strptime(s, fmt).date()
-                    return (d.year, d.month, d.day)
-                except Exception:
-                    pass
-            return (0, 0, 0)
+            d = parse_index_date(s)
+            if d is None:
+                return (0, 0, 0)
+            return (d.year, d.month, d.day)
 
         all_rows.sort(key=lambda r: parse_date_any(r.get(date_key, "")))
 
@@ -232,6 +241,7 @@ def main() -> None:
 
     print(f"Combined CSV written to: {combined_csv}")
     print(f"Per-year files located in: {data_dir}")
+    print(default_cache().stats_line())
 
 
 if __name__ == "__main__":
@@ -3,10 +3,14 @@ import csv
 import time
 import json
 import datetime as dt
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Tuple
 
 import requests
 
+from date_parsing import parse_index_date
+from index_csv import DATE_COLUMNS, find_column
+from http_cache import default_cache, ttl_for_range
+
 
 URL = "https://niftyindices.com/Backpage.aspx/getHistoricaldatatabletoString"
 
@@ -56,8 +60,13 @@ def fetch_year_html(start_date: dt.date, end_date: dt.date, session: requests.Se
     payload = {"cinfo": build_cinfo(start_date, end_date)}
     headers = dict(HEADERS)
     headers["Cookie"] = COOKIE_HEADER
-    resp = session.post(URL, headers=headers, json=payload, timeout=60)
-    resp.raise_for_status()
+    cache = default_cache()
+    key = cache.key("POST", URL, payload=payload)
+    resp = cache.get(key)
+    from_cache = resp is not None
+    if resp is None:
+        resp = session.post(URL, headers=headers, json=payload, timeout=60)
+        resp.raise_for_status()
     data = resp.json()
     # API typically returns HTML table string in key 'd'
     html_str = data.get("d") if isinstance(data, dict) else None
@@ -66,6 +75,8 @@ def fetch_year_html(start_date: dt.date, end_date: dt.date, session: requests.Se
         html_str = data.get("Data") if isinstance(data, dict) else None
     if not html_str or not isinstance(html_str, str):
         raise RuntimeError(f"Unexpected response schema: {json.dumps(data)[:500]}")
+    if not from_cache and yields_rows(html_str):
+        cache.put(key, resp, ttl_for_range(end_date))
     return html_str
 
 
@@ -164,6 +175,15 @@ def parse_table_or_json_to_rows(content: str) -> Tuple[List[str], List[Dict[str,
         ) from e
 
 
+def yields_rows(content: str) -> bool:
+    # Only payloads that parse into at least one row are cached, so block pages and empty
+    # tables are refetched next time
+    try:
+        return bool(parse_table_or_json_to_rows(content)[1])
+    except Exception:
+        return False
+
+
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
@@ -226,20 +246,13 @@ def main() -> None:
             time.sleep(0.6)
 
     # Optional: sort by Date column if present (descending -> ascending)
-    date_key_candidates = [
-        "Date",
-        "DATE",
-        "Index Date",
-        "Index date",
-    ]
-    date_key: Optional[str] = next((k for k in date_key_candidates if k in unified_headers), None)
+    date_key = find_column(unified_headers, DATE_COLUMNS)
     if date_key:
         def parse_date_str(s: str) -> Tuple[int, int, int]:
-            try:
-                d = dt.datetime.strptime(s, "%d-%b-%Y").date()
-                return (d.year, d.month, d.day)
-            except Exception:
+            d = parse_index_date(s)
+            if d is None:
                 return (0, 0, 0)
+            return (d.year, d.month, d.day)
 
         all_rows.sort(key=lambda r: parse_date_str(r.get(date_key, "")))
 
@@ -251,6 +264,7 @@ def main() -> None:
 
     print(f"Combined CSV written to: {combined_csv}")
     print(f"Per-year files located in: {data_dir}")
+    print(default_cache().stats_line())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,321 @@
+import argparse
+import asyncio
+import datetime as dt
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+
+from date_parsing import parse_index_date
+from download_nifty500_momentum50_yearly import (
+    COOKIE_HEADER,
+    HEADERS,
+    URL,
+    ensure_dir,
+    format_nse_date,
+    parse_table_or_json_to_rows,
+    write_csv,
+    yields_rows,
+)
+from http_cache import CachedResponse, default_cache, ttl_for_range
+from index_csv import DATE_COLUMNS, find_column
+
+
+@dataclass
+class IndexSpec:
+    # `name` and `index_name` are the two identifiers the Backpage API expects in cinfo;
+    # `stem` names the per-year directory and the combined CSV
+    name: str
+    index_name: str
+    stem: str
+
+
+DEFAULT_INDICES = [
+    IndexSpec("NIFTY 50", "NIFTY 50", "NIFTY50"),
+    IndexSpec("NIFTY500MOMENTM50", "NIFTY500 MOMENTUM 50", "NIFTY500_MOMENTUM_50"),
+    IndexSpec("NIFTY MULTI MQ 50", "NIFTY500 MULTICAP MOMENTUM QUALITY 50", "NIFTY500_MULTICAP_MOMENTUM_QUALITY_50"),
+]
+
+
+def build_cinfo(spec: IndexSpec, start_date: dt.date, end_date: dt.date) -> str:
+    return (
+        "{"
+        f"'name':'{spec.name}',"
+        f"'startDate':'{format_nse_date(start_date)}',"
+        f"'endDate':'{format_nse_date(end_date)}',"
+        f"'indexName':'{spec.index_name}'"
+        "}"
+    )
+
+
+def year_bounds(year: int, today: dt.date) -> Tuple[dt.date, dt.date]:
+    end_date = dt.date(year, 12, 31) if year < today.year else today
+    return dt.date(year, 1, 1), end_date
+
+
+def site_headers(url: str) -> Dict[str, str]:
+    # HEADERS with Origin and Referer moved onto the host serving `url`, so a --url override
+    # warms up and posts against the same site
+    parts = urlparse(url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    headers = dict(HEADERS)
+    headers["Origin"] = origin
+    headers["Referer"] = origin + urlparse(HEADERS["Referer"]).path
+    return headers
+
+
+def unwrap_payload(resp: Union[requests.Response, CachedResponse]) -> str:
+    data = resp.json()
+    html_or_json = data.get("d") if isinstance(data, dict) else None
+    if not html_or_json:
+        html_or_json = data.get("Data") if isinstance(data, dict) else None
+    if not html_or_json or not isinstance(html_or_json, str):
+        try:
+            return resp.text
+        except Exception:
+            raise RuntimeError(f"Unexpected response schema: {json.dumps(data)[:500]}")
+    return html_or_json
+
+
+class HostLimiter:
+    # One semaphore per host, so concurrency is capped per host rather than globally
+    def __init__(self, per_host: int) -> None:
+        self.per_host = per_host
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def __call__(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self._semaphores[host]
+
+
+class AsyncBackpageDownloader:
+    def __init__(
+        self,
+        url: str = URL,
+        max_per_host: int = 4,
+        retries: int = 3,
+        backoff: float = 1.0,
+    ) -> None:
+        self.url = url
+        self.headers = site_headers(url)
+        self.retries = retries
+        self.backoff = backoff
+        self.limiter = HostLimiter(max_per_host)
+        self._sessions: "asyncio.Queue[requests.Session]" = asyncio.Queue()
+        self._all_sessions: List[requests.Session] = []
+        self._pool_size = max_per_host
+
+    async def open(self) -> None:
+        # requests is blocking, so each in-flight request runs in a worker thread with its own
+        # session; only the first session visits the referer page, the others copy its cookies
+        warm = requests.Session()
+        try:
+            await asyncio.to_thread(
+                warm.get,
+                self.headers["Referer"],
+                headers={k: v for k, v in self.headers.items() if k not in ("Content-Type",)},
+                timeout=30,
+            )
+        except Exception:
+            pass
+        self._all_sessions.append(warm)
+        for _ in range(self._pool_size - 1):
+            s = requests.Session()
+            s.cookies.update(warm.cookies)
+            self._all_sessions.append(s)
+        for s in self._all_sessions:
+            self._sessions.put_nowait(s)
+
+    def close(self) -> None:
+        for s in self._all_sessions:
+            s.close()
+
+    async def fetch(self, cinfo: str, ttl: Optional[float] = None) -> str:
+        payload = {"cinfo": cinfo}
+        cache = default_cache()
+        key = cache.key("POST", self.url, payload=payload)
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return unwrap_payload(cached)
+
+        headers = dict(self.headers)
+        if COOKIE_HEADER:
+            headers["Cookie"] = COOKIE_HEADER
+
+        last_exc: Optional[Exception] = None
+        for attempt in range(self.retries):
+            async with self.limiter(self.url):
+                session = await self._sessions.get()
+                try:
+                    resp = await asyncio.to_thread(session.post, self.url, headers=headers, json=payload, timeout=60)
+                    if resp.status_code < 500:
+                        resp.raise_for_status()
+                        body = unwrap_payload(resp)
+                        if await asyncio.to_thread(yields_rows, body):
+                            await asyncio.to_thread(cache.put, key, resp, ttl)
+                        return body
+                    last_exc = RuntimeError(f"HTTP {resp.status_code} from {self.url}")
+                except Exception as e:
+                    last_exc = e
+                finally:
+                    self._sessions.put_nowait(session)
+            # Back off outside the semaphore so other requests can proceed
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+        raise last_exc if last_exc else RuntimeError("Failed to fetch after retries")
+
+
+async def _fetch_and_store(
+    downloader: AsyncBackpageDownloader,
+    spec: IndexSpec,
+    year: int,
+    today: dt.date,
+    data_dir: str,
+) -> Tuple[IndexSpec, int, List[str], List[Dict[str, str]]]:
+    start_date, end_date = year_bounds(year, today)
+    try:
+        body = await downloader.fetch(build_cinfo(spec, start_date, end_date), ttl_for_range(end_date))
+    except Exception as e:
+        raise RuntimeError(f"{spec.index_name} {year}: {e}") from e
+    headers, rows = await asyncio.to_thread(parse_table_or_json_to_rows, body)
+
+    # Persist raw response and per-year CSV as soon as they arrive, off the event loop
+    await asyncio.to_thread(_write_year, data_dir, year, body, headers, rows)
+    return spec, year, headers, rows
+
+
+def _write_year(data_dir: str, year: int, body: str, headers: List[str], rows: List[Dict[str, str]]) -> None:
+    with open(os.path.join(data_dir, f"historical_{year}.raw"), "w", encoding="utf-8") as f:
+        f.write(body)
+    write_csv(os.path.join(data_dir, f"historical_{year}.csv"), headers, rows)
+
+
+def _sort_by_date(headers: List[str], rows: List[Dict[str, str]]) -> None:
+    date_key = find_column(headers, DATE_COLUMNS)
+    if date_key is None:
+        return
+
+    def key(r: Dict[str, str]) -> Tuple[int, int, int]:
+        d = parse_index_date(r.get(date_key, ""))
+        return (d.year, d.month, d.day) if d is not None else (0, 0, 0)
+
+    rows.sort(key=key)
+
+
+async def download_indices(
+    specs: List[IndexSpec],
+    start_year: int,
+    end_year: int,
+    out_dir: str,
+    url: str = URL,
+    max_per_host: int = 4,
+    retries: int = 3,
+    backoff: float = 1.0,
+) -> Dict[str, str]:
+    # Fetch every (index, year) pair concurrently; returns combined CSV path per index stem
+    today = dt.date.today()
+    downloader = AsyncBackpageDownloader(url, max_per_host, retries, backoff)
+    await downloader.open()
+
+    data_dirs = {}
+    for spec in specs:
+        data_dirs[spec.stem] = os.path.join(out_dir, f"data_{spec.stem}")
+        ensure_dir(data_dirs[spec.stem])
+
+    tasks = [
+        asyncio.create_task(_fetch_and_store(downloader, spec, year, today, data_dirs[spec.stem]))
+        for spec in specs
+        for year in range(start_year, end_year + 1)
+    ]
+    by_index: Dict[str, Dict[int, Tuple[List[str], List[Dict[str, str]]]]] = {s.stem: {} for s in specs}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                spec, year, headers, rows = await next_done
+            except Exception as e:
+                print(f"Failed: {e}")
+                continue
+            by_index[spec.stem][year] = (headers, rows)
+            print(f"Fetched {spec.index_name} {year}: {len(rows)} rows")
+    finally:
+        downloader.close()
+
+    combined_paths: Dict[str, str] = {}
+    for spec in specs:
+        years = by_index[spec.stem]
+        missing = [y for y in range(start_year, end_year + 1) if y not in years]
+        if missing:
+            print(f"Skipping combined CSV for {spec.index_name}; missing years: {', '.join(map(str, missing))}")
+            continue
+        unified_headers: List[str] = []
+        all_rows: List[Dict[str, str]] = []
+        for year in sorted(years):
+            headers, rows = years[year]
+            for h in headers:
+                if h not in unified_headers:
+                    unified_headers.append(h)
+            all_rows.extend(rows)
+        _sort_by_date(unified_headers, all_rows)
+        combined_csv = os.path.join(out_dir, f"{spec.stem}_Historical.csv")
+        write_csv(combined_csv, unified_headers, all_rows)
+        combined_paths[spec.stem] = combined_csv
+        print(f"Combined CSV written to: {combined_csv}")
+    return combined_paths
+
+
+def parse_index_arg(value: str) -> IndexSpec:
+    parts = [p.strip() for p in value.split("=")]
+    if len(parts) not in (2, 3) or not all(parts):
+        raise argparse.ArgumentTypeError("Expected NAME=INDEX_NAME or NAME=INDEX_NAME=STEM")
+    stem = parts[2] if len(parts) == 3 else parts[1].upper().replace(" ", "_")
+    return IndexSpec(parts[0], parts[1], stem)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Download yearly niftyindices.com history for many indices concurrently"
+    )
+    parser.add_argument(
+        "--index",
+        dest="indices",
+        action="append",
+        type=parse_index_arg,
+        help="Index as NAME=INDEX_NAME[=STEM] (repeatable; default: NIFTY 50, Momentum 50 and MQ 50)",
+    )
+    parser.add_argument("--start-year", type=int, default=2005, help="First year to download (inclusive)")
+    parser.add_argument("--end-year", type=int, default=dt.date.today().year, help="Last year to download (inclusive)")
+    parser.add_argument("--max-per-host", type=int, default=4, help="Maximum concurrent requests per host")
+    parser.add_argument("--retries", type=int, default=3, help="Attempts per request on 5xx or network errors")
+    parser.add_argument("--backoff", type=float, default=1.0, help="Base seconds for exponential retry backoff")
+    parser.add_argument("--url", default=URL, help="Backpage endpoint (override to point at a local stub server)")
+    parser.add_argument(
+        "--out-dir",
+        default=os.path.dirname(os.path.abspath(__file__)),
+        help="Directory for per-year folders and combined CSVs",
+    )
+    args = parser.parse_args()
+
+    specs = args.indices or DEFAULT_INDICES
+    combined = asyncio.run(
+        download_indices(
+            specs,
+            args.start_year,
+            args.end_year,
+            args.out_dir,
+            url=args.url,
+            max_per_host=args.max_per_host,
+            retries=args.retries,
+            backoff=args.backoff,
+        )
+    )
+    print(default_cache().stats_line())
+    if len(combined) < len(specs):
+        raise SystemExit("Some indices could not be downloaded completely")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,27 @@
 import argparse
 import csv
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import requests
 
+from date_parsing import parse_index_date
+from http_cache import default_cache, ttl_for_range
+
 
 NSE_HOME_URL = "https://www.nseindia.com"
 INDICES_HISTORY_API = "https://www.nseindia.com/api/indices-history"
 
+# Rate-limit (429) and server errors are retried with a linear backoff
+RETRIES = 3
+RETRY_BACKOFF = 1.0
+
 
 def parse_date(date_str: str) -> datetime:
     return datetime.strptime(date_str, "%Y-%m-%d")
@@ -20,7 +32,7 @@ def format_date_for_api(dt: datetime) -> str:
     return dt.strftime("%d-%m-%Y")
 
 
-def warm_up_session(session: requests.Session) -> None:
+def warm_up_session(session: requests.Session, home_url: str = NSE_HOME_URL) -> None:
     # Hit home to get cookies (NSE blocks requests without proper cookies)
     session.headers.update(
         {
@@ -31,11 +43,89 @@ def warm_up_session(session: requests.Session) -> None:
             ),
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.9",
-            "Referer": NSE_HOME_URL,
+            "Referer": home_url,
             "Connection": "keep-alive",
         }
     )
-    session.get(NSE_HOME_URL, timeout=15)
+    session.get(home_url, timeout=15)
+
+
+class TokenBucket:
+    # Global rate limit shared by all workers: `rate` requests per second, bursts up to `capacity`
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SessionPool:
+    # requests.Session is not thread-safe, so each worker borrows its own session.
+    # Only the first one hits the home page; the rest reuse its headers and cookies.
+    def __init__(self, size: int, home_url: str = NSE_HOME_URL) -> None:
+        warm = requests.Session()
+        warm_up_session(warm, home_url)
+        self._all = [warm]
+        for _ in range(size - 1):
+            s = requests.Session()
+            s.headers.update(warm.headers)
+            s.cookies.update(warm.cookies)
+            self._all.append(s)
+        self._idle: "queue.Queue[requests.Session]" = queue.Queue()
+        for s in self._all:
+            self._idle.put(s)
+
+    @contextmanager
+    def session(self) -> Iterator[requests.Session]:
+        s = self._idle.get()
+        try:
+            yield s
+        finally:
+            self._idle.put(s)
+
+    def close(self) -> None:
+        for s in self._all:
+            s.close()
+
+
+def site_url(api_url: str) -> str:
+    # Scheme and host the API is served from, so Referer headers follow --base-url
+    parts = urlsplit(api_url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _get_with_retries(
+    session: requests.Session,
+    url: str,
+    params: Dict[str, str],
+    headers: Dict[str, str],
+    limiter: Optional[TokenBucket],
+) -> requests.Response:
+    # Every attempt takes a token from the limiter, so retries count against the rate too
+    for attempt in range(RETRIES):
+        if limiter is not None:
+            limiter.acquire()
+        resp = session.get(url, params=params, headers=headers, timeout=30)
+        if resp.status_code != 429 and resp.status_code < 500:
+            break
+        if attempt + 1 < RETRIES:
+            time.sleep(RETRY_BACKOFF * (attempt + 1))
+    return resp
 
 
 def generate_chunks(start: datetime, end: datetime, max_days: int) -> List[Tuple[datetime, datetime]]:
@@ -48,20 +138,37 @@ def generate_chunks(start: datetime, end: datetime, max_days: int) -> List[Tuple
     return chunks
 
 
-def fetch_chunk(session: requests.Session, index_type: str, start: datetime, end: datetime) -> List[Dict[str, str]]:
+def fetch_chunk(
+    session: requests.Session,
+    index_type: str,
+    start: datetime,
+    end: datetime,
+    api_url: str = INDICES_HISTORY_API,
+    limiter: Optional[TokenBucket] = None,
+) -> List[Dict[str, str]]:
     params = {
         "indexType": index_type,
         "from": format_date_for_api(start),
         "to": format_date_for_api(end),
     }
 
+    # Closed historical ranges are cached permanently, open-ended ones with a TTL. Only
+    # responses that yield rows are stored, so block pages and empty payloads are refetched.
+    cache = default_cache()
+    ttl = ttl_for_range(end)
+    referer = f"{site_url(api_url)}/indices/historicalData?indexType={index_type}"
+
     # First attempt JSON
     headers_json = {
         "Accept": "application/json, text/plain, */*",
-        "Referer": f"{NSE_HOME_URL}/indices/historicalData?indexType={index_type}",
+        "Referer": referer,
     }
+    json_key = cache.key("GET", api_url, params=params)
     try:
-        resp = session.get(INDICES_HISTORY_API, params=params, headers=headers_json, timeout=30)
+        resp = cache.get(json_key)
+        from_cache = resp is not None
+        if resp is None:
+            resp = _get_with_retries(session, api_url, params, headers_json, limiter)
         if resp.ok and resp.headers.get("content-type", "").startswith("application/json"):
             payload = resp.json()
             data = payload.get("data") or payload.get("grapthData") or []
@@ -77,13 +184,7 @@ def fetch_chunk(session: requests.Session, index_type: str, start: datetime, end
                 if not date_str:
                     continue
                 # Expected date like '01-Jan-2020' or '01-01-2020'
-                dt = None
-                for fmt in ("%d-%b-%Y", "%d-%m-%Y", "%d %b %Y"):
-                    try:
-                        dt = datetime.strptime(str(date_str).strip(), fmt)
-                        break
-                    except ValueError:
-                        pass
+                dt = parse_index_date(str(date_str))
                 if dt is None:
                     continue
                 open_val = _coerce_float(
@@ -120,6 +221,8 @@ def fetch_chunk(session: requests.Session, index_type: str, start: datetime, end
                     }
                 )
             if rows:
+                if not from_cache:
+                    cache.put(json_key, resp, ttl)
                 return rows
     except Exception:
         pass
@@ -129,10 +232,16 @@ def fetch_chunk(session: requests.Session, index_type: str, start: datetime, end
     params_csv["csv"] = "true"
     headers_csv = {
         "Accept": "text/csv,application/octet-stream,application/vnd.ms-excel;q=0.9,*/*;q=0.8",
-        "Referer": f"{NSE_HOME_URL}/indices/historicalData?indexType={index_type}",
+        "Referer": referer,
     }
-    resp2 = session.get(INDICES_HISTORY_API, params=params_csv, headers=headers_csv, timeout=30)
+    csv_key = cache.key("GET", api_url, params=params_csv)
+    resp2 = cache.get(csv_key)
+    from_cache = resp2 is not None
+    if resp2 is None:
+        resp2 = _get_with_retries(session, api_url, params_csv, headers_csv, limiter)
     rows_csv = _parse_csv_text(index_type, resp2.text)
+    if rows_csv and not from_cache:
+        cache.put(csv_key, resp2, ttl)
     return rows_csv
 
 
@@ -174,13 +283,7 @@ def _parse_csv_text(index_type: str, text: str) -> List[Dict[str, str]]:
         date_str = row.get("Date") or row.get("Date ") or row.get("DATE")
         if not date_str:
             continue
-        dt = None
-        for fmt in ("%d-%b-%Y", "%d-%m-%Y", "%d %b %Y"):
-            try:
-                dt = datetime.strptime(date_str.strip(), fmt)
-                break
-            except ValueError:
-                pass
+        dt = parse_index_date(date_str)
         if dt is None:
             continue
         rows.append(
@@ -196,14 +299,29 @@ def _parse_csv_text(index_type: str, text: str) -> List[Dict[str, str]]:
     return rows
 
 
+def fetch_chunks_concurrently(
+    pool: SessionPool,
+    index_type: str,
+    chunks: List[Tuple[datetime, datetime]],
+    workers: int,
+    limiter: TokenBucket,
+    api_url: str = INDICES_HISTORY_API,
+) -> List[List[Dict[str, str]]]:
+    # Results come back in chunk order regardless of completion order
+    def fetch(chunk: Tuple[datetime, datetime]) -> List[Dict[str, str]]:
+        with pool.session() as session:
+            return fetch_chunk(session, index_type, chunk[0], chunk[1], api_url, limiter)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fetch, chunks))
+
+
 def write_output_csv(output_path: str, rows: List[Dict[str, str]]) -> None:
     # Deduplicate by date (last one wins) and sort by date
     by_date: Dict[str, Dict[str, str]] = {}
     for r in rows:
         by_date[r["Date"]] = r
-    sorted_dates = sorted(
-        by_date.keys(), key=lambda s: datetime.strptime(s, "%d %b %Y")
-    )
+    sorted_dates = sorted(by_date.keys(), key=parse_index_date)
     fieldnames = ["Index Name", "Date", "Open", "High", "Low", "Close"]
     with open(output_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
@@ -248,6 +366,23 @@ def main() -> None:
         default=0.8,
         help="Seconds to sleep between chunk requests",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Fetch chunks concurrently with this many workers (1 = sequential with --sleep)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=1.25,
+        help="Global request rate limit in requests/second when --workers > 1 (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--base-url",
+        default=NSE_HOME_URL,
+        help="Base URL of the NSE site (override to point at a local stub server)",
+    )
 
     args = parser.parse_args()
 
@@ -256,16 +391,27 @@ def main() -> None:
     if start_dt > end_dt:
         raise SystemExit("Start date must be <= end date")
 
-    session = requests.Session()
-    warm_up_session(session)
+    home_url = args.base_url.rstrip("/")
+    api_url = f"{home_url}/api/indices-history"
 
     all_rows: List[Dict[str, str]] = []
     chunks = generate_chunks(start_dt, end_dt, args.max_days_per_request)
-    for (chunk_start, chunk_end) in chunks:
-        rows = fetch_chunk(session, args.index, chunk_start, chunk_end)
-        all_rows.extend(rows)
-        if args.sleep > 0:
-            time.sleep(args.sleep)
+    if args.workers > 1:
+        pool = SessionPool(args.workers, home_url)
+        limiter = TokenBucket(args.rate, capacity=args.workers)
+        try:
+            for rows in fetch_chunks_concurrently(pool, args.index, chunks, args.workers, limiter, api_url):
+                all_rows.extend(rows)
+        finally:
+            pool.close()
+    else:
+        session = requests.Session()
+        warm_up_session(session, home_url)
+        for (chunk_start, chunk_end) in chunks:
+            rows = fetch_chunk(session, args.index, chunk_start, chunk_end, api_url)
+            all_rows.extend(rows)
+            if args.sleep > 0:
+                time.sleep(args.sleep)
 
     if not all_rows:
         raise SystemExit(
@@ -276,6 +422,7 @@ def main() -> None:
     print(
         f"Saved {len(all_rows)} rows for '{args.index}' to: {args.out} (de-duplicated and sorted)"
     )
+    print(default_cache().stats_line())
 
 
 if __name__ == "__main__":
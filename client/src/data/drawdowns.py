@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from price_series import PriceSeries
+
+
+# Drawdown episodes of a daily series from one running maximum. A row is underwater when its
+# close is below the highest close so far; each maximal run of underwater rows is an episode:
+# it starts at the peak (the row before the run), bottoms at the run's minimum and recovers on
+# the first row back at or above the peak (None while still underwater). Everything is array
+# work over the whole series, so there is no per-row Python loop.
+
+
+@dataclass
+class DrawdownEpisode:
+    peak: date
+    trough: date
+    recovery: Optional[date]
+    # Trough close / peak close - 1 (negative)
+    depth: float
+    peak_close: float
+    trough_close: float
+    # Calendar days from peak to trough and from peak to recovery (or to the last row when
+    # the episode is still open)
+    decline_days: int
+    duration_days: int
+
+    @property
+    def recovered(self) -> bool:
+        return self.recovery is not None
+
+
+@dataclass
+class DrawdownAnalysis:
+    ordinals: np.ndarray
+    # Compact underwater curve: close / running peak - 1 per row, float32
+    underwater: np.ndarray
+    peak_rows: np.ndarray
+    trough_rows: np.ndarray
+    # Row of recovery, -1 while still underwater
+    recovery_rows: np.ndarray
+    depths: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.depths)
+
+    @property
+    def max_drawdown(self) -> float:
+        return float(self.depths.min()) if len(self.depths) else 0.0
+
+    def episode(self, i: int, closes: Sequence[float]) -> DrawdownEpisode:
+        peak, trough, recovery = int(self.peak_rows[i]), int(self.trough_rows[i]), int(self.recovery_rows[i])
+        end = recovery if recovery >= 0 else len(self.ordinals) - 1
+        return DrawdownEpisode(
+            peak=date.fromordinal(int(self.ordinals[peak])),
+            trough=date.fromordinal(int(self.ordinals[trough])),
+            recovery=date.fromordinal(int(self.ordinals[recovery])) if recovery >= 0 else None,
+            depth=float(self.depths[i]),
+            peak_close=float(closes[peak]),
+            trough_close=float(closes[trough]),
+            decline_days=int(self.ordinals[trough] - self.ordinals[peak]),
+            duration_days=int(self.ordinals[end] - self.ordinals[peak]),
+        )
+
+    def top(self, n: int) -> np.ndarray:
+        # Episode numbers of the n deepest drawdowns, deepest first
+        n = min(n, len(self.depths))
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+        picked = np.argpartition(self.depths, n - 1)[:n]
+        return picked[np.argsort(self.depths[picked], kind='stable')]
+
+
+def analyze_drawdowns(series: PriceSeries) -> DrawdownAnalysis:
+    ordinals = np.asarray(series.ordinals, dtype=np.int64)
+    closes = np.asarray(series.closes, dtype=np.float64)
+    size = closes.size
+    if size == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return DrawdownAnalysis(ordinals, np.empty(0, dtype=np.float32), empty, empty, empty, np.empty(0))
+    peak = np.maximum.accumulate(closes)
+    drawdown = closes / peak - 1.0
+    below = closes < peak
+
+    edges = np.diff(below.astype(np.int8))
+    starts = np.flatnonzero(edges == 1) + 1
+    ends = np.flatnonzero(edges == -1) + 1
+    if ends.size < starts.size:
+        ends = np.append(ends, size)
+    # Row 0 can never be underwater, so every run has a peak row before it
+    if starts.size == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return DrawdownAnalysis(ordinals, drawdown.astype(np.float32), empty, empty, empty, np.empty(0))
+
+    depths = np.minimum.reduceat(drawdown, starts)
+    # First row of each run that reaches the run's minimum
+    run_marks = np.zeros(size, dtype=np.int64)
+    run_marks[starts] = 1
+    run_id = np.cumsum(run_marks) - 1
+    at_min = below & (drawdown == depths[np.maximum(run_id, 0)])
+    trough_candidates = np.flatnonzero(at_min)
+    troughs = trough_candidates[np.searchsorted(trough_candidates, starts)]
+    recoveries = np.where(ends < size, ends, -1)
+    return DrawdownAnalysis(ordinals, drawdown.astype(np.float32), starts - 1, troughs, recoveries, depths)
+
+
+def episodes(series: PriceSeries) -> List[DrawdownEpisode]:
+    analysis = analyze_drawdowns(series)
+    return [analysis.episode(i, series.closes) for i in range(len(analysis))]
+
+
+def top_drawdowns_across(series_by_label: Dict[str, PriceSeries], n: int = 10) -> List[Tuple[str, DrawdownEpisode]]:
+    # The n deepest episodes over every series: each series contributes at most its own top n
+    candidates: List[Tuple[float, str, int]] = []
+    analyses = {}
+    for label, series in series_by_label.items():
+        analysis = analyze_drawdowns(series)
+        analyses[label] = analysis
+        candidates += [(float(analysis.depths[i]), label, int(i)) for i in analysis.top(n)]
+    candidates.sort(key=lambda c: c[0])
+    return [(label, analyses[label].episode(i, series_by_label[label].closes)) for _, label, i in candidates[:n]]
+
+
+def _episodes_scalar(closes: Sequence[float]) -> List[Tuple[int, int, int, float]]:
+    # Row-by-row reference: (peak row, trough row, recovery row or -1, depth)
+    out = []
+    peak_row = 0
+    trough_row = None
+    for i in range(1, len(closes)):
+        if closes[i] >= closes[peak_row]:
+            if trough_row is not None:
+                out.append((peak_row, trough_row, i, closes[trough_row] / closes[peak_row] - 1.0))
+                trough_row = None
+            peak_row = i
+        elif trough_row is None or closes[i] < closes[trough_row]:
+            trough_row = i
+    if trough_row is not None:
+        out.append((peak_row, trough_row, -1, closes[trough_row] / closes[peak_row] - 1.0))
+    return out
+
+
+def render_top_markdown(top: List[Tuple[str, DrawdownEpisode]]) -> str:
+    lines = ["| Index | Peak | Trough | Recovery | Depth | Decline (days) | Duration (days) |\n"]
+    lines.append("|---|---:|---:|---:|---:|---:|---:|\n")
+    for label, e in top:
+        recovery = e.recovery.strftime('%d %b %Y') if e.recovery else 'Not yet'
+        lines.append(
+            f"| {label} | {e.peak.strftime('%d %b %Y')} | {e.trough.strftime('%d %b %Y')} | {recovery} | "
+            f"{e.depth * 100:.2f}% | {e.decline_days} | {e.duration_days} |\n"
+        )
+    return ''.join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+    import glob
+    import os
+    import time
+    from compute_sip_markdown import read_prices
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Drawdown episodes, underwater curves and the deepest drawdowns across index CSVs.')
+    parser.add_argument('csv_paths', nargs='*', help='CSV files (default: every *.csv next to this script)')
+    parser.add_argument('--top', type=int, default=10, help='Number of deepest episodes to list')
+    parser.add_argument('--copies', type=int, default=100, help='Time the batch over this many copies of the inputs')
+    parser.add_argument('--underwater-out', default=None, help='Save every underwater curve (float32) to this .npz file')
+    args = parser.parse_args()
+
+    paths = args.csv_paths or sorted(glob.glob(os.path.join(base_dir, '*.csv')))
+    series_by_label = {}
+    for path in paths:
+        series = read_prices(path)
+        if len(series):
+            series_by_label[os.path.splitext(os.path.basename(path))[0]] = series
+
+    for label, series in series_by_label.items():
+        analysis = analyze_drawdowns(series)
+        print(f"{label}: {len(analysis)} episodes, max drawdown {analysis.max_drawdown * 100:.2f}%, "
+              f"underwater curve {analysis.underwater.nbytes} bytes")
+
+    copies = {f"{label}#{k}": series for k in range(args.copies) for label, series in series_by_label.items()}
+    rows = sum(len(s) for s in copies.values())
+    t_start = time.perf_counter()
+    top_drawdowns_across(copies, args.top)
+    elapsed = time.perf_counter() - t_start
+    print(f"\nBatch: {len(copies)} series, {rows:,} rows in {elapsed * 1000:.1f} ms\n")
+
+    print(render_top_markdown(top_drawdowns_across(series_by_label, args.top)))
+    if args.underwater_out:
+        np.savez_compressed(args.underwater_out, **{
+            label: analyze_drawdowns(series).underwater for label, series in series_by_label.items()
+        })
@@ -0,0 +1,165 @@
+import json
+import math
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from alignment import UNION, align_arrays
+from compute_sip_markdown import read_prices
+from month_index import MonthIndex, build_month_index, month_index_for
+from price_series import PriceSeries
+
+
+# Scalar ports of the helpers App.tsx used to run on every page load. The dashboard now
+# imports the JSON written here, so these must keep matching what the views expect.
+
+# (key in fundData, display name, CSV, column name in the aligned strategy inputs)
+DASHBOARD_FUNDS = [
+    ("nifty", "Nifty 50", "NIFTY50_Historical.csv", "Nifty"),
+    ("momentum", "Momentum 50", "NIFTY500_MOMENTUM_50_Historical.csv", "Momentum"),
+    ("quality", "Quality 50", "NIFTY500_MULTICAP_MOMENTUM_QUALITY_50_Historical.csv", "Quality"),
+]
+ROLLING_YEARS = {"3yr": 3, "5yr": 5, "10yr": 10}
+RISK_FREE_RATE = 0.06505
+
+MonthlySeries = List[Tuple[date, float]]
+
+
+def resample_to_monthly(series: PriceSeries, months: Optional[MonthIndex] = None) -> MonthlySeries:
+    # Last close of each calendar month, dated at the month's last calendar day (resampleToMonthly).
+    # Each month starts from its last row in the index and only walks back past non-finite closes.
+    if months is None or months.rows != len(series):
+        months = build_month_index(series)
+    closes = series.closes
+    out: MonthlySeries = []
+    for m, (first, last) in enumerate(zip(months.month_first, months.month_last)):
+        row = last
+        while row >= first and not math.isfinite(closes[row]):
+            row -= 1
+        if row >= first:
+            out.append((months.month_end(m), closes[row]))
+    return out
+
+
+def calculate_metrics(data: MonthlySeries, risk_free_rate: float = RISK_FREE_RATE) -> Dict[str, float]:
+    # calculateMetrics: CAGR over calendar time, monthly-return volatility annualized by sqrt(12)
+    if len(data) < 2:
+        return {}
+    years = (data[-1][0] - data[0][0]).days / 365.25
+    start_price = data[0][1]
+    end_price = data[-1][1]
+    cagr = (end_price / start_price) ** (1 / years) - 1
+
+    monthly_returns = [data[i][1] / data[i - 1][1] - 1 for i in range(1, len(data))]
+    mean_return = sum(monthly_returns) / len(monthly_returns)
+    volatility = math.sqrt(sum((r - mean_return) ** 2 for r in monthly_returns) / len(monthly_returns)) * math.sqrt(12)
+    sharpe_ratio = _divide(cagr - risk_free_rate, volatility)
+
+    downside = [r for r in monthly_returns if r < 0]
+    downside_std = math.sqrt(sum(r * r for r in downside) / len(downside)) * math.sqrt(12) if downside else float('nan')
+    sortino_ratio = _divide(cagr - risk_free_rate, downside_std)
+
+    peak = 0.0
+    max_drawdown = 0.0
+    for _, value in data:
+        if value > peak:
+            peak = value
+        drawdown = _divide(value - peak, peak)
+        if drawdown < max_drawdown:
+            max_drawdown = drawdown
+    calmar_ratio = _divide(cagr, abs(max_drawdown))
+
+    return {
+        "cagr": cagr,
+        "volatility": volatility,
+        "sharpeRatio": sharpe_ratio,
+        "sortinoRatio": sortino_ratio,
+        "maxDrawdown": max_drawdown,
+        "calmarRatio": calmar_ratio,
+    }
+
+
+def _divide(a: float, b: float) -> float:
+    # JS division semantics: x / 0 is +-Infinity (NaN for 0 / 0) instead of raising
+    if b == 0:
+        return float('nan') if a == 0 or a != a else math.copysign(float('inf'), a)
+    return a / b
+
+
+def calculate_rolling_returns(data: MonthlySeries, years: int) -> Optional[Dict[str, float]]:
+    # calculateRollingReturns: distribution of point-to-point CAGRs over `years`-long windows
+    window = years * 12
+    if len(data) < window:
+        return None
+    cagrs = sorted((data[i][1] / data[i - window][1]) ** (1 / years) - 1 for i in range(window, len(data)))
+    if not cagrs:
+        return None
+    mid = len(cagrs) // 2
+    median = (cagrs[mid - 1] + cagrs[mid]) / 2 if len(cagrs) % 2 == 0 else cagrs[mid]
+    return {"average": sum(cagrs) / len(cagrs), "max": cagrs[-1], "min": cagrs[0], "median": median}
+
+
+def align_monthly(series_by_column: Dict[str, MonthlySeries]) -> Tuple[List[date], Dict[str, List[float]]]:
+    # Union of all dates; each column forward-filled from its latest point on or before the date.
+    # Dates where any column has no value yet are dropped (the old findValue + filter).
+    columns = [([d.toordinal() for d, _ in series], [v for _, v in series]) for series in series_by_column.values()]
+    ordinals, matrix = align_arrays(columns, UNION)
+    return (
+        [date.fromordinal(int(o)) for o in ordinals],
+        {name: matrix[:, j].tolist() for j, name in enumerate(series_by_column)},
+    )
+
+
+def _finite_or_none(value: Any) -> Any:
+    # JSON has no NaN/Infinity; the views already show "N/A" for null
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _finite_or_none(v) for k, v in value.items()}
+    return value
+
+
+def build_dashboard(data_dir: str, funds: Sequence[Tuple[str, str, str, str]] = DASHBOARD_FUNDS) -> Dict[str, Any]:
+    fund_payload: Dict[str, Any] = {}
+    monthly_by_column: Dict[str, MonthlySeries] = {}
+    for key, name, csv_name, column in funds:
+        csv_path = os.path.join(data_dir, csv_name)
+        series = read_prices(csv_path)
+        monthly = resample_to_monthly(series, month_index_for(csv_path, series))
+        monthly_by_column[column] = monthly
+        fund_payload[key] = {
+            "name": name,
+            "dates": [d.isoformat() for d, _ in monthly],
+            "values": [v for _, v in monthly],
+            "metrics": _finite_or_none(calculate_metrics(monthly)),
+            "rollingReturns": {
+                label: _finite_or_none(calculate_rolling_returns(monthly, years))
+                for label, years in ROLLING_YEARS.items()
+            },
+        }
+    dates, columns = align_monthly(monthly_by_column)
+    return {
+        "funds": fund_payload,
+        "aligned": {"dates": [d.isoformat() for d in dates], **columns},
+    }
+
+
+def main() -> None:
+    import argparse
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Precompute the dashboard data App.tsx loads (monthly series, metrics, rolling stats, aligned inputs).')
+    parser.add_argument('--data-dir', default=base_dir, help='Directory containing the index CSVs')
+    parser.add_argument('--out', default=os.path.join(base_dir, 'dashboard.json'), help='Output JSON path')
+    args = parser.parse_args()
+
+    payload = build_dashboard(args.data_dir)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'), allow_nan=False)
+        f.write('\n')
+    months = {key: len(fund["dates"]) for key, fund in payload["funds"].items()}
+    print(f"Wrote {args.out}: {months}, {len(payload['aligned']['dates'])} aligned months")
+
+
+if __name__ == '__main__':
+    main()
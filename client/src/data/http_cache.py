@@ -0,0 +1,166 @@
+import datetime as dt
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+
+# Set NIFTY_HTTP_CACHE to a directory to relocate the cache, or to "off" to disable it
+HTTP_CACHE_DIR = os.environ.get(
+    "NIFTY_HTTP_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache"),
+)
+HTTP_CACHE_MAX_BYTES = int(float(os.environ.get("NIFTY_HTTP_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+# Ranges that end today or later can still change, so they expire; closed ranges never do
+OPEN_RANGE_TTL = 6 * 60 * 60
+
+
+def ttl_for_range(end_date: dt.date) -> Optional[float]:
+    if isinstance(end_date, dt.datetime):
+        end_date = end_date.date()
+    return None if end_date < dt.date.today() else OPEN_RANGE_TTL
+
+
+@dataclass
+class CachedResponse:
+    # The subset of requests.Response the downloaders use, rebuilt from a cache entry
+    status_code: int
+    text: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 400
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class ResponseCache:
+    # On-disk cache of HTTP response bodies keyed by a hash of (method, URL, params, payload).
+    # Each entry is one JSON file; its mtime is bumped on every hit so eviction is LRU, and the
+    # directory is trimmed to `max_bytes` after every store.
+    def __init__(self, directory: str, max_bytes: int = HTTP_CACHE_MAX_BYTES, enabled: bool = True) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if enabled:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(method: str, url: str, params: Optional[Dict[str, Any]] = None, payload: Any = None) -> str:
+        material = json.dumps([method.upper(), url, params or {}, payload], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        expires = entry.get("expires")
+        if expires is not None and expires < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return CachedResponse(entry["status_code"], entry["text"], entry.get("headers") or {})
+
+    def put(self, key: str, resp: Any, ttl: Optional[float]) -> None:
+        # Only successful responses are stored; ttl=None stores a permanent entry
+        if not self.enabled or not (200 <= resp.status_code < 300):
+            return
+        entry = {
+            "status_code": resp.status_code,
+            "headers": {"content-type": resp.headers.get("content-type", "")},
+            "text": resp.text,
+            "created": time.time(),
+            "expires": None if ttl is None else time.time() + ttl,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(key))
+        with self._lock:
+            self.stores += 1
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats_line(self) -> str:
+        if not self.enabled:
+            return "HTTP cache: disabled"
+        return (
+            f"HTTP cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.stores} stored, {self.evictions} evicted ({self.directory})"
+        )
+
+
+_DEFAULT_CACHE: Optional[ResponseCache] = None
+_DEFAULT_CACHE_LOCK = threading.Lock()
+
+
+def default_cache() -> ResponseCache:
+    # Process-wide cache shared by every downloader, configured from the environment
+    global _DEFAULT_CACHE
+    with _DEFAULT_CACHE_LOCK:
+        if _DEFAULT_CACHE is None:
+            enabled = HTTP_CACHE_DIR.strip().lower() not in ("", "off", "0", "false")
+            _DEFAULT_CACHE = ResponseCache(HTTP_CACHE_DIR, enabled=enabled)
+        return _DEFAULT_CACHE
+
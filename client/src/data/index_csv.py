@@ -0,0 +1,178 @@
+import csv
+from array import array
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from date_parsing import parse_index_ordinal
+from price_series import PriceSeries
+
+
+# Column names seen across our sources, in priority order:
+#   INDEX_NAME,HistoricalDate,CLOSE               niftyindices.com yearly downloaders
+#   Index Name,Date,Open,High,Low,Close           download_nse_index_history / NSE exports
+#   Index Name,Date,Close                         NIFTY500_VALUE_50_combined.csv
+#   ...,Date,...,Total Returns Index              total-return exports
+NAME_COLUMNS = ("Index Name", "INDEX_NAME")
+DATE_COLUMNS = ("Date", "date", "DATE", "Index Date", "Index date", "HistoricalDate")
+OPEN_COLUMNS = ("Open", "OPEN")
+HIGH_COLUMNS = ("High", "HIGH")
+LOW_COLUMNS = ("Low", "LOW")
+CLOSE_COLUMNS = ("Close", "Total Returns Index", "Close Price", "close", "CLOSE")
+
+
+def find_column(header: Sequence[str], candidates: Sequence[str]) -> Optional[str]:
+    # Header entry of the first candidate present, for code that still works with dict rows
+    present = {h.strip(): h for h in header}
+    return next((present[c] for c in candidates if c in present), None)
+
+
+def _positions(header: Sequence[str], candidates: Sequence[str]) -> Tuple[int, ...]:
+    stripped = [h.strip() for h in header]
+    return tuple(stripped.index(c) for c in candidates if c in stripped)
+
+
+def _first_value(row: List[str], positions: Tuple[int, ...]) -> str:
+    # Like `row.get(a) or row.get(b) or ...`: the first non-empty candidate wins per row
+    for i in positions:
+        if i < len(row) and row[i]:
+            return row[i]
+    return ""
+
+
+@dataclass
+class ColumnMap:
+    # Positions of each logical column, one tuple of fallbacks per field
+    date: Tuple[int, ...]
+    close: Tuple[int, ...]
+    name: Tuple[int, ...] = ()
+    open: Tuple[int, ...] = ()
+    high: Tuple[int, ...] = ()
+    low: Tuple[int, ...] = ()
+
+    @classmethod
+    def sniff(cls, header: Sequence[str]) -> Optional['ColumnMap']:
+        # None when the header has no date or no close column
+        date = _positions(header, DATE_COLUMNS)
+        close = _positions(header, CLOSE_COLUMNS)
+        if not date or not close:
+            return None
+        return cls(
+            date=date,
+            close=close,
+            name=_positions(header, NAME_COLUMNS),
+            open=_positions(header, OPEN_COLUMNS),
+            high=_positions(header, HIGH_COLUMNS),
+            low=_positions(header, LOW_COLUMNS),
+        )
+
+    def date_str(self, row: List[str]) -> str:
+        return _first_value(row, self.date)
+
+    def close_str(self, row: List[str]) -> str:
+        return _first_value(row, self.close)
+
+    def name_str(self, row: List[str]) -> str:
+        return _first_value(row, self.name)
+
+    def ohlc(self, row: List[str]) -> Tuple[str, str, str, str]:
+        return (
+            _first_value(row, self.open),
+            _first_value(row, self.high),
+            _first_value(row, self.low),
+            _first_value(row, self.close),
+        )
+
+
+def iter_index_rows(csv_path: str) -> Iterator[Tuple[ColumnMap, List[str]]]:
+    # Sniff the header once, then yield raw rows positionally; nothing for an unrecognized header
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        columns = ColumnMap.sniff(next(reader, []))
+        if columns is None:
+            return
+        for row in reader:
+            yield columns, row
+
+
+def read_index_series(csv_path: str) -> PriceSeries:
+    # Parse any supported index CSV into a date-sorted PriceSeries; rows with a missing or
+    # unparseable date or close are skipped
+    ordinals = array('i')
+    closes = array('d')
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        columns = ColumnMap.sniff(next(reader, []))
+        if columns is None:
+            return PriceSeries(ordinals, closes)
+        if len(columns.date) == 1 and len(columns.close) == 1:
+            # Common case: one candidate per field, so index directly
+            di, ci = columns.date[0], columns.close[0]
+            width = max(di, ci) + 1
+            pairs = ((row[di], row[ci]) for row in reader if len(row) >= width)
+        else:
+            pairs = ((columns.date_str(row), columns.close_str(row)) for row in reader)
+        for date_str, close_str in pairs:
+            if not date_str or not close_str:
+                continue
+            ordinal = parse_index_ordinal(date_str)
+            if ordinal is None:
+                continue
+            try:
+                close = float(close_str.replace(',', '').strip())
+            except ValueError:
+                continue
+            ordinals.append(ordinal)
+            closes.append(close)
+    return PriceSeries(ordinals, closes).sorted()
+
+
+def ingestion_benchmark(csv_paths: List[str], repeat: int = 5) -> None:
+    # Compare positional ingestion with the previous DictReader + `or`-chain loop
+    import time
+
+    def dict_reader_loop(csv_path: str) -> PriceSeries:
+        ordinals = array('i')
+        closes = array('d')
+        with open(csv_path, newline='') as f:
+            for row in csv.DictReader(f):
+                date_str = row.get('Date') or row.get('date')
+                close_str = row.get('Close') or row.get('Total Returns Index') or row.get('Close Price') or row.get('close')
+                if not date_str or not close_str:
+                    continue
+                ordinal = parse_index_ordinal(date_str)
+                if ordinal is None:
+                    continue
+                try:
+                    close = float(str(close_str).replace(',', '').strip())
+                except ValueError:
+                    continue
+                ordinals.append(ordinal)
+                closes.append(close)
+        return PriceSeries(ordinals, closes).sorted()
+
+    def timed(fn, path: str) -> float:
+        best = float('inf')
+        for _ in range(repeat):
+            t_start = time.perf_counter()
+            fn(path)
+            best = min(best, time.perf_counter() - t_start)
+        return best
+
+    for path in csv_paths:
+        old = dict_reader_loop(path)
+        new = read_index_series(path)
+        if len(old):
+            assert list(old.ordinals) == list(new.ordinals) and list(old.closes) == list(new.closes)
+        print(f"{path}: {len(new)} rows (DictReader loop found {len(old)}), "
+              f"DictReader {timed(dict_reader_loop, path) * 1000:.2f} ms, "
+              f"positional {timed(read_index_series, path) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    import argparse
+    import glob
+
+    parser = argparse.ArgumentParser(description='Benchmark header-sniffing CSV ingestion against DictReader.')
+    parser.add_argument('csv_paths', nargs='*', help='CSV files to read (default: every *.csv next to this script)')
+    args = parser.parse_args()
+    ingestion_benchmark(args.csv_paths or sorted(glob.glob('./*.csv')))
@@ -0,0 +1,234 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional, Sequence, Tuple
+
+from price_cache import file_sha256, refresh_mtime, source_stamp
+from price_series import PriceSeries
+
+
+# First and last row offsets of every calendar month, quarter and year in a date-sorted daily
+# series. Building it bisects once per month instead of scanning every row, and the result is
+# persisted next to the CSV, validated like the price cache (size, mtime, then SHA-256).
+#
+# Layout: 76-byte header, then int32 arrays: month keys/first/last, quarter keys/first/last,
+# year keys/first/last. A month key is year * 12 + month - 1; quarter and year keys are
+# month_key // 3 and month_key // 12.
+MAGIC = b'NIFTYMI1'
+HEADER = struct.Struct('<8sIIIIIqq32s')
+# Byte offset of the stored mtime within HEADER
+MTIME_OFFSET = struct.calcsize('<8sIIIIIq')
+INDEX_SUFFIX = '.months.bin'
+FORMAT_VERSION = 1
+
+MONTH = 'month'
+QUARTER = 'quarter'
+YEAR = 'year'
+
+
+def month_start_ordinal(key: int) -> int:
+    return date(key // 12, key % 12 + 1, 1).toordinal()
+
+
+@dataclass
+class MonthIndex:
+    # Months without any trading day are absent; offsets index the series' rows
+    rows: int
+    month_keys: Sequence[int]
+    month_first: Sequence[int]
+    month_last: Sequence[int]
+    quarter_keys: Sequence[int]
+    quarter_first: Sequence[int]
+    quarter_last: Sequence[int]
+    year_keys: Sequence[int]
+    year_first: Sequence[int]
+    year_last: Sequence[int]
+
+    def __len__(self) -> int:
+        return len(self.month_keys)
+
+    def month_start(self, m: int) -> date:
+        return date.fromordinal(month_start_ordinal(self.month_keys[m]))
+
+    def month_end(self, m: int) -> date:
+        # Last calendar day of the month (not the last trading day)
+        return date.fromordinal(month_start_ordinal(self.month_keys[m] + 1)) - timedelta(days=1)
+
+    def periods(self, freq: str = MONTH) -> Tuple[Sequence[int], Sequence[int], Sequence[int]]:
+        # (keys, first rows, last rows) at month, quarter or year granularity
+        if freq == MONTH:
+            return self.month_keys, self.month_first, self.month_last
+        if freq == QUARTER:
+            return self.quarter_keys, self.quarter_first, self.quarter_last
+        if freq == YEAR:
+            return self.year_keys, self.year_first, self.year_last
+        raise ValueError(f"Unknown period: {freq}")
+
+
+def _group(keys: Sequence[int], first: Sequence[int], last: Sequence[int], months_per: int) -> Tuple[array, array, array]:
+    out_keys, out_first, out_last = array('i'), array('i'), array('i')
+    for key, f, l in zip(keys, first, last):
+        group = key // months_per
+        if out_keys and out_keys[-1] == group:
+            out_last[-1] = l
+        else:
+            out_keys.append(group)
+            out_first.append(f)
+            out_last.append(l)
+    return out_keys, out_first, out_last
+
+
+def build_month_index(series: PriceSeries) -> MonthIndex:
+    ordinals = series.ordinals
+    rows = len(ordinals)
+    keys, first, last = array('i'), array('i'), array('i')
+    row = 0
+    while row < rows:
+        d = date.fromordinal(ordinals[row])
+        key = d.year * 12 + d.month - 1
+        # First row of the next month; everything in between belongs to this one
+        end = bisect_left(ordinals, month_start_ordinal(key + 1), row)
+        keys.append(key)
+        first.append(row)
+        last.append(end - 1)
+        row = end
+    return MonthIndex(rows, keys, first, last, *_group(keys, first, last, 3), *_group(keys, first, last, 12))
+
+
+def index_path_for(csv_path: str) -> str:
+    return csv_path + INDEX_SUFFIX
+
+
+def write_month_index(csv_path: str, index: MonthIndex, index_path: Optional[str] = None) -> Optional[str]:
+    # Write atomically next to the CSV; returns None when the directory is not writable
+    index_path = index_path or index_path_for(csv_path)
+    size, mtime_ns = source_stamp(csv_path)
+    columns = [array('i', c) for c in (
+        index.month_keys, index.month_first, index.month_last,
+        index.quarter_keys, index.quarter_first, index.quarter_last,
+        index.year_keys, index.year_first, index.year_last,
+    )]
+    if sys.byteorder != 'little':
+        for c in columns:
+            c.byteswap()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, index.rows, len(index.month_keys), len(index.quarter_keys),
+                         len(index.year_keys), size, mtime_ns, file_sha256(csv_path))
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(index_path)), suffix='.tmp')
+    except OSError:
+        return None
+    with os.fdopen(fd, 'wb') as f:
+        f.write(header)
+        for c in columns:
+            f.write(c.tobytes())
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+def load_month_index(csv_path: str, rows: Optional[int] = None, index_path: Optional[str] = None) -> Optional[MonthIndex]:
+    # Memory-map a fresh index; None when it is missing, malformed, older than the CSV or (when
+    # `rows` is given) built for a series of a different length
+    index_path = index_path or index_path_for(csv_path)
+    if sys.byteorder != 'little':
+        return None
+    try:
+        size, mtime_ns = source_stamp(csv_path)
+        with open(index_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mapped) < HEADER.size:
+        return None
+    magic, version, count, months, quarters, years, cached_size, cached_mtime_ns, digest = HEADER.unpack_from(mapped, 0)
+    lengths = [months] * 3 + [quarters] * 3 + [years] * 3
+    if magic != MAGIC or version != FORMAT_VERSION or len(mapped) != HEADER.size + 4 * sum(lengths):
+        return None
+    if rows is not None and count != rows:
+        return None
+    if cached_size != size:
+        return None
+    if cached_mtime_ns != mtime_ns:
+        if digest != file_sha256(csv_path):
+            return None
+        refresh_mtime(index_path, MTIME_OFFSET, mtime_ns)
+    view = memoryview(mapped)
+    columns = []
+    offset = HEADER.size
+    for n in lengths:
+        columns.append(view[offset:offset + 4 * n].cast('i'))
+        offset += 4 * n
+    return MonthIndex(count, *columns)
+
+
+def month_index_for(csv_path: str, series: PriceSeries, use_cache: bool = True) -> MonthIndex:
+    # The persisted index when it is fresh, otherwise build it (and persist it if allowed)
+    if use_cache:
+        cached = load_month_index(csv_path, len(series))
+        if cached is not None:
+            return cached
+    index = build_month_index(series)
+    if use_cache:
+        write_month_index(csv_path, index)
+    return index
+
+
+def boundary_benchmark(csv_path: str, repeat: int = 20) -> None:
+    # Compare the row scan compute_monthly_sip used with building and loading the index
+    import time
+    from datetime import datetime
+    from compute_sip_markdown import read_prices
+
+    series = read_prices(csv_path)
+
+    def scan() -> Tuple[array, array]:
+        first, last = array('i'), array('i')
+        next_month_start = None
+        for i, o in enumerate(series.ordinals):
+            if next_month_start is None or o >= next_month_start:
+                if first:
+                    last.append(i - 1)
+                first.append(i)
+                d = datetime.fromordinal(o)
+                next_month_start = month_start_ordinal(d.year * 12 + d.month)
+        if first:
+            last.append(len(series) - 1)
+        return first, last
+
+    def timed(fn) -> float:
+        best = float('inf')
+        for _ in range(repeat):
+            t_start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t_start)
+        return best
+
+    index = build_month_index(series)
+    first, last = scan()
+    assert list(first) == list(index.month_first) and list(last) == list(index.month_last)
+    write_month_index(csv_path, index)
+    loaded = load_month_index(csv_path, len(series))
+    assert loaded is not None and all(
+        list(a) == list(b) for a, b in zip(
+            (loaded.month_keys, loaded.quarter_first, loaded.quarter_last, loaded.year_first, loaded.year_last),
+            (index.month_keys, index.quarter_first, index.quarter_last, index.year_first, index.year_last),
+        )
+    )
+    print(f"Rows: {len(series)}, months: {len(index)}, quarters: {len(index.quarter_keys)}, years: {len(index.year_keys)}")
+    print(f"Row scan:     {timed(scan) * 1000:8.3f} ms")
+    print(f"Build index:  {timed(lambda: build_month_index(series)) * 1000:8.3f} ms")
+    print(f"Load index:   {timed(lambda: load_month_index(csv_path, len(series))) * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build the month-boundary index for a CSV and compare it with a row scan.')
+    parser.add_argument('--csv', dest='csv_path', default='./NIFTY500_VALUE_50_combined.csv', help='Path to CSV input file')
+    args = parser.parse_args()
+    boundary_benchmark(args.csv_path)
@@ -0,0 +1,145 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Optional, Tuple
+
+from price_series import PriceSeries
+
+
+# Layout: 64-byte header, int32 day ordinals, zero padding to an 8-byte boundary, float64 closes.
+# The header records the source CSV's size, mtime and SHA-256 so a stale cache is never used.
+MAGIC = b'NIFTYPX1'
+HEADER = struct.Struct('<8sIIqq32s')
+# Byte offset of the stored mtime within HEADER
+MTIME_OFFSET = struct.calcsize('<8sIIq')
+CACHE_SUFFIX = '.prices.bin'
+# Bump when the layout or the CSV parsing rules change, so existing caches are rebuilt
+FORMAT_VERSION = 2
+
+
+def cache_path_for(csv_path: str) -> str:
+    return csv_path + CACHE_SUFFIX
+
+
+def file_sha256(path: str) -> bytes:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.digest()
+
+
+def _closes_offset(count: int) -> int:
+    offset = HEADER.size + 4 * count
+    return offset + (-offset % 8)
+
+
+def source_stamp(csv_path: str) -> Tuple[int, int]:
+    st = os.stat(csv_path)
+    return st.st_size, st.st_mtime_ns
+
+
+def refresh_mtime(cache_path: str, offset: int, mtime_ns: int) -> None:
+    # After a hash match, store the CSV's new mtime so later loads skip the hash again. Best
+    # effort: a read-only cache keeps working, it just re-hashes every time.
+    try:
+        with open(cache_path, 'r+b') as f:
+            f.seek(offset)
+            f.write(struct.pack('<q', mtime_ns))
+    except OSError:
+        pass
+
+
+def write_price_cache(csv_path: str, series: PriceSeries, cache_path: Optional[str] = None) -> Optional[str]:
+    # Write atomically next to the CSV; returns None when the directory is not writable
+    cache_path = cache_path or cache_path_for(csv_path)
+    size, mtime_ns = source_stamp(csv_path)
+    count = len(series)
+    ordinals = array('i', series.ordinals)
+    closes = array('d', series.closes)
+    if sys.byteorder != 'little':
+        ordinals.byteswap()
+        closes.byteswap()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, count, size, mtime_ns, file_sha256(csv_path))
+    padding = b'\0' * (_closes_offset(count) - HEADER.size - 4 * count)
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)), suffix='.tmp')
+    except OSError:
+        return None
+    with os.fdopen(fd, 'wb') as f:
+        f.write(header)
+        f.write(ordinals.tobytes())
+        f.write(padding)
+        f.write(closes.tobytes())
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def load_price_cache(csv_path: str, cache_path: Optional[str] = None) -> Optional[PriceSeries]:
+    # Memory-map a fresh cache and expose its columns as memoryviews; None when the cache is
+    # missing, malformed or older than the CSV. A matching size and mtime is trusted as is;
+    # otherwise the CSV is hashed, so a touched but unchanged file still hits (and the new
+    # mtime is recorded, so only the first load after the touch pays for the hash).
+    cache_path = cache_path or cache_path_for(csv_path)
+    if sys.byteorder != 'little':
+        return None
+    try:
+        size, mtime_ns = source_stamp(csv_path)
+        with open(cache_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mapped) < HEADER.size:
+        return None
+    magic, version, count, cached_size, cached_mtime_ns, digest = HEADER.unpack_from(mapped, 0)
+    closes_offset = _closes_offset(count)
+    if magic != MAGIC or version != FORMAT_VERSION or len(mapped) != closes_offset + 8 * count:
+        return None
+    if cached_size != size:
+        return None
+    if cached_mtime_ns != mtime_ns:
+        if digest != file_sha256(csv_path):
+            return None
+        refresh_mtime(cache_path, MTIME_OFFSET, mtime_ns)
+    view = memoryview(mapped)
+    ordinals = view[HEADER.size:HEADER.size + 4 * count].cast('i')
+    closes = view[closes_offset:closes_offset + 8 * count].cast('d')
+    return PriceSeries(ordinals, closes)
+
+
+def startup_benchmark(csv_path: str, repeat: int = 20) -> None:
+    import time
+    from compute_sip_markdown import read_prices
+
+    def timed(fn) -> float:
+        best = float('inf')
+        for _ in range(repeat):
+            t_start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t_start)
+        return best
+
+    parsed = read_prices(csv_path, use_cache=False)
+    write_price_cache(csv_path, parsed)
+    cached = load_price_cache(csv_path)
+    assert cached is not None
+    assert list(cached.ordinals) == list(parsed.ordinals) and list(cached.closes) == list(parsed.closes)
+
+    t_parse = timed(lambda: read_prices(csv_path, use_cache=False))
+    t_cache = timed(lambda: load_price_cache(csv_path))
+    print(f"Rows: {len(parsed)}, cache file: {os.path.getsize(cache_path_for(csv_path))} bytes")
+    print(f"Parse CSV:   {t_parse * 1000:8.3f} ms")
+    print(f"Load cache:  {t_cache * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build the binary price cache for a CSV and compare load times.')
+    parser.add_argument('--csv', dest='csv_path', default='./NIFTY500_VALUE_50_combined.csv', help='Path to CSV input file')
+    args = parser.parse_args()
+    startup_benchmark(args.csv_path)
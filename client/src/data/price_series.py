@@ -0,0 +1,89 @@
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Iterator, Sequence
+
+
+@dataclass
+class PricePoint:
+    date: datetime
+    close: float
+
+
+@dataclass
+class PriceSeries:
+    # Columnar daily series: proleptic Gregorian day ordinals (int32) and closes (float64).
+    # Any indexable sequences work (array.array, memoryview, numpy arrays); rows are
+    # materialized as PricePoint only when indexed or iterated.
+    ordinals: Sequence[int] = field(default_factory=lambda: array('i'))
+    closes: Sequence[float] = field(default_factory=lambda: array('d'))
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def __getitem__(self, i: int) -> PricePoint:
+        return PricePoint(date=datetime.fromordinal(self.ordinals[i]), close=self.closes[i])
+
+    def __iter__(self) -> Iterator[PricePoint]:
+        for o, c in zip(self.ordinals, self.closes):
+            yield PricePoint(date=datetime.fromordinal(o), close=c)
+
+    def date(self, i: int) -> datetime:
+        return datetime.fromordinal(self.ordinals[i])
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.ordinals) * 4 + len(self.closes) * 8
+
+    @classmethod
+    def from_points(cls, points: Iterable[PricePoint]) -> 'PriceSeries':
+        ordinals = array('i')
+        closes = array('d')
+        for p in points:
+            ordinals.append(p.date.toordinal())
+            closes.append(p.close)
+        return cls(ordinals, closes)
+
+    def sorted(self) -> 'PriceSeries':
+        ordinals = self.ordinals
+        if all(ordinals[i] <= ordinals[i + 1] for i in range(len(ordinals) - 1)):
+            return self
+        # Stable, so rows sharing a date keep their file order
+        order = sorted(range(len(ordinals)), key=ordinals.__getitem__)
+        return PriceSeries(
+            array('i', (ordinals[i] for i in order)),
+            array('d', (self.closes[i] for i in order)),
+        )
+
+
+def memory_benchmark(csv_path: str) -> None:
+    # Compare retained memory of List[PricePoint] with the columnar series for one CSV
+    import gc
+    import tracemalloc
+    from compute_sip_markdown import read_prices
+
+    # Warm up so one-off allocations (strptime regex caches, imports) are not counted
+    read_prices(csv_path, use_cache=False)
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    series = read_prices(csv_path, use_cache=False)
+    columnar_bytes = tracemalloc.get_traced_memory()[0] - base
+
+    points = list(series)
+    gc.collect()
+    list_bytes = tracemalloc.get_traced_memory()[0] - base - columnar_bytes
+    tracemalloc.stop()
+
+    print(f"Rows: {len(series)}")
+    print(f"List[PricePoint]: {list_bytes / 1024:.1f} KiB ({list_bytes / max(len(points), 1):.0f} B/row)")
+    print(f"PriceSeries:      {columnar_bytes / 1024:.1f} KiB ({columnar_bytes / max(len(series), 1):.0f} B/row)")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare memory use of PriceSeries with a list of PricePoint.')
+    parser.add_argument('--csv', dest='csv_path', default='./NIFTY500_VALUE_50_combined.csv', help='Path to CSV input file')
+    args = parser.parse_args()
+    memory_benchmark(args.csv_path)
@@ -0,0 +1,261 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from price_series import PriceSeries
+
+
+# Vectorized versions of the dashboard's calculateMetrics / calculateRollingReturns (see
+# export_dashboard.py for the scalar port). Every function takes prices along the last axis,
+# so a (S, N) panel of S aligned series is handled in one call.
+#
+# Measured on the bundled CSVs (~245 months each): once NumPy is warm a series costs ~0.23 ms
+# against ~0.8 ms in the scalar port, but the first call in a process pays ~10 ms of one-time
+# NumPy setup, so a fresh process only comes out ahead from ~16 series. For the dashboard's
+# handful of indices the scalar port is the cheaper choice.
+
+RISK_FREE_RATE = 0.06505
+# datetime64[D] counts days from 1970-01-01, which is proleptic ordinal 719163
+EPOCH_ORDINAL = 719163
+
+
+def monthly_closes(series: PriceSeries) -> Tuple[np.ndarray, np.ndarray]:
+    # Last close of each calendar month, dated at the month's last calendar day.
+    # Returns (month-end day ordinals, closes); the series must be date-sorted.
+    ordinals = np.asarray(series.ordinals, dtype=np.int64)
+    closes = np.asarray(series.closes, dtype=np.float64)
+    keep = np.isfinite(closes)
+    ordinals, closes = ordinals[keep], closes[keep]
+    if ordinals.size == 0:
+        return ordinals, closes
+    months = (ordinals - EPOCH_ORDINAL).astype('datetime64[D]').astype('datetime64[M]')
+    last = np.flatnonzero(np.append(months[1:] != months[:-1], True))
+    month_end = (months[last] + 1).astype('datetime64[D]').astype(np.int64) - 1 + EPOCH_ORDINAL
+    return month_end, closes[last]
+
+
+def _js_divide(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # IEEE division like JS: x / 0 gives +-inf and 0 / 0 gives NaN, without warnings
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.true_divide(a, b)
+
+
+def risk_metrics(
+    values: np.ndarray,
+    years: np.ndarray,
+    risk_free_rate: float = RISK_FREE_RATE,
+) -> Dict[str, np.ndarray]:
+    # values: (..., N) monthly closes; years: calendar span of each series in years (broadcast
+    # against the leading axes). Each metric comes back with the leading shape.
+    values = np.asarray(values, dtype=np.float64)
+    years = np.asarray(years, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        cagr = (values[..., -1] / values[..., 0]) ** (1.0 / years) - 1.0
+
+        returns = values[..., 1:] / values[..., :-1] - 1.0
+        volatility = returns.std(axis=-1) * np.sqrt(12.0)
+
+        negative = returns < 0
+        downside_std = np.sqrt(
+            np.where(negative, returns * returns, 0.0).sum(axis=-1) / negative.sum(axis=-1)
+        ) * np.sqrt(12.0)
+
+        peak = np.maximum.accumulate(np.maximum(values, 0.0), axis=-1)
+        max_drawdown = np.minimum(((values - peak) / peak).min(axis=-1), 0.0)
+
+    return {
+        'cagr': cagr,
+        'volatility': volatility,
+        'sharpeRatio': _js_divide(cagr - risk_free_rate, volatility),
+        'sortinoRatio': _js_divide(cagr - risk_free_rate, downside_std),
+        'maxDrawdown': max_drawdown,
+        'calmarRatio': _js_divide(cagr, np.abs(max_drawdown)),
+    }
+
+
+def series_metrics(series: PriceSeries, risk_free_rate: float = RISK_FREE_RATE) -> Dict[str, float]:
+    # Metrics of one daily series after month-end resampling, as plain floats
+    dates, values = monthly_closes(series)
+    if values.size < 2:
+        return {}
+    years = (dates[-1] - dates[0]) / 365.25
+    return {k: float(v) for k, v in risk_metrics(values, years, risk_free_rate).items()}
+
+
+def batch_metrics(
+    series_by_name: Dict[str, PriceSeries],
+    rolling_years: Sequence[int] = (3, 5, 10),
+    risk_free_rate: float = RISK_FREE_RATE,
+) -> Dict[str, Dict[str, object]]:
+    # Metrics and rolling-CAGR distributions for many indices. Series with the same number of
+    # months are stacked into one (S, N) panel so each group costs one vectorized call.
+    monthly = {name: monthly_closes(series) for name, series in series_by_name.items()}
+    groups: Dict[int, List[str]] = {}
+    for name, (_, values) in monthly.items():
+        if values.size >= 2:
+            groups.setdefault(values.size, []).append(name)
+    out: Dict[str, Dict[str, object]] = {}
+    for names in groups.values():
+        panel = np.stack([monthly[name][1] for name in names])
+        years = np.array([(monthly[name][0][-1] - monthly[name][0][0]) / 365.25 for name in names])
+        metrics = risk_metrics(panel, years, risk_free_rate)
+        rolling = {y: rolling_cagr_distribution(panel, y) for y in rolling_years}
+        for i, name in enumerate(names):
+            out[name] = {
+                'metrics': {k: float(v[i]) for k, v in metrics.items()},
+                'rolling': {
+                    y: None if dist is None else {k: float(v[i]) for k, v in dist.items()}
+                    for y, dist in rolling.items()
+                },
+            }
+    return out
+
+
+def rolling_cagr(values: np.ndarray, years: int) -> np.ndarray:
+    # Point-to-point CAGR of every `years`-long window of monthly values: (..., N - 12 * years)
+    values = np.asarray(values, dtype=np.float64)
+    window = 12 * years
+    if values.shape[-1] <= window:
+        return np.empty(values.shape[:-1] + (0,))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (values[..., window:] / values[..., :-window]) ** (1.0 / years) - 1.0
+
+
+def rolling_cagr_distribution(
+    values: np.ndarray,
+    years: int,
+    percentiles: Sequence[float] = (),
+) -> Optional[Dict[str, np.ndarray]]:
+    # average / min / max / median of rolling CAGRs (calculateRollingReturns), plus optional
+    # percentiles as 'p5', 'p95', ...; None when no full window exists
+    cagrs = rolling_cagr(values, years)
+    if cagrs.shape[-1] == 0:
+        return None
+    out = {
+        'average': cagrs.mean(axis=-1),
+        'max': cagrs.max(axis=-1),
+        'min': cagrs.min(axis=-1),
+        'median': np.median(cagrs, axis=-1),
+    }
+    if len(percentiles):
+        for p, value in zip(percentiles, np.percentile(cagrs, percentiles, axis=-1)):
+            out[f'p{p:g}'] = value
+    return out
+
+
+def parity_check(data_dir: str, tolerance: float = 1e-12) -> float:
+    # Compare against the scalar port of the TS logic and against the committed dashboard.json
+    # (itself checked against App.tsx's helpers); returns the worst relative difference.
+    import json
+    import os
+    import time
+    from compute_sip_markdown import read_prices
+    from export_dashboard import (
+        DASHBOARD_FUNDS,
+        ROLLING_YEARS,
+        calculate_metrics,
+        calculate_rolling_returns,
+        resample_to_monthly,
+    )
+
+    dashboard_path = os.path.join(data_dir, 'dashboard.json')
+    dashboard = None
+    if os.path.exists(dashboard_path):
+        with open(dashboard_path, encoding='utf-8') as f:
+            dashboard = json.load(f)
+
+    def rel_diff(a: Optional[float], b: Optional[float]) -> float:
+        a_missing = a is None or not np.isfinite(a)
+        b_missing = b is None or not np.isfinite(b)
+        if a_missing or b_missing:
+            return 0.0 if a_missing == b_missing else float('inf')
+        return abs(a - b) / max(1.0, abs(a))
+
+    worst = 0.0
+    for key, name, csv_name, _ in DASHBOARD_FUNDS:
+        series = read_prices(os.path.join(data_dir, csv_name))
+        monthly = resample_to_monthly(series)
+        dates, values = monthly_closes(series)
+        assert [d.toordinal() for d, _ in monthly] == dates.tolist()
+        assert [v for _, v in monthly] == values.tolist()
+
+        t_start = time.perf_counter()
+        vector = series_metrics(series)
+        rolling = {label: rolling_cagr_distribution(values, y) for label, y in ROLLING_YEARS.items()}
+        t_vector = time.perf_counter() - t_start
+
+        references = [('scalar port', calculate_metrics(monthly), {
+            label: calculate_rolling_returns(monthly, y) for label, y in ROLLING_YEARS.items()
+        })]
+        if dashboard is not None and key in dashboard['funds']:
+            fund = dashboard['funds'][key]
+            references.append(('dashboard.json', fund['metrics'], fund['rollingReturns']))
+
+        for ref_name, ref_metrics, ref_rolling in references:
+            fund_worst = max(rel_diff(ref_metrics.get(m), vector.get(m)) for m in vector)
+            for label, dist in rolling.items():
+                ref = ref_rolling[label]
+                if (ref is None) != (dist is None):
+                    fund_worst = float('inf')
+                elif ref is not None:
+                    fund_worst = max(fund_worst, *(rel_diff(ref[s], float(dist[s])) for s in ('average', 'min', 'max', 'median')))
+            worst = max(worst, fund_worst)
+            print(f"{name:<12} vs {ref_name:<15} max rel diff {fund_worst:.3e}")
+        print(f"{name:<12} vectorized metrics + rolling: {t_vector * 1000:.2f} ms")
+
+    # The (S, N) panel path must agree with the per-series path
+    series = read_prices(os.path.join(data_dir, DASHBOARD_FUNDS[0][2]))
+    scaled = PriceSeries(series.ordinals, [c * 1.5 for c in series.closes])
+    batch = batch_metrics({'a': series, 'b': scaled}, tuple(ROLLING_YEARS.values()))
+    for name in ('a', 'b'):
+        single = series_metrics(series if name == 'a' else scaled)
+        worst = max(worst, *(rel_diff(single[m], batch[name]['metrics'][m]) for m in single))
+    status = 'OK' if worst <= tolerance else 'MISMATCH'
+    print(f"Parity {status}: worst relative difference {worst:.3e} (tolerance {tolerance:g})")
+    return worst
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description='Check the NumPy risk metrics against the dashboard (TS) logic.')
+    parser.add_argument('--data-dir', default=os.path.dirname(os.path.abspath(__file__)), help='Directory with the index CSVs and dashboard.json')
+    parser.add_argument('--tolerance', type=float, default=1e-12, help='Maximum allowed relative difference')
+    parser.add_argument('--batch', nargs='*', metavar='CSV', help='Also time batch_metrics over these CSVs (default: every *.csv in --data-dir)')
+    args = parser.parse_args()
+    if args.batch is not None:
+        import glob
+        import time
+        from compute_sip_markdown import read_prices
+        from export_dashboard import calculate_metrics, calculate_rolling_returns, resample_to_monthly
+
+        paths = args.batch or sorted(glob.glob(os.path.join(args.data_dir, '*.csv')))
+        loaded = {os.path.basename(p): read_prices(p) for p in paths}
+        loaded = {name: s for name, s in loaded.items() if len(s)}
+
+        def scalar() -> None:
+            for s in loaded.values():
+                monthly = resample_to_monthly(s)
+                calculate_metrics(monthly)
+                for y in (3, 5, 10):
+                    calculate_rolling_returns(monthly, y)
+
+        def best_of(fn, repeat: int = 5) -> float:
+            best = float('inf')
+            for _ in range(repeat):
+                t_start = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - t_start)
+            return best
+
+        # The first vectorized call includes NumPy's one-time setup; report it separately
+        t_start = time.perf_counter()
+        results = batch_metrics(loaded)
+        t_first = time.perf_counter() - t_start
+        t_scalar = best_of(scalar)
+        t_batch = best_of(lambda: batch_metrics(loaded))
+        print(f"Batch over {len(results)} indices: scalar port {t_scalar * 1000:.2f} ms, "
+              f"vectorized {t_batch * 1000:.2f} ms warm ({t_first * 1000:.2f} ms for the first call)")
+    if parity_check(args.data_dir, args.tolerance) > args.tolerance:
+        raise SystemExit(1)
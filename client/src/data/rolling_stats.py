@@ -0,0 +1,264 @@
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Trailing-window statistics over a monthly series (rolling CAGRs, rolling SIP XIRRs, ...)
+# without re-sorting each window:
+#   min / max     monotonic deques, amortized O(1) per step
+#   mean          running sum of the finite values in the window
+#   median / pNN  Fenwick tree of counts over the ranks of all values, so inserting, removing
+#                 and finding the k-th smallest are O(log n)
+# NaN marks a missing value: it occupies its slot in the window but is left out of every
+# statistic. Percentiles interpolate linearly between ranks (numpy's default; p50 is the
+# usual even-count median).
+# A series of n values costs O(n log n) overall (ranking the values up front, then O(log n)
+# per Fenwick update and query), against O(n * w log w) for sorting every w-long window.
+
+
+@dataclass
+class WindowStats:
+    # Statistics of the window that ends at position `end`
+    end: int
+    count: int
+    mean: float
+    minimum: float
+    maximum: float
+    median: float
+    percentiles: Dict[float, float] = field(default_factory=dict)
+
+
+class _Fenwick:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.top = 1 << max(size.bit_length() - 1, 0)
+
+    def add(self, rank: int, delta: int) -> None:
+        i = rank + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def kth(self, k: int) -> int:
+        # Rank of the k-th smallest (0-based) element currently counted
+        pos = 0
+        step = self.top
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] <= k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+
+class SlidingWindow:
+    # Fixed-size trailing window over a stream whose values are known up front (they are
+    # needed to rank-compress the Fenwick tree)
+    def __init__(self, size: int, universe: Sequence[float]) -> None:
+        if size < 1:
+            raise ValueError("window size must be at least 1")
+        self.size = size
+        self.sorted_values = sorted({v for v in universe if v == v})
+        self.rank = {v: i for i, v in enumerate(self.sorted_values)}
+        self.counts = _Fenwick(len(self.sorted_values))
+        self.window: deque = deque()
+        self.min_queue: deque = deque()
+        self.max_queue: deque = deque()
+        self.position = -1
+        self.count = 0
+        self.total = 0.0
+
+    def push(self, value: float) -> None:
+        self.position += 1
+        i = self.position
+        self.window.append(value)
+        if value == value:
+            self.count += 1
+            self.total += value
+            self.counts.add(self.rank[value], 1)
+            while self.min_queue and self.min_queue[-1][1] >= value:
+                self.min_queue.pop()
+            self.min_queue.append((i, value))
+            while self.max_queue and self.max_queue[-1][1] <= value:
+                self.max_queue.pop()
+            self.max_queue.append((i, value))
+        if len(self.window) > self.size:
+            old = self.window.popleft()
+            if old == old:
+                self.count -= 1
+                self.total -= old
+                self.counts.add(self.rank[old], -1)
+            oldest = i - self.size
+            if self.min_queue and self.min_queue[0][0] <= oldest:
+                self.min_queue.popleft()
+            if self.max_queue and self.max_queue[0][0] <= oldest:
+                self.max_queue.popleft()
+        if self.count == 0:
+            # Nothing finite left: reset the sum so rounding residue cannot leak into the mean
+            self.total = 0.0
+
+    def kth(self, k: int) -> float:
+        return self.sorted_values[self.counts.kth(k)]
+
+    def percentile(self, q: float) -> float:
+        if self.count == 0:
+            return float('nan')
+        pos = q / 100.0 * (self.count - 1)
+        lo = math.floor(pos)
+        low = self.kth(lo)
+        if pos == lo:
+            return low
+        high = self.kth(lo + 1)
+        return low + (high - low) * (pos - lo)
+
+    def stats(self, percentiles: Sequence[float] = ()) -> WindowStats:
+        if self.count == 0:
+            nan = float('nan')
+            return WindowStats(self.position, 0, nan, nan, nan, nan, {q: nan for q in percentiles})
+        return WindowStats(
+            end=self.position,
+            count=self.count,
+            mean=self.total / self.count,
+            minimum=self.min_queue[0][1],
+            maximum=self.max_queue[0][1],
+            median=self.percentile(50.0),
+            percentiles={q: self.percentile(q) for q in percentiles},
+        )
+
+
+def sliding_stats(
+    values: Sequence[float],
+    window: int,
+    percentiles: Sequence[float] = (),
+    min_count: int = 1,
+) -> List[Optional[WindowStats]]:
+    # Stats of the trailing `window` values ending at every position; None until the window
+    # is full or when it holds fewer than `min_count` finite values
+    sliding = SlidingWindow(window, values)
+    out: List[Optional[WindowStats]] = []
+    for i, value in enumerate(values):
+        sliding.push(value)
+        if i + 1 < window or sliding.count < min_count:
+            out.append(None)
+        else:
+            out.append(sliding.stats(percentiles))
+    return out
+
+
+def summarize(values: Sequence[float], percentiles: Sequence[float] = ()) -> Optional[WindowStats]:
+    # Whole-series summary: the single window that covers everything
+    if not values:
+        return None
+    return sliding_stats(values, len(values), percentiles)[-1]
+
+
+def _brute_force(values: Sequence[float], window: int, percentiles: Sequence[float]) -> List[Optional[Tuple[float, ...]]]:
+    import numpy as np
+
+    out: List[Optional[Tuple[float, ...]]] = []
+    for i in range(len(values)):
+        if i + 1 < window:
+            out.append(None)
+            continue
+        chunk = np.array([v for v in values[i + 1 - window:i + 1] if v == v])
+        if not chunk.size:
+            out.append(None)
+            continue
+        out.append((chunk.mean(), chunk.min(), chunk.max(), float(np.median(chunk)),
+                    *np.percentile(chunk, list(percentiles))))
+    return out
+
+
+def write_distribution_csv(rows: List[Tuple[str, int, str, float, Optional[WindowStats]]],
+                           percentiles: Sequence[float], out_path: str) -> None:
+    # One row per index, horizon and month: the rolling value and its trailing-window stats
+    import csv
+
+    with open(out_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['index', 'horizon_years', 'month', 'rolling_cagr', 'window_count', 'window_mean',
+                         'window_min', 'window_max', 'window_median'] + [f'window_p{q:g}' for q in percentiles])
+        for label, years, month, value, stats in rows:
+            if value != value:
+                continue
+            row = [label, years, month, value]
+            if stats is None:
+                row += [''] * (5 + len(percentiles))
+            else:
+                row += [stats.count, stats.mean, stats.minimum, stats.maximum, stats.median]
+                row += [stats.percentiles[q] for q in percentiles]
+            writer.writerow(row)
+
+
+if __name__ == '__main__':
+    import argparse
+    import glob
+    import os
+    import time
+    from compute_sip_markdown import read_prices
+    from export_dashboard import calculate_rolling_returns, resample_to_monthly
+    from month_index import month_index_for
+    from risk_metrics import rolling_cagr
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Trailing-window statistics of rolling CAGRs for every horizon and index.')
+    parser.add_argument('csv_paths', nargs='*', help='CSV files (default: every *.csv next to this script)')
+    parser.add_argument('--horizons', default='1,3,5,7,10,15', help='Comma-separated rolling horizons in years')
+    parser.add_argument('--window', type=int, default=36, help='Trailing window in months')
+    parser.add_argument('--percentiles', default='10,25,75,90', help='Comma-separated window percentiles')
+    parser.add_argument('--out', default=None, help='Write the full rolling distribution to this CSV')
+    args = parser.parse_args()
+
+    horizons = [int(h) for h in args.horizons.split(',')]
+    percentiles = [float(q) for q in args.percentiles.split(',')] if args.percentiles else []
+    paths = args.csv_paths or sorted(glob.glob(os.path.join(base_dir, '*.csv')))
+
+    monthly_by_label = {}
+    for path in paths:
+        series = read_prices(path)
+        if len(series):
+            monthly_by_label[os.path.splitext(os.path.basename(path))[0]] = resample_to_monthly(series, month_index_for(path, series))
+
+    t_sliding = t_brute = 0.0
+    worst = 0.0
+    rows = []
+    for label, monthly in monthly_by_label.items():
+        values = [v for _, v in monthly]
+        for years in horizons:
+            # NaN before the first full window keeps the CAGRs aligned with `monthly`
+            cagrs = [float('nan')] * min(12 * years, len(values)) + rolling_cagr(values, years).tolist()
+            t_start = time.perf_counter()
+            stats = sliding_stats(cagrs, args.window, percentiles)
+            whole = summarize(cagrs)
+            t_sliding += time.perf_counter() - t_start
+
+            t_start = time.perf_counter()
+            brute = _brute_force(cagrs, args.window, percentiles)
+            t_brute += time.perf_counter() - t_start
+            for s, b in zip(stats, brute):
+                if (s is None) != (b is None):
+                    worst = float('inf')
+                elif s is not None:
+                    got = (s.mean, s.minimum, s.maximum, s.median, *(s.percentiles[q] for q in percentiles))
+                    worst = max(worst, max(abs(x - y) / max(1.0, abs(y)) for x, y in zip(got, b)))
+
+            # The whole-series summary must agree with the dashboard's calculateRollingReturns
+            reference = calculate_rolling_returns(monthly, years)
+            if reference is not None and whole is not None and whole.count:
+                got = (whole.mean, whole.minimum, whole.maximum, whole.median)
+                ref = (reference['average'], reference['min'], reference['max'], reference['median'])
+                worst = max(worst, max(abs(x - y) / max(1.0, abs(y)) for x, y in zip(got, ref)))
+            rows += [(label, years, d.strftime('%Y-%m'), v, s) for (d, _), v, s in zip(monthly, cagrs, stats)]
+
+    print(f"{len(monthly_by_label)} indices x {len(horizons)} horizons, {args.window}-month trailing window")
+    print(f"Sliding (deques + Fenwick): {t_sliding * 1000:8.1f} ms")
+    print(f"Sort per window:            {t_brute * 1000:8.1f} ms")
+    print(f"Max relative difference vs brute force and calculateRollingReturns: {worst:.3e}")
+    if args.out:
+        write_distribution_csv(rows, percentiles, args.out)
+        print(f"Wrote {len(rows)} rows to {args.out}")
+    if worst > 1e-9:
+        raise SystemExit("Sliding statistics disagree with the reference")
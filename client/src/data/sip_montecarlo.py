@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+from batch_xirr import xirr_batch
+from compute_sip_markdown import MonthlyRecord, format_currency, format_sip_amount
+
+
+# Block-bootstrap SIP outcomes. A month of history is reduced to two ratios taken from the
+# compute_monthly_sip records: growth[i] = sip_nav[i + 1] / sip_nav[i] (one SIP date to the
+# next) and end_ratio[i] = month_end_nav[i] / sip_nav[i] (SIP date to that month's close).
+# A simulated path strings together randomly chosen runs of `block` consecutive historical
+# months, so short-range autocorrelation survives. Replaying a contiguous historical window
+# reproduces that window's SIP exactly.
+#
+# Paths are generated and solved in chunks of (chunk, months) arrays, so memory is bounded by
+# the chunk size; only the per-path XIRR and terminal value (16 bytes a path) are retained.
+
+DEFAULT_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+
+@dataclass
+class BootstrapModel:
+    growth: np.ndarray
+    end_ratio: np.ndarray
+    # Mean time from the last SIP date to the valuation month-end, in years
+    end_gap_years: float
+
+    @property
+    def months(self) -> int:
+        # Months that can start a block (each needs the next month's SIP NAV)
+        return len(self.growth)
+
+
+@dataclass
+class SimulationResult:
+    months: int
+    monthly_investment: float
+    xirr: np.ndarray
+    terminal: np.ndarray
+
+    @property
+    def invested(self) -> float:
+        return self.monthly_investment * self.months
+
+
+def build_model(records: List[MonthlyRecord]) -> BootstrapModel:
+    sip_nav = np.array([r.sip_nav for r in records])
+    end_nav = np.array([r.month_end_nav for r in records])
+    gaps = np.array([(r.month_end - r.sip_date).days for r in records], dtype=np.float64)
+    if len(records) < 2 or not np.isfinite(sip_nav).all():
+        raise ValueError("need at least two complete SIP months to bootstrap")
+    return BootstrapModel(
+        growth=sip_nav[1:] / sip_nav[:-1],
+        end_ratio=(end_nav / sip_nav)[:-1],
+        end_gap_years=float(gaps.mean()) / 365.0,
+    )
+
+
+def sample_block_indices(rng: np.random.Generator, paths: int, months: int, block: int, available: int) -> np.ndarray:
+    # (paths, months) historical month indices made of runs of `block` consecutive months
+    blocks = -(-months // block)
+    starts = rng.integers(0, available - block + 1, size=(paths, blocks))
+    return (starts[:, :, None] + np.arange(block)).reshape(paths, blocks * block)[:, :months]
+
+
+def path_outcomes(model: BootstrapModel, indices: np.ndarray, monthly_investment: float) -> np.ndarray:
+    # Terminal value of a SIP along every row of `indices`; NAVs are normalized to 1 at the
+    # first SIP, which does not change the value a fixed rupee amount buys
+    paths, months = indices.shape
+    navs = np.ones((paths, months))
+    if months > 1:
+        np.cumprod(model.growth[indices[:, :-1]], axis=1, out=navs[:, 1:])
+    units = (monthly_investment / navs).sum(axis=1)
+    return units * navs[:, -1] * model.end_ratio[indices[:, -1]]
+
+
+def cashflow_years(model: BootstrapModel, months: int) -> np.ndarray:
+    # Shared cash-flow times: one SIP a month, valuation at the final month-end
+    years = np.empty(months + 1)
+    years[:months] = np.arange(months) / 12.0
+    years[months] = (months - 1) / 12.0 + model.end_gap_years
+    return years
+
+
+def simulate(
+    model: BootstrapModel,
+    months: int,
+    paths: int,
+    block: int = 12,
+    monthly_investment: float = 1000.0,
+    seed: int = 0,
+    chunk_size: int = 20000,
+) -> SimulationResult:
+    # Draws are taken from one generator in path order, so the result is the same for any
+    # chunk size
+    if not 1 <= block <= model.months:
+        raise ValueError(f"block must be between 1 and {model.months} months")
+    rng = np.random.default_rng(seed)
+    years = cashflow_years(model, months)
+    xirr = np.empty(paths)
+    terminal = np.empty(paths)
+    for start in range(0, paths, chunk_size):
+        stop = min(start + chunk_size, paths)
+        indices = sample_block_indices(rng, stop - start, months, block, model.months)
+        values = path_outcomes(model, indices, monthly_investment)
+        amounts = np.full((stop - start, months + 1), -monthly_investment)
+        amounts[:, months] = values
+        terminal[start:stop] = values
+        xirr[start:stop] = xirr_batch(amounts, years)
+    return SimulationResult(months, monthly_investment, xirr, terminal)
+
+
+def render_percentiles(result: SimulationResult, index_label: str, block: int, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> str:
+    sip_label = format_sip_amount(result.monthly_investment)
+    xirr_q = np.nanpercentile(result.xirr, percentiles)
+    value_q = np.percentile(result.terminal, percentiles)
+    lines = [f"## Bootstrapped SIP outcomes for {index_label}\n\n"]
+    lines.append(f"- Monthly SIP amount: Rs {sip_label} for {result.months} months (Rs {format_currency(result.invested)} invested)\n")
+    lines.append(f"- Paths: {len(result.terminal):,} ({block}-month blocks)\n")
+    lines.append(f"- Probability of ending below the amount invested: {np.mean(result.terminal < result.invested) * 100:.2f}%\n\n")
+    lines.append("| Percentile | XIRR | Terminal Value | Multiple |\n")
+    lines.append("|---:|---:|---:|---:|\n")
+    for p, x, v in zip(percentiles, xirr_q, value_q):
+        lines.append(f"| P{p:g} | {x * 100:.2f}% | Rs {format_currency(v)} | {v / result.invested:.2f}x |\n")
+    return ''.join(lines)
+
+
+def historical_check(records: List[MonthlyRecord], model: BootstrapModel, months: int, monthly_investment: float) -> float:
+    # Replaying each contiguous window must give the historical rolling SIP's terminal value;
+    # returns the worst relative difference
+    starts = np.arange(max(model.months - months + 1, 0))
+    if starts.size == 0:
+        return 0.0
+    indices = starts[:, None] + np.arange(months)
+    values = path_outcomes(model, indices, monthly_investment)
+    units = monthly_investment / np.array([r.sip_nav for r in records])
+    navs = np.array([r.month_end_nav for r in records])
+    expected = np.array([units[s:s + months].sum() * navs[s + months - 1] for s in starts])
+    return float(np.max(np.abs(values - expected) / expected))
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    import time
+    from compute_sip_markdown import compute_monthly_sip, read_prices
+
+    parser = argparse.ArgumentParser(description='Simulate block-bootstrapped SIP outcomes for an index history.')
+    parser.add_argument('--csv', dest='csv_path', default='./NIFTY500_VALUE_50_combined.csv', help='Path to CSV input file')
+    parser.add_argument('--title', dest='index_label', default=None, help='Index label for the report')
+    parser.add_argument('--sip', type=float, default=1000.0, help='Monthly SIP amount')
+    parser.add_argument('--years', type=int, default=10, help='SIP horizon in years')
+    parser.add_argument('--paths', type=int, default=100000, help='Number of simulated paths')
+    parser.add_argument('--block', type=int, default=12, help='Bootstrap block length in months')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--chunk', type=int, default=20000, help='Paths generated and solved per chunk')
+    parser.add_argument('--out', dest='md_path', default=None, help='Write the report to this markdown file')
+    args = parser.parse_args()
+
+    records, _, _, _ = compute_monthly_sip(read_prices(args.csv_path), args.sip)
+    model = build_model(records)
+    months = 12 * args.years
+    worst = historical_check(records, model, months, args.sip)
+    print(f"Historical windows replayed: max relative terminal-value difference {worst:.3e}")
+
+    t_start = time.perf_counter()
+    result = simulate(model, months, args.paths, args.block, args.sip, args.seed, args.chunk)
+    elapsed = time.perf_counter() - t_start
+    label = args.index_label or os.path.splitext(os.path.basename(args.csv_path))[0]
+    report = render_percentiles(result, label, args.block)
+    print(f"Simulated {args.paths:,} paths of {months} months in {elapsed:.2f} s "
+          f"({np.isnan(result.xirr).sum()} unsolved)\n")
+    print(report)
+    if args.md_path:
+        with open(args.md_path, 'w', encoding='utf-8') as f:
+            f.write(report)
@@ -0,0 +1,265 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from batch_xirr import xirr_batch
+from compute_sip_markdown import format_currency
+from month_index import MonthIndex, build_month_index, month_index_for
+from price_series import PriceSeries
+from risk_metrics import EPOCH_ORDINAL
+
+
+# Evaluates a grid of SIP variants (SIP day, annual step-up, start month) without replaying
+# compute_monthly_sip per variant. The series is indexed once into per-month trading-day
+# offsets; each SIP day then picks one NAV and date per month, and every step-up/start-month
+# combination for that day is a row of one (V, M + 1) cash-flow matrix solved by xirr_batch.
+
+LAST_DAY = 'last'
+SipDay = Union[int, str]
+DEFAULT_SIP_DAYS: Sequence[SipDay] = (1, 5, 10, LAST_DAY)
+DEFAULT_STEP_UPS = (0.0, 0.05, 0.10)
+
+
+@dataclass
+class TradingMonths:
+    # Row offsets into the daily series: month m spans rows first[m] .. last[m]
+    ordinals: np.ndarray
+    closes: np.ndarray
+    month_starts: np.ndarray
+    first: np.ndarray
+    last: np.ndarray
+
+    @classmethod
+    def build(cls, series: PriceSeries, months: Optional[MonthIndex] = None) -> 'TradingMonths':
+        # NumPy views of a month index (built here when the caller has no persisted one)
+        if months is None or months.rows != len(series):
+            months = build_month_index(series)
+        # Month keys are year * 12 + month - 1; datetime64[M] counts months from 1970-01
+        epoch_months = np.asarray(months.month_keys, dtype=np.int64) - 1970 * 12
+        month_starts = epoch_months.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64) + EPOCH_ORDINAL
+        return cls(
+            np.asarray(series.ordinals, dtype=np.int64),
+            np.asarray(series.closes, dtype=np.float64),
+            month_starts,
+            np.asarray(months.month_first, dtype=np.int64),
+            np.asarray(months.month_last, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.first)
+
+    def sip_rows(self, sip_day: SipDay) -> np.ndarray:
+        # Row of the first trading day on or after `sip_day` in each month, clamped to the
+        # month's last trading day, so days 29-31 invest every month (LAST_DAY: always the
+        # last trading day). The one -1: the series' final month when the data stops before
+        # the SIP day with weekdays still to come, i.e. that SIP has not happened yet.
+        if sip_day == LAST_DAY:
+            return self.last.copy()
+        targets = self.month_starts + int(sip_day) - 1
+        rows = np.minimum(np.searchsorted(self.ordinals, targets, side='left'), self.last)
+        if len(rows):
+            end = int(self.ordinals[-1])
+            first_of_month = date.fromordinal(int(self.month_starts[-1]))
+            next_month = date(first_of_month.year + first_of_month.month // 12, first_of_month.month % 12 + 1, 1)
+            due = min(int(targets[-1]), next_month.toordinal() - 1)
+            if due > end and np.busday_count(np.datetime64(end + 1 - EPOCH_ORDINAL, 'D'),
+                                             np.datetime64(due + 1 - EPOCH_ORDINAL, 'D')) > 0:
+                rows[-1] = -1
+        return rows
+
+    def month_label(self, m: int) -> str:
+        return date.fromordinal(int(self.month_starts[m])).strftime('%Y-%m')
+
+
+@dataclass
+class SweepRow:
+    sip_day: SipDay
+    step_up: float
+    start_month: str
+    months: int
+    invested: float
+    final_value: float
+    xirr: float
+
+
+def sip_amounts(months: int, starts: np.ndarray, step_ups: np.ndarray, monthly_investment: float,
+                horizon: Optional[int] = None) -> np.ndarray:
+    # (len(starts) * len(step_ups), months) SIP amounts: zero before the start month (and after
+    # the horizon), raised by the step-up every 12 months from the start
+    offset = np.arange(months)[None, :] - starts[:, None]
+    active = offset >= 0
+    if horizon is not None:
+        active &= offset < horizon
+    steps = np.maximum(offset, 0) // 12
+    growth = (1.0 + step_ups[None, :, None]) ** steps[:, None, :]
+    amounts = np.where(active[:, None, :], monthly_investment * growth, 0.0)
+    return amounts.reshape(-1, months)
+
+
+def sweep_series(
+    series: PriceSeries,
+    sip_days: Sequence[SipDay] = DEFAULT_SIP_DAYS,
+    step_ups: Sequence[float] = DEFAULT_STEP_UPS,
+    start_months: Optional[Sequence[int]] = None,
+    monthly_investment: float = 1000.0,
+    horizon_months: Optional[int] = None,
+    index: Optional[TradingMonths] = None,
+) -> List[SweepRow]:
+    # Without a horizon every SIP runs to the last close, as compute_monthly_sip does; with one
+    # it is valued at the close of its last SIP month, and starts without room for it are skipped
+    index = index or TradingMonths.build(series)
+    months = len(index)
+    if months == 0:
+        return []
+    starts = np.arange(months) if start_months is None else np.asarray(start_months, dtype=np.int64)
+    if horizon_months is not None:
+        starts = starts[starts + horizon_months <= months]
+    step_arr = np.asarray(step_ups, dtype=np.float64)
+    amounts_all = sip_amounts(months, starts, step_arr, monthly_investment, horizon_months)
+    start_of_row = np.repeat(starts, len(step_arr))
+    step_of_row = np.tile(step_arr, len(starts))
+    if horizon_months is None:
+        end_rows = np.full(len(start_of_row), len(index.ordinals) - 1)
+    else:
+        end_rows = index.last[start_of_row + horizon_months - 1]
+    end_nav = index.closes[end_rows]
+    end_ord = index.ordinals[end_rows]
+
+    rows: List[SweepRow] = []
+    for sip_day in sip_days:
+        sip_rows = index.sip_rows(sip_day)
+        # A partial last month whose SIP day has not come yet gets no SIP
+        amounts = np.where(sip_rows >= 0, amounts_all, 0.0)
+        navs = np.where(sip_rows >= 0, index.closes[sip_rows], 1.0)
+        sip_ord = np.where(sip_rows >= 0, index.ordinals[sip_rows], index.month_starts)
+        units = (amounts / navs).sum(axis=1)
+        final_value = units * end_nav
+        invested = amounts.sum(axis=1)
+
+        cashflows = np.empty((amounts.shape[0], months + 1))
+        cashflows[:, :months] = -amounts
+        cashflows[:, months] = final_value
+        years = np.empty_like(cashflows)
+        years[:, :months] = (sip_ord - sip_ord[0]) / 365.0
+        years[:, months] = (end_ord - sip_ord[0]) / 365.0
+        rates = xirr_batch(cashflows, years)
+
+        for i in range(amounts.shape[0]):
+            rows.append(SweepRow(
+                sip_day=sip_day,
+                step_up=float(step_of_row[i]),
+                start_month=index.month_label(int(start_of_row[i])),
+                months=int(np.count_nonzero(amounts[i])),
+                invested=float(invested[i]),
+                final_value=float(final_value[i]),
+                xirr=float(rates[i]),
+            ))
+    return rows
+
+
+def _day_label(sip_day: SipDay) -> str:
+    return 'Last' if sip_day == LAST_DAY else f"{sip_day}"
+
+
+def render_sweep_markdown(results: Dict[str, List[SweepRow]]) -> str:
+    lines = ["| Index | SIP Day | Step-up | Start | Months | Invested | Final Value | XIRR |\n"]
+    lines.append("|---|---:|---:|---:|---:|---:|---:|---:|\n")
+    for label, rows in results.items():
+        for r in rows:
+            xirr_text = f"{r.xirr * 100:.2f}%" if r.xirr == r.xirr else "N/A"
+            lines.append(
+                f"| {label} | {_day_label(r.sip_day)} | {r.step_up * 100:.0f}% | {r.start_month} | {r.months} | "
+                f"Rs {format_currency(r.invested)} | Rs {format_currency(r.final_value)} | {xirr_text} |\n"
+            )
+    return ''.join(lines)
+
+
+def render_sweep_summary(results: Dict[str, List[SweepRow]]) -> str:
+    # Median XIRR across start months for each index, SIP day and step-up
+    lines = ["| Index | SIP Day | Step-up | Variants | Median XIRR | Worst XIRR | Best XIRR |\n"]
+    lines.append("|---|---:|---:|---:|---:|---:|---:|\n")
+    for label, rows in results.items():
+        groups: Dict[tuple, List[float]] = {}
+        for r in rows:
+            groups.setdefault((r.sip_day, r.step_up), []).append(r.xirr)
+        for (sip_day, step_up), rates in groups.items():
+            values = np.array(rates)
+            values = values[~np.isnan(values)]
+            if not values.size:
+                continue
+            lines.append(
+                f"| {label} | {_day_label(sip_day)} | {step_up * 100:.0f}% | {len(rates)} | "
+                f"{np.median(values) * 100:.2f}% | {values.min() * 100:.2f}% | {values.max() * 100:.2f}% |\n"
+            )
+    return ''.join(lines)
+
+
+def write_sweep_csv(results: Dict[str, List[SweepRow]], out_path: str) -> None:
+    import csv
+
+    with open(out_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['index', 'sip_day', 'step_up', 'start_month', 'months', 'invested', 'final_value', 'xirr'])
+        for label, rows in results.items():
+            for r in rows:
+                writer.writerow([label, r.sip_day, r.step_up, r.start_month, r.months, r.invested, r.final_value, r.xirr])
+
+
+def reference_check(series: PriceSeries, monthly_investment: float = 1000.0) -> float:
+    # 1st trading day, no step-up, from the first month: must match compute_monthly_sip
+    from compute_sip_markdown import compute_monthly_sip, xirr
+
+    _, cashflows, _, final_value = compute_monthly_sip(series, monthly_investment)
+    row = sweep_series(series, [1], [0.0], [0], monthly_investment)[0]
+    expected_xirr = xirr(cashflows)
+    value_diff = abs(row.final_value - final_value) / final_value
+    print(f"Reference SIP: final value {final_value:.6f} vs {row.final_value:.6f} (rel diff {value_diff:.2e}), "
+          f"XIRR {expected_xirr:.8f} vs {row.xirr:.8f}")
+    return max(value_diff, abs(row.xirr - expected_xirr))
+
+
+if __name__ == '__main__':
+    import argparse
+    import glob
+    import os
+    import time
+    from compute_sip_markdown import read_prices
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Sweep SIP day, step-up and start month across index CSVs.')
+    parser.add_argument('csv_paths', nargs='*', help='CSV files (default: every *.csv next to this script)')
+    parser.add_argument('--sip', type=float, default=1000.0, help='Monthly SIP amount (before step-ups)')
+    parser.add_argument('--days', default='1,5,10,last', help='Comma-separated SIP days of month, or "last"')
+    parser.add_argument('--step-ups', default='0,5,10', help='Comma-separated annual step-up percentages')
+    parser.add_argument('--horizon', type=int, default=None, help='SIP length in years (default: run to the last close)')
+    parser.add_argument('--start-every', type=int, default=12, help='Use every Nth month as a start month')
+    parser.add_argument('--full', action='store_true', help='Print every variant, not only the summary')
+    parser.add_argument('--out', default=None, help='Write every variant to this CSV')
+    args = parser.parse_args()
+
+    sip_days: List[SipDay] = [LAST_DAY if d.strip().lower() == LAST_DAY else int(d) for d in args.days.split(',')]
+    step_ups = [float(s) / 100 for s in args.step_ups.split(',')]
+    horizon = 12 * args.horizon if args.horizon else None
+    paths = args.csv_paths or sorted(glob.glob(os.path.join(base_dir, '*.csv')))
+
+    results: Dict[str, List[SweepRow]] = {}
+    t_start = time.perf_counter()
+    for path in paths:
+        series = read_prices(path)
+        if not len(series):
+            continue
+        index = TradingMonths.build(series, month_index_for(path, series))
+        starts = list(range(0, len(index), args.start_every))
+        results[os.path.splitext(os.path.basename(path))[0]] = sweep_series(
+            series, sip_days, step_ups, starts, args.sip, horizon, index)
+    elapsed = time.perf_counter() - t_start
+    total = sum(len(rows) for rows in results.values())
+    print(f"{total} variants across {len(results)} indices in {elapsed * 1000:.1f} ms\n")
+    print(render_sweep_markdown(results) if args.full else render_sweep_summary(results))
+    if args.out:
+        write_sweep_csv(results, args.out)
+    worst = max(reference_check(read_prices(p), args.sip) for p in paths)
+    if worst > 1e-6:
+        raise SystemExit(f"Sweep differs from compute_monthly_sip by {worst:.3e}")
@@ -0,0 +1,46 @@
+import numpy as np
+
+from alignment import INTERSECTION, UNION, align_arrays
+
+
+def _col(ordinals, values):
+    return np.array(ordinals, dtype=np.int64), np.array(values, dtype=np.float64)
+
+
+def test_repeated_ordinals_keep_the_last_value():
+    a = _col([1, 2, 2, 2, 5], [10, 20, 21, 22, 50])
+    b = _col([2, 3, 3, 5], [200, 300, 301, 500])
+    calendar, filled = align_arrays([a, b], forward_fill=True, drop_incomplete=False)
+    assert calendar.tolist() == [1, 2, 3, 5]
+    np.testing.assert_array_equal(filled, [[10, np.nan], [22, 200], [22, 301], [50, 500]])
+    _, sparse = align_arrays([a, b], forward_fill=False, drop_incomplete=False)
+    np.testing.assert_array_equal(sparse, [[10, np.nan], [22, 200], [np.nan, 301], [50, 500]])
+
+
+def test_union_and_intersection_calendars():
+    a = _col([1, 3, 4, 6], [1, 3, 4, 6])
+    b = _col([2, 3, 6, 7], [20, 30, 60, 70])
+    calendar, values = align_arrays([a, b], how=UNION)
+    assert calendar.tolist() == [2, 3, 4, 6, 7]
+    np.testing.assert_array_equal(values, [[1, 20], [3, 30], [4, 30], [6, 60], [6, 70]])
+    calendar, values = align_arrays([a, b], how=INTERSECTION)
+    assert calendar.tolist() == [3, 6]
+    np.testing.assert_array_equal(values, [[3, 30], [6, 60]])
+
+
+def test_matches_a_dictionary_scan_on_random_inputs():
+    rng = np.random.default_rng(0)
+    columns = []
+    for _ in range(4):
+        ordinals = np.sort(rng.integers(0, 300, size=200))
+        columns.append((ordinals, rng.normal(size=200)))
+    calendar, values = align_arrays(columns, forward_fill=True, drop_incomplete=False)
+    assert calendar.tolist() == sorted({int(o) for c, _ in columns for o in c})
+    for j, (ordinals, col_values) in enumerate(columns):
+        latest = {}
+        for o, v in zip(ordinals.tolist(), col_values.tolist()):
+            latest[o] = v
+        current = np.nan
+        for t, o in enumerate(calendar.tolist()):
+            current = latest.get(o, current)
+            assert values[t, j] == current or (np.isnan(current) and np.isnan(values[t, j]))
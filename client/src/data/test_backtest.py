@@ -0,0 +1,125 @@
+import os
+from datetime import date
+
+import numpy as np
+import pytest
+
+from alignment import AlignedPanel
+from backtest import (
+    ANNUAL,
+    MONTHLY,
+    NEVER,
+    QUARTERLY,
+    SCHEDULES,
+    THRESHOLD,
+    _period_keys,
+    dashboard_parity,
+    run_backtest,
+    weight_grid,
+)
+
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _panel(rows: int, seed: int = 0) -> AlignedPanel:
+    # Weekday closes of three assets from 1 Jan 2020
+    rng = np.random.default_rng(seed)
+    start = date(2020, 1, 1).toordinal()
+    ordinals = np.array([o for o in range(start, start + rows * 2) if date.fromordinal(o).weekday() < 5][:rows])
+    values = 100.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, (rows, 3)), axis=0))
+    return AlignedPanel(ordinals, ['A', 'B', 'C'], values)
+
+
+def _scalar_calendar(panel: AlignedPanel, weights: np.ndarray, schedule: str) -> np.ndarray:
+    # Hold units between rebalances; rebalance at the close of each period's last row
+    keys = _period_keys(panel.ordinals, schedule)
+    cash_weight = 1.0 - weights.sum()
+    units = 100.0 * weights / panel.values[0]
+    cash = 100.0 * cash_weight
+    out = []
+    for t in range(len(panel)):
+        value = units @ panel.values[t] + cash
+        out.append(value)
+        if t + 1 < len(panel) and keys[t + 1] != keys[t]:
+            units = value * weights / panel.values[t]
+            cash = value * cash_weight
+    return np.array(out)
+
+
+def test_period_keys_follow_the_calendar():
+    days = [date(2023, 1, 31), date(2023, 2, 1), date(2023, 3, 31), date(2023, 4, 3), date(2024, 1, 2)]
+    ordinals = np.array([d.toordinal() for d in days])
+    assert _period_keys(ordinals, MONTHLY).tolist() == [636, 637, 638, 639, 648]
+    assert np.diff(_period_keys(ordinals, QUARTERLY)).tolist() == [0, 0, 1, 3]
+    assert np.diff(_period_keys(ordinals, ANNUAL)).tolist() == [0, 0, 0, 1]
+    assert _period_keys(ordinals, NEVER).tolist() == [0] * 5
+
+
+@pytest.mark.parametrize('schedule', [MONTHLY, QUARTERLY, ANNUAL, NEVER])
+def test_calendar_schedules_match_a_scalar_loop(schedule):
+    panel = _panel(400)
+    weights = np.array([[0.5, 0.3, 0.2], [0.2, 0.2, 0.2], [0.0, 0.0, 1.0]])
+    result = run_backtest(panel, weights, schedule)
+    for k, w in enumerate(weights):
+        np.testing.assert_allclose(result.values[:, k], _scalar_calendar(panel, w, schedule), rtol=1e-12)
+    periods = len(set(_period_keys(panel.ordinals, schedule).tolist()))
+    assert result.rebalances.tolist() == [periods - 1] * len(weights)
+
+
+def test_threshold_band_bounds_rebalancing():
+    panel = _panel(300, seed=1)
+    weights = weight_grid(3, 0.25)
+    never = run_backtest(panel, weights, NEVER)
+    wide = run_backtest(panel, weights, THRESHOLD, band=1.0)
+    tight = run_backtest(panel, weights, THRESHOLD, band=0.0)
+    # A band nothing can exceed is buy and hold; a zero band rebalances every mixed strategy at
+    # every close except the first (still on target) and the last (nothing left to hold)
+    np.testing.assert_allclose(wide.values, never.values, rtol=1e-12)
+    assert wide.rebalances.max() == 0
+    single = (weights > 0).sum(axis=1) == 1
+    assert (tight.rebalances[~single] == len(panel) - 2).all()
+    assert tight.rebalances[single].max() == 0
+
+
+@pytest.mark.parametrize('schedule', SCHEDULES)
+def test_empty_panel(schedule):
+    panel = AlignedPanel(np.array([], dtype=np.int64), ['A', 'B'], np.empty((0, 2)))
+    result = run_backtest(panel, [[0.5, 0.5], [1.0, 0.0]], schedule)
+    assert result.values.shape == (0, 2)
+    assert result.rebalances.tolist() == [0, 0]
+
+
+def test_single_row_panel():
+    panel = AlignedPanel(np.array([date(2020, 1, 2).toordinal()]), ['A'], np.array([[5.0]]))
+    for schedule in SCHEDULES:
+        result = run_backtest(panel, [[0.6]], schedule)
+        assert result.values.tolist() == [[100.0]]
+        assert result.rebalances.tolist() == [0]
+
+
+def test_rejects_bad_input():
+    panel = _panel(10)
+    with pytest.raises(ValueError):
+        run_backtest(panel, [[0.5, 0.5]])
+    with pytest.raises(ValueError):
+        run_backtest(panel, [[1.0, 0.0, 0.0]], 'weekly')
+    gappy = AlignedPanel(panel.ordinals, panel.names, panel.values.copy())
+    gappy.values[3, 1] = np.nan
+    with pytest.raises(ValueError):
+        run_backtest(gappy, [[1.0, 0.0, 0.0]])
+
+
+def test_weight_grid_covers_the_simplex():
+    grid = weight_grid(3, 0.25)
+    assert len(grid) == 15
+    np.testing.assert_allclose(grid.sum(axis=1), 1.0)
+    assert len({tuple(row) for row in grid.tolist()}) == 15
+
+
+def test_dashboard_strategies_match_app_tsx():
+    path = os.path.join(DATA_DIR, 'dashboard.json')
+    if not os.path.exists(path):
+        pytest.skip("dashboard.json not present")
+    assert dashboard_parity(path) < 1e-12
+
@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pytest
+
+from batch_xirr import cross_check, xirr_batch, xnpv_batch
+from xirr_solver import npv, solve_irr
+
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _sip_rows(rng: np.random.Generator, rows: int, months: int):
+    # Monthly SIPs with a terminal value between a 60% loss and a 4x gain
+    years = np.append(np.arange(months) / 12.0, months / 12.0)
+    amounts = np.full((rows, months + 1), -1000.0)
+    amounts[:, months] = 1000.0 * months * rng.uniform(0.4, 4.0, rows)
+    return amounts, years
+
+
+def _scalar(amounts: np.ndarray, years: np.ndarray) -> np.ndarray:
+    out = []
+    for i, row in enumerate(amounts):
+        t = years if years.ndim == 1 else years[i]
+        out.append(solve_irr(t.tolist(), row.tolist()).rate)
+    return np.array(out)
+
+
+def test_shared_years_match_scalar_solver():
+    amounts, years = _sip_rows(np.random.default_rng(0), 200, 60)
+    batch = xirr_batch(amounts, years)
+    np.testing.assert_allclose(batch, _scalar(amounts, years), rtol=0, atol=1e-10)
+    # Each rate is a root of its own row
+    assert np.abs(xnpv_batch(batch, amounts, years)).max() < 1e-6
+
+
+def test_per_row_years_match_scalar_solver():
+    rng = np.random.default_rng(1)
+    amounts, _ = _sip_rows(rng, 50, 24)
+    gaps = rng.integers(28, 32, size=(50, 24)) / 365.0
+    years = np.concatenate([np.zeros((50, 1)), np.cumsum(gaps, axis=1)], axis=1)
+    np.testing.assert_allclose(xirr_batch(amounts, years), _scalar(amounts, years), rtol=0, atol=1e-10)
+
+
+def test_rows_without_a_sign_change_are_nan():
+    years = np.array([0.0, 0.5, 1.0])
+    amounts = np.array([
+        [-1000.0, -1000.0, 2300.0],
+        [-1000.0, -1000.0, -1.0],
+        [1000.0, 1000.0, 2300.0],
+        [0.0, 0.0, 0.0],
+        [-1000.0, 0.0, 900.0],
+    ])
+    batch = xirr_batch(amounts, years)
+    reference = _scalar(amounts, years)
+    np.testing.assert_array_equal(np.isnan(batch), [False, True, True, True, False])
+    np.testing.assert_array_equal(np.isnan(batch), np.isnan(reference))
+    np.testing.assert_allclose(batch[[0, 4]], reference[[0, 4]], rtol=0, atol=1e-12)
+
+
+def test_zero_padding_does_not_change_the_rate():
+    years = np.array([0.0, 0.25, 0.5, 1.0, 1.5, 2.0])
+    short = np.array([[-500.0, -500.0, -500.0, 1700.0, 0.0, 0.0]])
+    compact = solve_irr([0.0, 0.25, 0.5, 1.0], [-500.0, -500.0, -500.0, 1700.0]).rate
+    assert xirr_batch(short, years)[0] == pytest.approx(compact, abs=1e-12)
+
+
+def test_rows_newton_cannot_settle_fall_back_to_scalar_solver():
+    amounts, years = _sip_rows(np.random.default_rng(2), 20, 36)
+    # One Newton step settles nothing, so every row goes through the scalar fallback
+    assert np.isnan(xirr_batch(amounts, years, max_iter=1, fallback=False)).all()
+    np.testing.assert_allclose(xirr_batch(amounts, years, max_iter=1), _scalar(amounts, years), rtol=0, atol=1e-10)
+
+
+def test_deep_losses_stay_inside_the_bracket():
+    # Near-total losses push Newton towards -100%; results must match the scalar solver
+    years = np.array([0.0, 1.0, 2.0])
+    amounts = np.array([[-1000.0, -1000.0, 1.0], [-1000.0, 0.0, 0.5], [-1000.0, -1000.0, 50.0]])
+    np.testing.assert_allclose(xirr_batch(amounts, years), _scalar(amounts, years), rtol=0, atol=1e-9)
+
+
+def test_xnpv_batch_matches_npv():
+    amounts, years = _sip_rows(np.random.default_rng(3), 5, 12)
+    rates = np.array([-0.5, -0.1, 0.0, 0.12, 1.5])
+    expected = [npv(r, years.tolist(), row.tolist()) for r, row in zip(rates, amounts)]
+    np.testing.assert_allclose(xnpv_batch(rates, amounts, years), expected, rtol=1e-12)
+    assert xnpv_batch(np.array([-1.0]), amounts[:1], years)[0] == np.inf
+
+
+@pytest.mark.parametrize('name', [
+    'NIFTY500_VALUE_50_combined.csv',
+    'NIFTY50_Historical.csv',
+])
+def test_rolling_windows_match_reference_bisection(name):
+    path = os.path.join(DATA_DIR, name)
+    if not os.path.exists(path):
+        pytest.skip(f"{name} not present")
+    assert cross_check(path) < 1e-8
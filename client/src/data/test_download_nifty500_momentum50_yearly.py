@@ -0,0 +1,140 @@
+import datetime as dt
+import os
+import time
+
+import pytest
+
+from download_nifty500_momentum50_yearly import (
+    _read_csv_tail,
+    append_to_combined,
+    closed_year_complete,
+    latest_date,
+    merge_rows,
+    read_csv,
+    write_csv,
+)
+
+
+HEADERS = ['Date', 'Close']
+
+
+def _rows(*days):
+    return [{'Date': d.strftime('%d %b %Y'), 'Close': f"{100 + d.day}.00"} for d in days]
+
+
+def _days(first: dt.date, count: int):
+    return [first + dt.timedelta(days=i) for i in range(count)]
+
+
+def _write(path, rows, terminator='\n', trailing=True):
+    text = terminator.join(['Date,Close'] + [f"{r['Date']},{r['Close']}" for r in rows])
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        f.write(text + (terminator if trailing else ''))
+
+
+def _dates(path):
+    return [r['Date'] for r in read_csv(str(path))[1]]
+
+
+def test_latest_date_ignores_unparseable_rows():
+    rows = _rows(dt.date(2024, 3, 4), dt.date(2024, 3, 8), dt.date(2024, 3, 6))
+    rows.append({'Date': 'n/a', 'Close': '1'})
+    assert latest_date(HEADERS, rows) == dt.date(2024, 3, 8)
+    assert latest_date(HEADERS, []) is None
+    assert latest_date(['Close'], [{'Close': '1'}]) is None
+
+
+def test_merge_rows_prefers_fresh_rows_and_unions_headers():
+    cached = (HEADERS, _rows(dt.date(2024, 3, 4), dt.date(2024, 3, 5)))
+    fresh_row = {'Date': '05 Mar 2024', 'Close': '999.00', 'Open': '990.00'}
+    headers, rows = merge_rows(cached, (['Date', 'Close', 'Open'], [fresh_row] + _rows(dt.date(2024, 3, 6))))
+    assert headers == ['Date', 'Close', 'Open']
+    assert [r['Date'] for r in rows] == ['04 Mar 2024', '05 Mar 2024', '06 Mar 2024']
+    assert rows[1] is fresh_row
+    # Without a date column nothing can be de-duplicated
+    assert len(merge_rows((['Close'], [{'Close': '1'}]), (['Close'], [{'Close': '1'}]))[1]) == 2
+
+
+@pytest.mark.parametrize('terminator', ['\n', '\r\n'])
+@pytest.mark.parametrize('trailing', [True, False])
+def test_read_csv_tail(tmp_path, terminator, trailing):
+    path = tmp_path / 'combined.csv'
+    _write(path, _rows(*_days(dt.date(2024, 1, 1), 300)), terminator, trailing)
+    header, first, last, term, ends_with_newline = _read_csv_tail(str(path))
+    assert header == HEADERS
+    assert first == ['01 Jan 2024', '101.00']
+    assert last == ['26 Oct 2024', '126.00']
+    assert (term, ends_with_newline) == (terminator, trailing)
+
+
+def test_read_csv_tail_without_data_rows(tmp_path):
+    path = tmp_path / 'combined.csv'
+    _write(path, [])
+    header, first, last, _, _ = _read_csv_tail(str(path))
+    assert header == HEADERS and first is None and last is None
+
+
+@pytest.mark.parametrize('sort_order', ['asc', 'desc'])
+@pytest.mark.parametrize('terminator', ['\n', '\r\n'])
+def test_append_matches_a_full_rewrite(tmp_path, sort_order, terminator):
+    old = _rows(*_days(dt.date(2024, 1, 1), 200))
+    everything = old + _rows(*_days(dt.date(2024, 7, 19), 5))
+    path = tmp_path / 'combined.csv'
+    _write(path, old if sort_order == 'asc' else old[::-1], terminator)
+
+    assert append_to_combined(str(path), HEADERS, everything, sort_order) == 5
+    expected = [r['Date'] for r in everything]
+    assert _dates(path) == (expected if sort_order == 'asc' else expected[::-1])
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert data.count(terminator.encode()) == len(everything) + 1
+    # Nothing newer: the file is left alone
+    before = os.path.getmtime(path)
+    assert append_to_combined(str(path), HEADERS, everything, sort_order) == 0
+    assert os.path.getmtime(path) == before
+    assert not [p for p in os.listdir(tmp_path) if p.endswith('.tmp')]
+
+
+def test_append_terminates_an_unterminated_last_line(tmp_path):
+    path = tmp_path / 'combined.csv'
+    _write(path, _rows(dt.date(2024, 1, 1), dt.date(2024, 1, 2)), trailing=False)
+    assert append_to_combined(str(path), HEADERS, _rows(dt.date(2024, 1, 3))) == 1
+    assert _dates(path) == ['01 Jan 2024', '02 Jan 2024', '03 Jan 2024']
+
+
+def test_append_refuses_files_it_cannot_extend(tmp_path):
+    path = tmp_path / 'combined.csv'
+    new = _rows(dt.date(2024, 2, 1))
+    assert append_to_combined(str(path), HEADERS, new) is None
+
+    # Stored in the other order
+    _write(path, _rows(dt.date(2024, 1, 2), dt.date(2024, 1, 1)))
+    assert append_to_combined(str(path), HEADERS, new, 'asc') is None
+    _write(path, _rows(dt.date(2024, 1, 1), dt.date(2024, 1, 2)))
+    assert append_to_combined(str(path), HEADERS, new, 'desc') is None
+
+    # A column the new rows do not have
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('Date,Close,Open\n01 Jan 2024,1,1\n02 Jan 2024,2,2\n')
+    assert append_to_combined(str(path), HEADERS, new) is None
+
+    # Header only
+    _write(path, [])
+    assert append_to_combined(str(path), HEADERS, new) is None
+
+
+def test_closed_year_complete(tmp_path):
+    path = tmp_path / 'historical_2022.csv'
+    # 30 Dec 2022 is the year's last weekday
+    complete = (HEADERS, _rows(dt.date(2022, 12, 29), dt.date(2022, 12, 30)))
+    partial = (HEADERS, _rows(dt.date(2022, 6, 1), dt.date(2022, 6, 2)))
+    write_csv(str(path), *partial)
+
+    assert closed_year_complete(2022, complete, str(path))
+    # Fetched mid-year: the file is dated inside the year
+    mid_2022 = time.mktime((2022, 6, 3, 12, 0, 0, 0, 0, -1))
+    os.utime(path, (mid_2022, mid_2022))
+    assert not closed_year_complete(2022, partial, str(path))
+    # Written after the year closed: whatever it holds is final
+    assert closed_year_complete(2021, partial, str(path))
+    assert not closed_year_complete(2022, partial, str(tmp_path / 'missing.csv'))
@@ -0,0 +1,113 @@
+import asyncio
+import os
+
+import pytest
+
+import download_niftyindices_async
+from date_parsing import parse_index_date
+from download_nifty500_momentum50_yearly import read_csv
+from download_niftyindices_async import AsyncBackpageDownloader, IndexSpec, download_indices
+from http_cache import ResponseCache
+
+
+SPECS = [IndexSpec("A", "INDEX A", "A"), IndexSpec("B", "INDEX B", "B")]
+# Closed years, so cached responses are permanent
+START_YEAR, END_YEAR = 2019, 2021
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    c = ResponseCache(str(tmp_path / 'http_cache'))
+    monkeypatch.setattr(download_niftyindices_async, 'default_cache', lambda: c)
+    return c
+
+
+def _download(backpage, out_dir, **kwargs):
+    kwargs.setdefault('backoff', 0.01)
+    return asyncio.run(download_indices(SPECS, START_YEAR, END_YEAR, str(out_dir), url=backpage.url, **kwargs))
+
+
+def test_combined_csvs_are_in_date_order(backpage, cache, tmp_path):
+    # Tasks complete in whatever order the stub answers them
+    backpage.delay = 0.02
+    paths = _download(backpage, tmp_path)
+    assert sorted(paths) == ['A', 'B']
+    for spec in SPECS:
+        headers, rows = read_csv(paths[spec.stem])
+        dates = [parse_index_date(r['HistoricalDate']) for r in rows]
+        assert dates == sorted(dates)
+        assert {d.year for d in dates} == {2019, 2020, 2021}
+        assert {r['INDEX_NAME'] for r in rows} == {spec.index_name}
+        for year in range(START_YEAR, END_YEAR + 1):
+            per_year = os.path.join(tmp_path, f"data_{spec.stem}", f"historical_{year}.csv")
+            assert len(read_csv(per_year)[1]) == sum(d.year == year for d in dates)
+            assert os.path.exists(per_year[:-4] + '.raw')
+
+
+@pytest.mark.parametrize('per_host', [1, 2])
+def test_concurrency_is_capped_per_host(backpage, cache, tmp_path, per_host):
+    backpage.delay = 0.05
+    _download(backpage, tmp_path, max_per_host=per_host)
+    assert len(backpage.posts()) == len(SPECS) * 3
+    assert backpage.max_inflight == per_host
+
+
+def test_warm_up_and_posts_use_the_configured_host(backpage, cache, tmp_path):
+    _download(backpage, tmp_path)
+    gets = [r for r in backpage.requests if r['method'] == 'GET']
+    assert [g['path'] for g in gets] == ['/reports/historical-data']
+    for post in backpage.posts():
+        assert post['headers']['Referer'] == f"{backpage.base_url}/reports/historical-data"
+        assert post['headers']['Origin'] == backpage.base_url
+        # Every pooled session carries the cookie from the warm-up
+        assert 'ASP.NET_SessionId=stub' in post['headers'].get('Cookie', '')
+
+
+def test_server_errors_are_retried_with_backoff(backpage, cache):
+    backpage.fail_next = [503, 502]
+    downloader = AsyncBackpageDownloader(backpage.url, max_per_host=1, retries=3, backoff=0.05)
+
+    async def run():
+        await downloader.open()
+        try:
+            return await downloader.fetch("{'name':'A','startDate':'06-Jan-2020','endDate':'10-Jan-2020','indexName':'INDEX A'}")
+        finally:
+            downloader.close()
+
+    body = asyncio.run(run())
+    assert download_niftyindices_async.yields_rows(body)
+    times = [p['time'] for p in backpage.posts()]
+    assert len(times) == 3
+    # Exponential: 0.05 s after the first failure, 0.1 s after the second
+    assert times[1] - times[0] >= 0.05
+    assert times[2] - times[1] >= 0.1
+
+
+def test_exhausted_retries_skip_the_combined_csv(backpage, cache, tmp_path):
+    backpage.fail_next = [503] * 3
+    paths = asyncio.run(download_indices(SPECS[:1], 2020, 2020, str(tmp_path), url=backpage.url, retries=3, backoff=0.01))
+    assert paths == {}
+    assert len(backpage.posts()) == 3
+    assert not os.path.exists(tmp_path / 'A_Historical.csv')
+
+
+def test_second_run_is_served_from_the_cache(backpage, cache, tmp_path):
+    first = _download(backpage, tmp_path / 'first')
+    posts = len(backpage.posts())
+    assert cache.stores == posts == len(SPECS) * 3
+
+    second = _download(backpage, tmp_path / 'second')
+    assert len(backpage.posts()) == posts
+    assert cache.hits == posts
+    for stem in first:
+        with open(first[stem], 'rb') as a, open(second[stem], 'rb') as b:
+            assert a.read() == b.read()
+
+
+def test_responses_without_rows_are_not_cached(backpage, cache, tmp_path):
+    backpage.mode = 'empty'
+    _download(backpage, tmp_path)
+    assert cache.stores == 0
+    backpage.mode = 'rows'
+    assert sorted(_download(backpage, tmp_path)) == ['A', 'B']
+    assert len(backpage.posts()) == 2 * len(SPECS) * 3
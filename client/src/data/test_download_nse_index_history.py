@@ -0,0 +1,208 @@
+import csv
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+import download_nse_index_history as nse
+from http_cache import ResponseCache
+
+
+class StubNse:
+    # Minimal stand-in for www.nseindia.com: "/" sets a cookie, /api/indices-history returns
+    # one row per weekday of the requested range as JSON (or CSV with csv=true)
+    def __init__(self) -> None:
+        self.requests: List[Dict] = []
+        self.fail_next: List[int] = []
+        self.json_blocked = False
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                url = urlsplit(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                with stub.lock:
+                    stub.requests.append({
+                        "path": url.path,
+                        "params": params,
+                        "headers": dict(self.headers),
+                        "time": time.monotonic(),
+                    })
+                    status = stub.fail_next.pop(0) if url.path != "/" and stub.fail_next else None
+                if url.path == "/":
+                    self._send(200, "text/html", "<html></html>", {"Set-Cookie": "nsit=stub; Path=/"})
+                elif status is not None:
+                    self._send(status, "text/plain", "busy")
+                elif params.get("csv") == "true":
+                    self._send(200, "text/csv", stub.csv_body(params))
+                elif stub.json_blocked:
+                    self._send(200, "text/html", "<html>Access Denied</html>")
+                else:
+                    self._send(200, "application/json", json.dumps({"data": stub.records(params)}))
+
+            def _send(self, status: int, content_type: str, body: str, extra: Dict[str, str] = {}) -> None:
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in extra.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.api_url = f"{self.base_url}/api/indices-history"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    @staticmethod
+    def weekdays(params: Dict[str, str]) -> List[datetime]:
+        d = datetime.strptime(params["from"], "%d-%m-%Y")
+        end = datetime.strptime(params["to"], "%d-%m-%Y")
+        out = []
+        while d <= end:
+            if d.weekday() < 5:
+                out.append(d)
+            d += timedelta(days=1)
+        return out
+
+    def records(self, params: Dict[str, str]) -> List[Dict]:
+        return [
+            {
+                "CH_TIMESTAMP": d.strftime("%d-%b-%Y"),
+                "CH_OPENING_VALUE": 100 + d.toordinal() % 50,
+                "CH_HIGH_INDEX_VAL": 110 + d.toordinal() % 50,
+                "CH_LOW_INDEX_VAL": 90 + d.toordinal() % 50,
+                "CH_CLOSING_VALUE": 105 + d.toordinal() % 50,
+            }
+            for d in self.weekdays(params)
+        ]
+
+    def csv_body(self, params: Dict[str, str]) -> str:
+        lines = ["Index history", "Date,Open,High,Low,Close"]
+        lines += [f"{d.strftime('%d-%b-%Y')},1,2,0.5,{d.day}" for d in self.weekdays(params)]
+        return "\n".join(lines)
+
+    def api_requests(self) -> List[Dict]:
+        return [r for r in self.requests if r["path"] == "/api/indices-history"]
+
+
+@pytest.fixture
+def stub():
+    server = StubNse()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    c = ResponseCache(str(tmp_path / "http_cache"))
+    monkeypatch.setattr(nse, "default_cache", lambda: c)
+    monkeypatch.setattr(nse, "RETRY_BACKOFF", 0.0)
+    return c
+
+
+def test_generate_chunks_cover_range_without_gaps():
+    start, end = datetime(2020, 1, 1), datetime(2021, 3, 15)
+    chunks = nse.generate_chunks(start, end, 100)
+    assert chunks[0][0] == start and chunks[-1][1] == end
+    for (_, prev_end), (next_start, _) in zip(chunks, chunks[1:]):
+        assert next_start == prev_end + timedelta(days=1)
+    assert all((e - s).days + 1 <= 100 for s, e in chunks)
+    assert nse.generate_chunks(end, start, 100) == []
+
+
+def test_concurrent_chunks_come_back_in_order(stub, cache):
+    chunks = nse.generate_chunks(datetime(2020, 1, 1), datetime(2020, 12, 31), 30)
+    pool = nse.SessionPool(4, stub.base_url)
+    try:
+        results = nse.fetch_chunks_concurrently(pool, "NIFTY 50", chunks, 4, nse.TokenBucket(0), stub.api_url)
+    finally:
+        pool.close()
+
+    assert len(results) == len(chunks)
+    for (chunk_start, chunk_end), rows in zip(chunks, results):
+        dates = [datetime.strptime(r["Date"], "%d %b %Y") for r in rows]
+        assert dates == StubNse.weekdays({"from": nse.format_date_for_api(chunk_start),
+                                          "to": nse.format_date_for_api(chunk_end)})
+    # One warm-up visit, then every API call carries its cookie and a Referer on the stub host
+    assert sum(r["path"] == "/" for r in stub.requests) == 1
+    for r in stub.api_requests():
+        assert "nsit=stub" in r["headers"].get("Cookie", "")
+        assert r["headers"]["Referer"].startswith(f"{stub.base_url}/indices/historicalData")
+
+
+def test_token_bucket_spaces_requests(stub, cache):
+    rate = 20.0
+    chunks = nse.generate_chunks(datetime(2020, 1, 1), datetime(2020, 1, 30), 3)
+    pool = nse.SessionPool(4, stub.base_url)
+    try:
+        nse.fetch_chunks_concurrently(pool, "NIFTY 50", chunks, 4, nse.TokenBucket(rate, capacity=1), stub.api_url)
+    finally:
+        pool.close()
+
+    times = sorted(r["time"] for r in stub.api_requests())
+    assert len(times) == len(chunks)
+    # With a burst of one, n requests need at least (n - 1) / rate seconds
+    assert times[-1] - times[0] >= (len(times) - 1) / rate * 0.9
+
+
+def test_transient_errors_are_retried(stub, cache):
+    stub.fail_next = [503, 429]
+    session = requests.Session()
+    rows = nse.fetch_chunk(session, "NIFTY 50", datetime(2020, 1, 6), datetime(2020, 1, 10), stub.api_url)
+    assert [r["Date"] for r in rows] == ["06 Jan 2020", "07 Jan 2020", "08 Jan 2020", "09 Jan 2020", "10 Jan 2020"]
+    assert len(stub.api_requests()) == 3
+
+
+def test_blocked_json_falls_back_to_csv(stub, cache):
+    stub.json_blocked = True
+    session = requests.Session()
+    rows = nse.fetch_chunk(session, "NIFTY 50", datetime(2020, 1, 6), datetime(2020, 1, 7), stub.api_url)
+    assert [(r["Date"], r["Close"]) for r in rows] == [("06 Jan 2020", "6"), ("07 Jan 2020", "7")]
+    assert [r["params"].get("csv") for r in stub.api_requests()] == [None, "true"]
+    # The block page is not cached; the CSV that yielded rows is
+    assert cache.stores == 1
+
+
+def test_responses_with_rows_are_served_from_disk(stub, cache):
+    session = requests.Session()
+    first = nse.fetch_chunk(session, "NIFTY 50", datetime(2020, 1, 6), datetime(2020, 1, 10), stub.api_url)
+    again = nse.fetch_chunk(session, "NIFTY 50", datetime(2020, 1, 6), datetime(2020, 1, 10), stub.api_url)
+    assert first == again
+    assert len(stub.api_requests()) == 1
+    assert (cache.stores, cache.hits) == (1, 1)
+
+    # A weekend yields no rows, so nothing is stored and the next run asks again
+    nse.fetch_chunk(session, "NIFTY 50", datetime(2020, 1, 11), datetime(2020, 1, 12), stub.api_url)
+    nse.fetch_chunk(session, "NIFTY 50", datetime(2020, 1, 11), datetime(2020, 1, 12), stub.api_url)
+    assert cache.stores == 1
+    assert len(stub.api_requests()) == 1 + 2 * 2
+
+
+def test_main_writes_sorted_deduplicated_csv(stub, cache, tmp_path, monkeypatch):
+    out = tmp_path / "history.csv"
+    monkeypatch.setattr("sys.argv", [
+        "download_nse_index_history.py", "--start", "2020-01-01", "--end", "2020-03-31",
+        "--max-days-per-request", "20", "--workers", "3", "--rate", "0",
+        "--base-url", stub.base_url, "--out", str(out),
+    ])
+    nse.main()
+
+    with open(out, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    dates = [datetime.strptime(r["Date"], "%d %b %Y") for r in rows]
+    assert dates == StubNse.weekdays({"from": "01-01-2020", "to": "31-03-2020"})
+    assert rows[0]["Close"] == str(105 + datetime(2020, 1, 1).toordinal() % 50)
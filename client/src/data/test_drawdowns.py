@@ -0,0 +1,131 @@
+import os
+from datetime import date
+
+import numpy as np
+import pytest
+
+from compute_sip_markdown import read_prices
+from drawdowns import _episodes_scalar, analyze_drawdowns, episodes, top_drawdowns_across
+from export_dashboard import DASHBOARD_FUNDS, calculate_metrics, resample_to_monthly
+from price_series import PriceSeries
+
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+START = date(2020, 1, 6).toordinal()
+
+CASES = {
+    'rising': [100.0, 101.0, 102.5, 103.0, 110.0],
+    'falling': [100.0, 95.0, 90.0, 80.0, 70.0],
+    'ends_underwater': [100.0, 120.0, 90.0, 125.0, 100.0, 80.0, 95.0],
+    'equal_troughs': [100.0, 80.0, 90.0, 80.0, 95.0, 80.0, 100.0, 101.0],
+    'flat_recovers_at_peak': [100.0, 100.0, 90.0, 95.0, 100.0, 100.0, 99.0, 100.0],
+    'flat': [100.0] * 6,
+    'single': [100.0],
+}
+
+
+def _daily(closes) -> PriceSeries:
+    return PriceSeries(list(range(START, START + len(closes))), list(closes))
+
+
+def _monthly(closes):
+    # One close per month, dated at month end, as calculate_metrics expects
+    months = []
+    for i, close in enumerate(closes):
+        year, month = 2015 + (i + 1) // 12, (i + 1) % 12 + 1
+        months.append((date.fromordinal(date(year, month, 1).toordinal() - 1), close))
+    return months
+
+
+def _assert_matches_scalar(series: PriceSeries) -> None:
+    analysis = analyze_drawdowns(series)
+    reference = _episodes_scalar(series.closes)
+    got = list(zip(analysis.peak_rows.tolist(), analysis.trough_rows.tolist(), analysis.recovery_rows.tolist()))
+    assert got == [r[:3] for r in reference]
+    np.testing.assert_allclose(analysis.depths, [r[3] for r in reference], rtol=0, atol=1e-15)
+
+
+@pytest.mark.parametrize('name', CASES)
+def test_matches_scalar_reference(name):
+    _assert_matches_scalar(_daily(CASES[name]))
+
+
+def test_episode_shapes():
+    assert len(analyze_drawdowns(_daily(CASES['rising']))) == 0
+    assert analyze_drawdowns(_daily(CASES['flat'])).max_drawdown == 0.0
+
+    falling = episodes(_daily(CASES['falling']))
+    assert len(falling) == 1 and not falling[0].recovered
+    assert falling[0].depth == pytest.approx(-0.3)
+    assert falling[0].duration_days == 4
+
+    # The second episode never recovers; the series ends underwater
+    open_ended = episodes(_daily(CASES['ends_underwater']))
+    assert [e.recovered for e in open_ended] == [True, False]
+    assert open_ended[1].peak_close == 125.0 and open_ended[1].trough_close == 80.0
+
+    # Three equal lows: the first one is the trough
+    (equal,) = episodes(_daily(CASES['equal_troughs']))
+    assert (equal.trough - equal.peak).days == 1
+    assert equal.recovery == date.fromordinal(START + 6)
+
+    # Getting back exactly to the peak counts as recovered, and so does the later dip
+    flat_peak = episodes(_daily(CASES['flat_recovers_at_peak']))
+    assert [(e.peak, e.recovery) for e in flat_peak] == [
+        (date.fromordinal(START + 1), date.fromordinal(START + 4)),
+        (date.fromordinal(START + 5), date.fromordinal(START + 7)),
+    ]
+
+
+def test_underwater_curve():
+    analysis = analyze_drawdowns(_daily(CASES['ends_underwater']))
+    expected = np.array([0.0, 0.0, -0.25, 0.0, -0.2, -0.36, -0.24])
+    assert analysis.underwater.dtype == np.float32
+    np.testing.assert_allclose(analysis.underwater, expected, atol=1e-7)
+
+
+def test_empty_series():
+    analysis = analyze_drawdowns(PriceSeries([], []))
+    assert len(analysis) == 0 and analysis.max_drawdown == 0.0
+    assert analysis.top(3).size == 0
+
+
+@pytest.mark.parametrize('name', [n for n in CASES if n != 'single'])
+def test_max_drawdown_matches_dashboard(name):
+    monthly = _monthly(CASES[name])
+    series = PriceSeries([d.toordinal() for d, _ in monthly], [v for _, v in monthly])
+    expected = calculate_metrics(monthly)['maxDrawdown']
+    assert abs(analyze_drawdowns(series).max_drawdown - expected) < 1e-15
+
+
+def test_random_walks_match_reference():
+    rng = np.random.default_rng(25)
+    for _ in range(20):
+        closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, 300)))
+        # Round so equal closes and exact recoveries actually occur
+        series = _daily(np.round(closes, 0).tolist())
+        _assert_matches_scalar(series)
+        monthly = resample_to_monthly(series)
+        monthly_series = PriceSeries([d.toordinal() for d, _ in monthly], [v for _, v in monthly])
+        expected = calculate_metrics(monthly)['maxDrawdown']
+        assert abs(analyze_drawdowns(monthly_series).max_drawdown - expected) < 1e-15
+
+
+def test_top_drawdowns_across_series():
+    series = {name: _daily(CASES[name]) for name in ('falling', 'ends_underwater', 'equal_troughs')}
+    top = top_drawdowns_across(series, 3)
+    assert [(label, round(e.depth, 4)) for label, e in top] == [
+        ('ends_underwater', -0.36), ('falling', -0.3), ('ends_underwater', -0.25),
+    ]
+
+
+@pytest.mark.parametrize('csv_name', [f[2] for f in DASHBOARD_FUNDS])
+def test_bundled_data(csv_name):
+    path = os.path.join(DATA_DIR, csv_name)
+    if not os.path.exists(path):
+        pytest.skip(f"{csv_name} not present")
+    series = read_prices(path)
+    _assert_matches_scalar(series)
+    monthly = resample_to_monthly(series)
+    monthly_series = PriceSeries([d.toordinal() for d, _ in monthly], [v for _, v in monthly])
+    assert abs(analyze_drawdowns(monthly_series).max_drawdown - calculate_metrics(monthly)['maxDrawdown']) < 1e-15
@@ -0,0 +1,173 @@
+import os
+import struct
+from datetime import date
+
+import pytest
+
+import month_index
+from compute_sip_markdown import read_prices
+from month_index import (
+    HEADER,
+    QUARTER,
+    YEAR,
+    build_month_index,
+    index_path_for,
+    load_month_index,
+    month_index_for,
+    write_month_index,
+)
+
+
+# Weekdays from 27 Dec 2023 to 3 Apr 2024, with February missing entirely
+DAYS = [date(2023, 12, d) for d in (27, 28, 29)] + \
+    [date(2024, 1, d) for d in (2, 3, 31)] + \
+    [date(2024, 3, d) for d in (1, 28, 29)] + \
+    [date(2024, 4, d) for d in (1, 3)]
+
+
+def _csv_text(days) -> str:
+    lines = ["INDEX_NAME,HistoricalDate,CLOSE"]
+    lines += [f"Test,{d.strftime('%d %b %Y')},{100 + i}.00" for i, d in enumerate(days)]
+    return "\n".join(lines) + "\n"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'TEST_Historical.csv'
+    path.write_text(_csv_text(DAYS), encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def hashes(monkeypatch):
+    # Count how often load_month_index falls back to hashing the CSV
+    calls = []
+    real = month_index.file_sha256
+
+    def counting(path):
+        calls.append(path)
+        return real(path)
+
+    monkeypatch.setattr(month_index, 'file_sha256', counting)
+    return calls
+
+
+def _columns(index):
+    return [list(c) for c in (
+        index.month_keys, index.month_first, index.month_last,
+        index.quarter_keys, index.quarter_first, index.quarter_last,
+        index.year_keys, index.year_first, index.year_last,
+    )]
+
+
+def _touch(path: str) -> None:
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+def _write_index(csv_path: str):
+    series = read_prices(csv_path, use_cache=False)
+    index = build_month_index(series)
+    write_month_index(csv_path, index)
+    return series, index
+
+
+def test_build_groups_months_quarters_and_years(csv_path):
+    index = build_month_index(read_prices(csv_path, use_cache=False))
+    assert index.rows == len(DAYS)
+    assert [index.month_start(m) for m in range(len(index))] == \
+        [date(2023, 12, 1), date(2024, 1, 1), date(2024, 3, 1), date(2024, 4, 1)]
+    assert index.month_end(2) == date(2024, 3, 31)
+    assert list(index.month_first) == [0, 3, 6, 9]
+    assert list(index.month_last) == [2, 5, 8, 10]
+    keys, first, last = index.periods(QUARTER)
+    assert (list(first), list(last)) == ([0, 3, 9], [2, 8, 10])
+    assert list(keys) == [(2023 * 12 + 11) // 3, 2024 * 4, 2024 * 4 + 1]
+    keys, first, last = index.periods(YEAR)
+    assert (list(keys), list(first), list(last)) == ([2023, 2024], [0, 3], [2, 10])
+    with pytest.raises(ValueError):
+        index.periods('week')
+
+
+def test_round_trip(csv_path):
+    series, index = _write_index(csv_path)
+    loaded = load_month_index(csv_path, len(series))
+    assert loaded.rows == index.rows
+    assert _columns(loaded) == _columns(index)
+
+
+def test_missing_index_misses(csv_path):
+    assert load_month_index(csv_path) is None
+
+
+def test_row_count_mismatch_misses(csv_path):
+    series, _ = _write_index(csv_path)
+    assert load_month_index(csv_path, len(series) + 1) is None
+    assert load_month_index(csv_path) is not None
+
+
+def test_touched_csv_is_hashed_once(csv_path, hashes):
+    series, _ = _write_index(csv_path)
+    _touch(csv_path)
+    hashes.clear()
+    assert load_month_index(csv_path, len(series)) is not None
+    assert len(hashes) == 1
+    with open(index_path_for(csv_path), 'rb') as f:
+        assert HEADER.unpack(f.read(HEADER.size))[7] == os.stat(csv_path).st_mtime_ns
+    assert load_month_index(csv_path, len(series)) is not None
+    assert len(hashes) == 1
+
+
+def test_stale_index_misses(csv_path):
+    series, _ = _write_index(csv_path)
+    # Same size, different content
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write(_csv_text(DAYS).replace('101.00', '109.00'))
+    _touch(csv_path)
+    assert load_month_index(csv_path, len(series)) is None
+    # Different size
+    with open(csv_path, 'a', encoding='utf-8') as f:
+        f.write("Test,04 Apr 2024,200.00\n")
+    assert load_month_index(csv_path) is None
+
+
+@pytest.mark.parametrize('keep', [0, 20, HEADER.size, -4])
+def test_truncated_index_misses(csv_path, keep):
+    _write_index(csv_path)
+    path = index_path_for(csv_path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:keep])
+    assert load_month_index(csv_path) is None
+
+
+def test_version_mismatch_misses(csv_path):
+    _write_index(csv_path)
+    with open(index_path_for(csv_path), 'r+b') as f:
+        f.seek(8)
+        f.write(struct.pack('<I', month_index.FORMAT_VERSION + 1))
+    assert load_month_index(csv_path) is None
+
+
+def test_month_index_for_rebuilds_a_stale_index(csv_path):
+    series = read_prices(csv_path, use_cache=False)
+    first = month_index_for(csv_path, series)
+    assert os.path.exists(index_path_for(csv_path))
+    assert _columns(month_index_for(csv_path, series)) == _columns(first)
+
+    # A new month arrives: the persisted index is stale and rebuilt
+    with open(csv_path, 'a', encoding='utf-8') as f:
+        f.write("Test,02 May 2024,200.00\n")
+    longer = read_prices(csv_path, use_cache=False)
+    rebuilt = month_index_for(csv_path, longer)
+    assert len(rebuilt) == len(first) + 1
+    assert _columns(rebuilt) == _columns(build_month_index(longer))
+    assert _columns(load_month_index(csv_path, len(longer))) == _columns(rebuilt)
+
+
+def test_month_index_for_without_cache_writes_nothing(csv_path):
+    series = read_prices(csv_path, use_cache=False)
+    index = month_index_for(csv_path, series, use_cache=False)
+    assert _columns(index) == _columns(build_month_index(series))
+    assert not os.path.exists(index_path_for(csv_path))
@@ -0,0 +1,150 @@
+import os
+import struct
+
+import pytest
+
+import price_cache
+from compute_sip_markdown import read_prices
+from price_cache import HEADER, cache_path_for, load_price_cache, write_price_cache
+
+
+CSV = (
+    "INDEX_NAME,HistoricalDate,CLOSE\n"
+    "Test,01 Apr 2024,100.50\n"
+    "Test,02 Apr 2024,101.25\n"
+    "Test,03 Apr 2024,99.75\n"
+)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'TEST_Historical.csv'
+    path.write_text(CSV, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def hashes(monkeypatch):
+    # Count how often load_price_cache falls back to hashing the CSV
+    calls = []
+    real = price_cache.file_sha256
+
+    def counting(path):
+        calls.append(path)
+        return real(path)
+
+    monkeypatch.setattr(price_cache, 'file_sha256', counting)
+    return calls
+
+
+def _touch(path: str, delta_ns: int = 10 ** 9) -> None:
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + delta_ns))
+
+
+def _patch_header(cache: str, offset: int, fmt: str, value) -> None:
+    with open(cache, 'r+b') as f:
+        f.seek(offset)
+        f.write(struct.pack(fmt, value))
+
+
+def _values(series):
+    return list(series.ordinals), list(series.closes)
+
+
+def test_round_trip(csv_path):
+    parsed = read_prices(csv_path, use_cache=False)
+    assert write_price_cache(csv_path, parsed) == cache_path_for(csv_path)
+    loaded = load_price_cache(csv_path)
+    assert _values(loaded) == _values(parsed)
+    assert loaded.closes[1] == 101.25
+
+
+def test_missing_cache_misses(csv_path):
+    assert load_price_cache(csv_path) is None
+    assert load_price_cache(csv_path + '.gone') is None
+
+
+def test_fresh_stamp_skips_the_hash(csv_path, hashes):
+    write_price_cache(csv_path, read_prices(csv_path, use_cache=False))
+    hashes.clear()
+    assert load_price_cache(csv_path) is not None
+    assert hashes == []
+
+
+def test_touched_csv_is_hashed_once(csv_path, hashes):
+    write_price_cache(csv_path, read_prices(csv_path, use_cache=False))
+    _touch(csv_path)
+    hashes.clear()
+    assert load_price_cache(csv_path) is not None
+    assert len(hashes) == 1
+    # The new mtime was stored, so the next load trusts the stamp again
+    with open(cache_path_for(csv_path), 'rb') as f:
+        assert HEADER.unpack(f.read(HEADER.size))[4] == os.stat(csv_path).st_mtime_ns
+    assert load_price_cache(csv_path) is not None
+    assert len(hashes) == 1
+
+
+def test_same_size_edit_is_stale(csv_path):
+    write_price_cache(csv_path, read_prices(csv_path, use_cache=False))
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write(CSV.replace('101.25', '101.35'))
+    _touch(csv_path)
+    assert load_price_cache(csv_path) is None
+
+
+def test_size_change_is_stale(csv_path):
+    write_price_cache(csv_path, read_prices(csv_path, use_cache=False))
+    with open(csv_path, 'a', encoding='utf-8') as f:
+        f.write("Test,04 Apr 2024,98.00\n")
+    assert load_price_cache(csv_path) is None
+
+
+@pytest.mark.parametrize('keep', [0, 10, HEADER.size, -1])
+def test_truncated_cache_misses(csv_path, keep):
+    write_price_cache(csv_path, read_prices(csv_path, use_cache=False))
+    cache = cache_path_for(csv_path)
+    with open(cache, 'rb') as f:
+        data = f.read()
+    with open(cache, 'wb') as f:
+        f.write(data[:keep])
+    assert load_price_cache(csv_path) is None
+
+
+def test_version_and_magic_mismatch_miss(csv_path):
+    write_price_cache(csv_path, read_prices(csv_path, use_cache=False))
+    cache = cache_path_for(csv_path)
+    _patch_header(cache, 8, '<I', price_cache.FORMAT_VERSION + 1)
+    assert load_price_cache(csv_path) is None
+    write_price_cache(csv_path, read_prices(csv_path, use_cache=False))
+    _patch_header(cache, 0, '<8s', b'NOTACACH')
+    assert load_price_cache(csv_path) is None
+
+
+def test_read_prices_rebuilds_a_stale_cache(csv_path):
+    first = read_prices(csv_path)
+    assert os.path.exists(cache_path_for(csv_path))
+    with open(csv_path, 'a', encoding='utf-8') as f:
+        f.write("Test,04 Apr 2024,98.00\n")
+    rebuilt = read_prices(csv_path)
+    assert len(rebuilt) == len(first) + 1
+    assert _values(rebuilt) == _values(read_prices(csv_path, use_cache=False))
+    # The rewritten cache is fresh again
+    assert _values(load_price_cache(csv_path)) == _values(rebuilt)
+
+
+def test_read_only_cache_still_loads(csv_path, hashes, monkeypatch):
+    write_price_cache(csv_path, read_prices(csv_path, use_cache=False))
+    _touch(csv_path)
+    hashes.clear()
+    real_open = open
+
+    def no_writes(path, mode='r', *args, **kwargs):
+        if 'r+' in mode:
+            raise PermissionError(path)
+        return real_open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr('builtins.open', no_writes)
+    assert load_price_cache(csv_path) is not None
+    assert load_price_cache(csv_path) is not None
+    assert len(hashes) == 2
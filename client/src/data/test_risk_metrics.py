@@ -0,0 +1,159 @@
+import json
+import math
+import os
+from datetime import date
+
+import numpy as np
+import pytest
+
+from compute_sip_markdown import read_prices
+from export_dashboard import (
+    DASHBOARD_FUNDS,
+    ROLLING_YEARS,
+    calculate_metrics,
+    calculate_rolling_returns,
+    resample_to_monthly,
+)
+from price_series import PriceSeries
+from risk_metrics import (
+    batch_metrics,
+    monthly_closes,
+    parity_check,
+    risk_metrics,
+    rolling_cagr_distribution,
+    series_metrics,
+)
+
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+METRICS = ('cagr', 'volatility', 'sharpeRatio', 'sortinoRatio', 'maxDrawdown', 'calmarRatio')
+ROLLING_STATS = ('average', 'min', 'max', 'median')
+
+
+def _same(a, b, rel=1e-12) -> bool:
+    # Equal up to rounding, with NaN == NaN and matching infinities (JS division semantics)
+    if a is None or b is None:
+        return a is None and b is None
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+    if math.isinf(a) or math.isinf(b):
+        return a == b
+    return abs(a - b) <= rel * max(1.0, abs(a))
+
+
+def _load(csv_name: str) -> PriceSeries:
+    path = os.path.join(DATA_DIR, csv_name)
+    if not os.path.exists(path):
+        pytest.skip(f"{csv_name} not present")
+    return read_prices(path)
+
+
+def _series(day_closes) -> PriceSeries:
+    return PriceSeries([d.toordinal() for d, _ in day_closes], [c for _, c in day_closes])
+
+
+@pytest.mark.parametrize('csv_name', [f[2] for f in DASHBOARD_FUNDS])
+def test_matches_scalar_port(csv_name):
+    series = _load(csv_name)
+    monthly = resample_to_monthly(series)
+    dates, values = monthly_closes(series)
+    assert dates.tolist() == [d.toordinal() for d, _ in monthly]
+    assert values.tolist() == [v for _, v in monthly]
+
+    vector = series_metrics(series)
+    reference = calculate_metrics(monthly)
+    for m in METRICS:
+        assert _same(vector[m], reference[m]), m
+    for years in ROLLING_YEARS.values():
+        dist = rolling_cagr_distribution(values, years)
+        ref = calculate_rolling_returns(monthly, years)
+        assert (dist is None) == (ref is None)
+        if ref is not None:
+            for stat in ROLLING_STATS:
+                assert _same(float(dist[stat]), ref[stat]), (years, stat)
+
+
+@pytest.mark.parametrize('key,csv_name', [(f[0], f[2]) for f in DASHBOARD_FUNDS])
+def test_matches_committed_dashboard(key, csv_name):
+    dashboard_path = os.path.join(DATA_DIR, 'dashboard.json')
+    if not os.path.exists(dashboard_path):
+        pytest.skip("dashboard.json not present")
+    with open(dashboard_path, encoding='utf-8') as f:
+        fund = json.load(f)['funds'][key]
+    series = _load(csv_name)
+    vector = series_metrics(series)
+    # dashboard.json writes non-finite values as null
+    for m in METRICS:
+        expected = fund['metrics'][m]
+        assert _same(vector[m] if math.isfinite(vector[m]) else None, expected), m
+    _, values = monthly_closes(series)
+    for label, years in ROLLING_YEARS.items():
+        dist = rolling_cagr_distribution(values, years)
+        ref = fund['rollingReturns'][label]
+        assert (dist is None) == (ref is None)
+        if ref is not None:
+            for stat in ROLLING_STATS:
+                assert _same(float(dist[stat]), ref[stat]), (label, stat)
+
+
+def test_panel_matches_per_series_path():
+    series = _load(DASHBOARD_FUNDS[0][2])
+    scaled = PriceSeries(series.ordinals, [c * 1.5 for c in series.closes])
+    shorter = PriceSeries(series.ordinals[300:], series.closes[300:])
+    inputs = {'a': series, 'b': scaled, 'c': shorter}
+    batch = batch_metrics(inputs, tuple(ROLLING_YEARS.values()))
+    for name, s in inputs.items():
+        single = series_metrics(s)
+        _, values = monthly_closes(s)
+        for m in METRICS:
+            assert _same(batch[name]['metrics'][m], single[m]), (name, m)
+        for years in ROLLING_YEARS.values():
+            dist = rolling_cagr_distribution(values, years)
+            for stat in ROLLING_STATS:
+                assert _same(batch[name]['rolling'][years][stat], float(dist[stat])), (name, years, stat)
+
+
+def test_edge_cases_follow_js_division():
+    # A flat series has zero volatility and no down months: Sharpe is -inf, Sortino and
+    # Calmar are NaN, exactly as in the scalar port
+    flat = _series([(date(2020, m, 28), 100.0) for m in range(1, 13)])
+    # Only rising months: downside deviation is NaN, drawdown is 0
+    rising = _series([(date(2020, m, 28), 100.0 + m) for m in range(1, 13)])
+    for s in (flat, rising):
+        vector = series_metrics(s)
+        reference = calculate_metrics(resample_to_monthly(s))
+        for m in METRICS:
+            assert _same(vector[m], reference[m]), m
+    assert series_metrics(_series([(date(2020, 1, 2), 100.0)])) == {}
+
+
+def test_monthly_closes_skips_non_finite_closes():
+    s = _series([
+        (date(2020, 1, 30), 100.0),
+        (date(2020, 1, 31), float('nan')),
+        (date(2020, 2, 3), 101.0),
+        (date(2020, 2, 28), 102.0),
+    ])
+    dates, values = monthly_closes(s)
+    assert dates.tolist() == [date(2020, 1, 31).toordinal(), date(2020, 2, 29).toordinal()]
+    assert values.tolist() == [100.0, 102.0]
+    assert [(d.toordinal(), v) for d, v in resample_to_monthly(s)] == list(zip(dates.tolist(), values.tolist()))
+
+
+def test_rolling_distribution_percentiles_and_short_series():
+    values = np.cumprod(np.full(60, 1.01)) * 100
+    dist = rolling_cagr_distribution(values, 3, percentiles=(10, 90))
+    cagrs = (values[36:] / values[:-36]) ** (1 / 3) - 1
+    assert dist['p10'] == pytest.approx(np.percentile(cagrs, 10))
+    assert dist['p90'] == pytest.approx(np.percentile(cagrs, 90))
+    assert rolling_cagr_distribution(values[:36], 3) is None
+    # risk_metrics broadcasts over leading axes
+    panel = risk_metrics(np.stack([values, values * 2]), np.array([5.0, 5.0]))
+    assert panel['cagr'].shape == (2,)
+    assert panel['cagr'][0] == pytest.approx(panel['cagr'][1])
+
+
+def test_parity_check_on_bundled_data():
+    for _, _, csv_name, _ in DASHBOARD_FUNDS:
+        _load(csv_name)
+    assert parity_check(DATA_DIR) <= 1e-12
@@ -0,0 +1,86 @@
+import math
+
+import numpy as np
+import pytest
+
+from rolling_stats import SlidingWindow, _brute_force, sliding_stats, summarize
+
+
+PERCENTILES = (10.0, 25.0, 75.0, 90.0)
+
+
+def _flatten(stats):
+    return (stats.mean, stats.minimum, stats.maximum, stats.median, *(stats.percentiles[q] for q in PERCENTILES))
+
+
+def _assert_matches_brute_force(values, window):
+    got = sliding_stats(values, window, PERCENTILES)
+    expected = _brute_force(values, window, PERCENTILES)
+    assert len(got) == len(expected) == len(values)
+    for i, (s, b) in enumerate(zip(got, expected)):
+        assert (s is None) == (b is None), i
+        if s is not None:
+            assert s.end == i
+            assert s.count == sum(v == v for v in values[i + 1 - window:i + 1])
+            assert _flatten(s) == pytest.approx(b, rel=1e-12, abs=1e-15), i
+
+
+@pytest.mark.parametrize('window', [1, 2, 3, 12, 36, 199, 200])
+def test_matches_brute_force(window):
+    rng = np.random.default_rng(window)
+    values = rng.normal(0.1, 0.2, 200).tolist()
+    _assert_matches_brute_force(values, window)
+
+
+@pytest.mark.parametrize('window', [1, 5, 36])
+def test_ties_and_repeated_values(window):
+    rng = np.random.default_rng(7)
+    values = rng.integers(-3, 4, 150).astype(float).tolist()
+    _assert_matches_brute_force(values, window)
+
+
+@pytest.mark.parametrize('window', [1, 4, 12])
+def test_nan_slots_are_skipped(window):
+    rng = np.random.default_rng(3)
+    values = rng.normal(0.0, 1.0, 120)
+    values[rng.random(120) < 0.3] = np.nan
+    # A run of NaN longer than every window empties it completely
+    values[40:60] = np.nan
+    values = values.tolist()
+    _assert_matches_brute_force(values, window)
+    assert sliding_stats(values, window)[59] is None
+
+
+def test_min_count_and_short_series():
+    values = [1.0, float('nan'), 2.0, float('nan'), float('nan'), 3.0]
+    stats = sliding_stats(values, 3, min_count=2)
+    assert [s is not None for s in stats] == [False, False, True, False, False, False]
+    assert stats[2].count == 2 and stats[2].median == 1.5
+    # Window longer than the series: never full
+    assert sliding_stats(values, 7) == [None] * 6
+    assert sliding_stats([], 3) == []
+    with pytest.raises(ValueError):
+        SlidingWindow(0, values)
+
+
+def test_empty_window_stats_are_nan():
+    sliding = SlidingWindow(2, [1.0])
+    for v in (1.0, float('nan'), float('nan')):
+        sliding.push(v)
+    stats = sliding.stats(PERCENTILES)
+    assert stats.count == 0
+    assert all(math.isnan(x) for x in _flatten(stats))
+    assert sliding.total == 0.0
+
+
+def test_summarize_matches_numpy():
+    rng = np.random.default_rng(11)
+    values = rng.normal(0.12, 0.1, 97).tolist()
+    whole = summarize(values, PERCENTILES)
+    assert whole.count == 97
+    assert whole.mean == pytest.approx(np.mean(values), rel=1e-12)
+    assert (whole.minimum, whole.maximum) == (min(values), max(values))
+    assert whole.median == np.median(values)
+    for q in PERCENTILES:
+        assert whole.percentiles[q] == pytest.approx(np.percentile(values, q), rel=1e-12)
+    assert summarize([]) is None
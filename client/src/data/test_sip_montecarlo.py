@@ -0,0 +1,107 @@
+import math
+import os
+from datetime import date
+
+import numpy as np
+import pytest
+
+from compute_sip_markdown import compute_monthly_sip, read_prices
+from price_series import PriceSeries
+from sip_montecarlo import (
+    BootstrapModel,
+    build_model,
+    cashflow_years,
+    historical_check,
+    path_outcomes,
+    render_percentiles,
+    sample_block_indices,
+    simulate,
+)
+
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+SEED = 1234
+
+
+def _records(months: int = 72):
+    # Weekday closes from Jan 2015 on a noisy upward trend
+    rng = np.random.default_rng(SEED)
+    start = date(2015, 1, 1).toordinal()
+    ordinals = [o for o in range(start, start + months * 31) if date.fromordinal(o).weekday() < 5]
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0005, 0.01, len(ordinals))))
+    records, _, _, _ = compute_monthly_sip(PriceSeries(ordinals, closes.tolist()), 1000.0)
+    return records
+
+
+@pytest.mark.parametrize('block', [1, 5, 12, 40])
+def test_block_indices_stay_in_range_and_run_consecutively(block):
+    available = 40
+    indices = sample_block_indices(np.random.default_rng(SEED), 500, 30, block, available)
+    assert indices.shape == (500, 30)
+    assert indices.min() >= 0 and indices.max() <= available - 1
+    for start in range(0, 30, block):
+        assert (np.diff(indices[:, start:start + block], axis=1) == 1).all()
+    # Every admissible block start is drawn
+    assert set(indices[:, 0].tolist()) == set(range(available - block + 1))
+
+
+def test_simulate_is_invariant_to_chunk_size():
+    model = build_model(_records())
+    whole = simulate(model, 36, 257, block=6, seed=SEED, chunk_size=257)
+    for chunk in (1, 10, 100, 1000):
+        chunked = simulate(model, 36, 257, block=6, seed=SEED, chunk_size=chunk)
+        np.testing.assert_array_equal(chunked.terminal, whole.terminal)
+        np.testing.assert_array_equal(chunked.xirr, whole.xirr)
+    other = simulate(model, 36, 257, block=6, seed=SEED + 1)
+    assert not np.array_equal(other.terminal, whole.terminal)
+
+
+def test_zero_volatility_paths_are_deterministic():
+    # NAV grows exactly 1% from one SIP date to the next and is valued on the SIP date itself
+    model = BootstrapModel(growth=np.full(60, 1.01), end_ratio=np.ones(60), end_gap_years=0.0)
+    months = 24
+    result = simulate(model, months, 50, block=7, monthly_investment=500.0, seed=SEED, chunk_size=16)
+    expected_value = sum(500.0 * 1.01 ** (months - 1 - i) for i in range(months))
+    np.testing.assert_allclose(result.terminal, expected_value, rtol=1e-12)
+    np.testing.assert_allclose(result.xirr, 1.01 ** 12 - 1, rtol=1e-9)
+    assert result.invested == 500.0 * months
+    report = render_percentiles(result, 'Flat', 7)
+    assert report.count(f"{(1.01 ** 12 - 1) * 100:.2f}%") == 7
+
+
+def test_cashflow_years():
+    model = BootstrapModel(growth=np.ones(3), end_ratio=np.ones(3), end_gap_years=0.05)
+    assert cashflow_years(model, 3).tolist() == [0.0, 1 / 12, 2 / 12, 2 / 12 + 0.05]
+
+
+def test_historical_windows_replay_exactly():
+    records = _records()
+    model = build_model(records)
+    for months in (1, 12, 36, model.months):
+        assert historical_check(records, model, months, 1000.0) < 1e-12
+    # A window longer than the history has nothing to replay
+    assert historical_check(records, model, model.months + 1, 1000.0) == 0.0
+    # A contiguous window is a single path through path_outcomes
+    start, months = 5, 24
+    value = path_outcomes(model, np.arange(start, start + months)[None, :], 1000.0)[0]
+    units = sum(1000.0 / r.sip_nav for r in records[start:start + months])
+    assert value == pytest.approx(units * records[start + months - 1].month_end_nav, rel=1e-12)
+
+
+def test_historical_check_on_bundled_data():
+    path = os.path.join(DATA_DIR, 'NIFTY50_Historical.csv')
+    if not os.path.exists(path):
+        pytest.skip("NIFTY50_Historical.csv not present")
+    records, _, _, _ = compute_monthly_sip(read_prices(path), 1000.0)
+    assert historical_check(records, build_model(records), 120, 1000.0) < 1e-12
+
+
+def test_rejects_unusable_inputs():
+    records = _records()
+    with pytest.raises(ValueError):
+        build_model(records[:1])
+    model = build_model(records)
+    for block in (0, model.months + 1):
+        with pytest.raises(ValueError):
+            simulate(model, 12, 10, block=block)
+    assert math.isfinite(simulate(model, 12, 10, block=model.months).xirr[0])
@@ -0,0 +1,63 @@
+import os
+from datetime import date
+
+import numpy as np
+import pytest
+
+from price_series import PriceSeries
+from sip_sweep import LAST_DAY, TradingMonths, reference_check, sweep_series
+
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _series(days) -> PriceSeries:
+    ordinals = [d.toordinal() for d in days]
+    return PriceSeries(ordinals, [100.0 + i for i in range(len(ordinals))])
+
+
+def _dates(index: TradingMonths, rows) -> list:
+    return [None if r < 0 else date.fromordinal(int(index.ordinals[r])) for r in rows]
+
+
+def test_days_past_the_last_trading_day_clamp_to_it():
+    # Feb 2023 ends on Tuesday the 28th; March trades through Friday the 31st
+    days = [date(2023, 2, d) for d in (1, 2, 27, 28)] + [date(2023, 3, d) for d in (1, 30, 31)]
+    index = TradingMonths.build(_series(days))
+    assert _dates(index, index.sip_rows(2)) == [date(2023, 2, 2), date(2023, 3, 30)]
+    assert _dates(index, index.sip_rows(29)) == [date(2023, 2, 28), date(2023, 3, 30)]
+    assert _dates(index, index.sip_rows(31)) == [date(2023, 2, 28), date(2023, 3, 31)]
+    assert _dates(index, index.sip_rows(LAST_DAY)) == [date(2023, 2, 28), date(2023, 3, 31)]
+
+
+def test_pending_sip_in_the_final_partial_month_is_skipped():
+    # Data stops on Wednesday 10 Jan 2024: the 15th is still to come, the 5th is not
+    days = [date(2023, 12, d) for d in (27, 28, 29)] + [date(2024, 1, d) for d in (2, 3, 4, 5, 8, 9, 10)]
+    index = TradingMonths.build(_series(days))
+    assert _dates(index, index.sip_rows(5)) == [date(2023, 12, 27), date(2024, 1, 5)]
+    assert _dates(index, index.sip_rows(15)) == [date(2023, 12, 27), None]
+    # Data that stops on the month's last weekday is a complete month
+    complete = TradingMonths.build(_series([date(2021, 1, d) for d in (27, 28, 29)]))
+    assert _dates(complete, complete.sip_rows(31)) == [date(2021, 1, 29)]
+
+
+def test_late_sip_days_invest_every_month():
+    # Weekdays from 3 Jan 2022 to Monday 6 Feb 2023: the final month's 31st is still ahead
+    start = date(2022, 1, 3).toordinal()
+    days = [date.fromordinal(o) for o in range(start, start + 400) if date.fromordinal(o).weekday() < 5]
+    series = _series(days)
+    rows = sweep_series(series, [1, 31], [0.0], [0])
+    months = len(TradingMonths.build(series))
+    assert [r.months for r in rows] == [months, months - 1]
+    by_day = {r.sip_day: r for r in rows}
+    assert by_day[31].invested == pytest.approx(1000.0 * (months - 1))
+    assert np.isfinite(by_day[31].xirr)
+
+
+def test_first_day_no_step_up_matches_compute_monthly_sip():
+    from compute_sip_markdown import read_prices
+
+    path = os.path.join(DATA_DIR, 'NIFTY50_Historical.csv')
+    if not os.path.exists(path):
+        pytest.skip("NIFTY50_Historical.csv not present")
+    assert reference_check(read_prices(path)) < 1e-6
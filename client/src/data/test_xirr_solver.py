@@ -0,0 +1,101 @@
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from xirr_solver import PrefixXirr, WindowXirr, solve_irr
+
+
+def _month_starts(count: int):
+    d = datetime(2001, 1, 1)
+    out = []
+    for _ in range(count):
+        out.append(d)
+        d = (d + timedelta(days=32)).replace(day=1)
+    return out
+
+
+def _check_against_scalar(navs) -> PrefixXirr:
+    # Monthly 1000 SIPs into `navs`, valued at the next month's NAV after every purchase
+    dates = _month_starts(len(navs) + 1)
+    prefix = PrefixXirr()
+    units = 0.0
+    for i, nav in enumerate(navs):
+        prefix.add(dates[i], -1000.0)
+        units += 1000.0 / nav
+        value = units * navs[min(i + 1, len(navs) - 1)]
+        got = prefix.solve(dates[i + 1], value).rate
+        years = [(d.toordinal() - dates[0].toordinal()) / 365.0 for d in dates[:i + 2]]
+        expected = solve_irr(years, [-1000.0] * (i + 1) + [value]).rate
+        if math.isnan(expected):
+            assert math.isnan(got)
+        else:
+            assert abs(got - expected) <= 1e-10 * (1.0 + abs(expected)), i
+    return prefix
+
+
+def test_prefix_solves_match_scalar_solver():
+    rng = np.random.default_rng(0)
+    navs = 100.0 * np.exp(np.cumsum(rng.normal(0.008, 0.05, 300)))
+    prefix = _check_against_scalar(navs.tolist())
+    # Month-to-month rate changes stay inside the expansion most of the time
+    assert prefix.recenters < len(navs) // 2
+
+
+def test_crash_and_recovery_recenters():
+    navs = [100.0 * 1.01 ** i for i in range(120)]
+    navs += [navs[-1] * 0.9 ** i for i in range(1, 25)]
+    navs += [navs[-1] * 1.04 ** i for i in range(1, 60)]
+    prefix = _check_against_scalar(navs)
+    assert prefix.recenters > 0
+
+
+def test_empty_and_unsolvable_prefixes_are_nan():
+    prefix = PrefixXirr()
+    assert math.isnan(prefix.solve(datetime(2020, 1, 1), 1000.0).rate)
+    prefix.add(datetime(2020, 1, 1), -1000.0)
+    assert math.isnan(prefix.solve(datetime(2020, 2, 1), 0.0).rate)
+    assert prefix.solve(datetime(2021, 1, 1), 1100.0).rate > 0
+
+
+def test_window_solves_match_scalar_solver():
+    # A 36-month window sliding over a series with a crash, each solved from its own first flow
+    rng = np.random.default_rng(1)
+    navs = 100.0 * np.exp(np.cumsum(rng.normal(0.008, 0.05, 240)))
+    navs[120:140] *= np.linspace(1.0, 0.5, 20)
+    navs = navs.tolist()
+    months = 36
+    window = WindowXirr()
+    units = []
+    for i, nav in enumerate(navs):
+        window.push(i / 12.0, -1000.0)
+        units.append(1000.0 / nav)
+        if len(window) > months:
+            window.pop()
+        if len(window) < months:
+            continue
+        t_end = (i + 1) / 12.0
+        value = sum(units[-months:]) * navs[i]
+        got = window.solve(t_end, value).rate
+        first = i - months + 1
+        years = [(j - first) / 12.0 for j in range(first, i + 1)] + [t_end - first / 12.0]
+        expected = solve_irr(years, [-1000.0] * months + [value]).rate
+        assert abs(got - expected) <= 1e-10 * (1.0 + abs(expected)), i
+    assert 0 < window.recenters < len(navs) - months
+
+
+def test_rolling_xirr_matches_per_window_solves():
+    from rolling_xirr import rolling_sip_xirr
+
+    dates = _month_starts(73)
+    navs = [100.0 * 1.01 ** i * (1.0 + 0.1 * math.sin(i / 5.0)) for i in range(72)]
+    units = [1000.0 / nav for nav in navs]
+    ends = [d - timedelta(days=1) for d in dates[1:]]
+    got = rolling_sip_xirr(dates[:72], units, ends, navs, 24)
+    assert all(math.isnan(r) for r in got[:23])
+    for i in range(23, 72):
+        first = i - 23
+        flows = [(dates[j], -1000.0) for j in range(first, i + 1)] + [(ends[i], sum(units[first:i + 1]) * navs[i])]
+        years = [(d.toordinal() - dates[first].toordinal()) / 365.0 for d, _ in flows]
+        expected = solve_irr(years, [a for _, a in flows]).rate
+        assert abs(got[i] - expected) <= 1e-10 * (1.0 + abs(expected)), i
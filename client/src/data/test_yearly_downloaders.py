@@ -0,0 +1,58 @@
+import datetime as dt
+
+import pytest
+import requests
+
+import download_nifty50_yearly
+import download_nifty500_momentum50_yearly
+import download_nifty_multicap_mq50_yearly
+from http_cache import ResponseCache
+
+
+# (module, its fetch function) for every synchronous yearly downloader
+FETCHERS = [
+    (download_nifty50_yearly, download_nifty50_yearly.fetch_year_payload),
+    (download_nifty500_momentum50_yearly, download_nifty500_momentum50_yearly.fetch_year_payload),
+    (download_nifty_multicap_mq50_yearly, download_nifty_multicap_mq50_yearly.fetch_year_html),
+]
+IDS = ['nifty50', 'momentum50', 'multicap_mq50']
+# A closed range, so a stored entry would be permanent
+START, END = dt.date(2020, 1, 6), dt.date(2020, 1, 10)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch, backpage):
+    c = ResponseCache(str(tmp_path / 'http_cache'))
+    for module, _ in FETCHERS:
+        monkeypatch.setattr(module, 'default_cache', lambda: c)
+        monkeypatch.setattr(module, 'URL', backpage.url)
+    monkeypatch.setattr(download_nifty500_momentum50_yearly, '_SESSION_WARMED_UP', True)
+    return c
+
+
+@pytest.mark.parametrize('module,fetch', FETCHERS, ids=IDS)
+def test_responses_with_rows_are_cached(backpage, cache, module, fetch):
+    session = requests.Session()
+    first = fetch(START, END, session)
+    again = fetch(START, END, session)
+    assert first == again
+    assert len(module.parse_table_or_json_to_rows(first)[1]) == 5
+    assert len(backpage.posts()) == 1
+    assert (cache.stores, cache.hits) == (1, 1)
+
+
+@pytest.mark.parametrize('mode', ['empty', 'blocked'])
+@pytest.mark.parametrize('module,fetch', FETCHERS, ids=IDS)
+def test_responses_without_rows_are_not_cached(backpage, cache, module, fetch, mode):
+    backpage.mode = mode
+    session = requests.Session()
+    fetch(START, END, session)
+    fetch(START, END, session)
+    assert cache.stores == 0
+    assert len(backpage.posts()) == 2
+
+    # Once the site serves rows again, the same range is fetched and stored
+    backpage.mode = 'rows'
+    body = fetch(START, END, session)
+    assert module.yields_rows(body)
+    assert cache.stores == 1
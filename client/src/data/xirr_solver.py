@@ -0,0 +1,403 @@
+import math
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+
+# Lower edge of the bracket searched by the reference bisection in compute_sip_markdown.xirr;
+# the second value is its last-resort retry.
+BRACKET_LOW = -0.9999
+BRACKET_LOW_RETRY = -0.999999
+
+
+@dataclass
+class XirrResult:
+    rate: float
+    iterations: int
+    evaluations: int
+    method: str
+
+
+def year_fractions(dates: Sequence[datetime]) -> List[float]:
+    # Actual/365 year fractions relative to the first date, computed once per cash-flow set
+    t0 = dates[0].toordinal()
+    return [(d.toordinal() - t0) / 365.0 for d in dates]
+
+
+def npv(rate: float, years: Sequence[float], amounts: Sequence[float]) -> float:
+    if rate <= -1.0:
+        return float('inf')
+    log_base = math.log1p(rate)
+    total = 0.0
+    for t, cf in zip(years, amounts):
+        total += cf * math.exp(-t * log_base)
+    return total
+
+
+def npv_and_derivative(rate: float, years: Sequence[float], amounts: Sequence[float]) -> Tuple[float, float]:
+    # NPV and d(NPV)/d(rate) in a single pass over the cash flows
+    log_base = math.log1p(rate)
+    total = 0.0
+    d_total = 0.0
+    for t, cf in zip(years, amounts):
+        disc = cf * math.exp(-t * log_base)
+        total += disc
+        d_total -= t * disc
+    return total, d_total / (1.0 + rate)
+
+
+def _newton(years: Sequence[float], amounts: Sequence[float], guess: float, tol: float, max_iter: int) -> Tuple[Optional[float], int]:
+    rate = guess
+    for it in range(1, max_iter + 1):
+        f, df = npv_and_derivative(rate, years, amounts)
+        if f == 0.0:
+            return rate, it
+        if df == 0.0 or not math.isfinite(f) or not math.isfinite(df):
+            return None, it
+        new_rate = rate - f / df
+        if new_rate <= -1.0:
+            # Damp steps that would leave the domain of (1 + rate) ** -t
+            new_rate = (rate - 1.0) / 2.0
+        if abs(new_rate - rate) <= tol * (1.0 + abs(rate)):
+            return new_rate, it
+        rate = new_rate
+    return None, max_iter
+
+
+def _bracket(years: Sequence[float], amounts: Sequence[float]) -> Tuple[Optional[Tuple[float, float, float, float]], int]:
+    # Same bracket expansion as the reference bisection
+    evaluations = 2
+    low, high = BRACKET_LOW, 1.0
+    f_low, f_high = npv(low, years, amounts), npv(high, years, amounts)
+    expand_steps = 0
+    while f_low * f_high > 0 and expand_steps < 60:
+        high = high * 2.0 + 0.5
+        f_high = npv(high, years, amounts)
+        evaluations += 1
+        expand_steps += 1
+    if f_low * f_high > 0:
+        low = BRACKET_LOW_RETRY
+        f_low = npv(low, years, amounts)
+        evaluations += 1
+    if f_low * f_high > 0:
+        return None, evaluations
+    return (low, high, f_low, f_high), evaluations
+
+
+def _brent(years: Sequence[float], amounts: Sequence[float], a: float, b: float, fa: float, fb: float, tol: float, max_iter: int) -> Tuple[float, int]:
+    if fa == 0.0:
+        return a, 0
+    if fb == 0.0:
+        return b, 0
+    c, fc = a, fa
+    d = e = b - a
+    for it in range(1, max_iter + 1):
+        if fb * fc > 0:
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        tol1 = 2.0 * 2.2e-16 * abs(b) + 0.5 * tol
+        xm = 0.5 * (c - b)
+        if abs(xm) <= tol1 or fb == 0.0:
+            return b, it
+        if abs(e) >= tol1 and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                # Secant step
+                p = 2.0 * xm * s
+                q = 1.0 - s
+            else:
+                # Inverse quadratic interpolation
+                q = fa / fc
+                r = fb / fc
+                p = s * (2.0 * xm * q * (q - r) - (b - a) * (r - 1.0))
+                q = (q - 1.0) * (r - 1.0) * (s - 1.0)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2.0 * p < min(3.0 * xm * q - abs(tol1 * q), abs(e * q)):
+                e = d
+                d = p / q
+            else:
+                d = xm
+                e = d
+        else:
+            d = xm
+            e = d
+        a, fa = b, fb
+        b += d if abs(d) > tol1 else math.copysign(tol1, xm)
+        fb = npv(b, years, amounts)
+    return b, max_iter
+
+
+def solve_irr(
+    years: Sequence[float],
+    amounts: Sequence[float],
+    guess: float = 0.1,
+    tol: float = 1e-12,
+    max_iter: int = 50,
+) -> XirrResult:
+    # Newton with an analytic derivative, falling back to Brent on the reference bracket
+    has_neg = any(cf < 0 for cf in amounts)
+    has_pos = any(cf > 0 for cf in amounts)
+    if not (has_neg and has_pos):
+        return XirrResult(float('nan'), 0, 0, 'none')
+
+    rate, newton_iters = _newton(years, amounts, guess, tol, max_iter)
+    if rate is not None and rate >= BRACKET_LOW:
+        return XirrResult(rate, newton_iters, newton_iters, 'newton')
+
+    bracket, evaluations = _bracket(years, amounts)
+    evaluations += newton_iters
+    if bracket is None:
+        return XirrResult(float('nan'), newton_iters, evaluations, 'none')
+    low, high, f_low, f_high = bracket
+    rate, brent_iters = _brent(years, amounts, low, high, f_low, f_high, tol, 200)
+    return XirrResult(rate, newton_iters + brent_iters, evaluations + brent_iters, 'brent')
+
+
+def solve_xirr(cashflows: Sequence[Tuple[datetime, float]], guess: float = 0.1, tol: float = 1e-12, max_iter: int = 50) -> XirrResult:
+    years = year_fractions([t for t, _ in cashflows])
+    amounts = [cf for _, cf in cashflows]
+    return solve_irr(years, amounts, guess, tol, max_iter)
+
+
+class PrefixXirr:
+    # XIRR of a growing cash-flow prefix plus a terminal value, solved once per period.
+    # Year fractions are measured from the first cash flow, so appended flows never change
+    # earlier terms. The prefix is kept as power sums M_k = sum(cf * t**k * (1 + c)**-t) around
+    # a centre rate c; with d = log1p(rate) - log1p(c),
+    #     NPV(rate) = sum_k M_k * (-d)**k / k!
+    # so every Newton iterate costs O(MOMENTS) instead of a pass over the prefix, and an append
+    # costs O(MOMENTS). While t_max * |d| <= RECENTER_SPAN the truncated series is exact to
+    # double precision; an iterate farther out re-centres on itself with one O(n) pass.
+    MOMENTS = 16
+    RECENTER_SPAN = 0.25
+
+    def __init__(self, guess: float = 0.1, tol: float = 1e-12, max_iter: int = 50):
+        self.years: List[float] = []
+        self.amounts: List[float] = []
+        self.tol = tol
+        self.max_iter = max_iter
+        self.recenters = 0
+        self._t0: Optional[int] = None
+        self._seed = guess
+        self._center = guess
+        self._moments = [0.0] * (self.MOMENTS + 1)
+
+    def add(self, when: datetime, amount: float) -> None:
+        if self._t0 is None:
+            self._t0 = when.toordinal()
+        t = (when.toordinal() - self._t0) / 365.0
+        self.years.append(t)
+        self.amounts.append(amount)
+        term = amount * math.exp(-t * math.log1p(self._center))
+        for k in range(len(self._moments)):
+            self._moments[k] += term
+            term *= t
+
+    def _recenter(self, rate: float) -> None:
+        self.recenters += 1
+        self._center = rate
+        self._moments = [0.0] * (self.MOMENTS + 1)
+        log_base = math.log1p(rate)
+        for t, cf in zip(self.years, self.amounts):
+            term = cf * math.exp(-t * log_base)
+            for k in range(len(self._moments)):
+                self._moments[k] += term
+                term *= t
+
+    def _prefix_aggregates(self, rate: float) -> Tuple[float, float]:
+        # Prefix NPV and sum(-t * cf * (1 + rate)**-t) (the derivative times 1 + rate)
+        shift = math.log1p(rate) - math.log1p(self._center)
+        if self.years and abs(shift) * self.years[-1] > self.RECENTER_SPAN:
+            self._recenter(rate)
+            shift = 0.0
+        total = 0.0
+        d_total = 0.0
+        coef = 1.0
+        for k in range(self.MOMENTS):
+            total += coef * self._moments[k]
+            d_total -= coef * self._moments[k + 1]
+            coef *= -shift / (k + 1)
+        return total, d_total
+
+    def solve(self, when: datetime, terminal_value: float) -> XirrResult:
+        if self._t0 is None:
+            return XirrResult(float('nan'), 0, 0, 'none')
+        t_end = (when.toordinal() - self._t0) / 365.0
+        rate = self._seed
+        evaluations = 0
+        if terminal_value > 0 and any(cf < 0 for cf in self.amounts):
+            for it in range(1, self.max_iter + 1):
+                prefix_npv, prefix_dnpv = self._prefix_aggregates(rate)
+                evaluations += 1
+                term = terminal_value * math.exp(-t_end * math.log1p(rate))
+                f = prefix_npv + term
+                df = (prefix_dnpv - t_end * term) / (1.0 + rate)
+                if df == 0.0 or not math.isfinite(f) or not math.isfinite(df):
+                    break
+                new_rate = rate - f / df
+                if new_rate <= -1.0:
+                    new_rate = (rate - 1.0) / 2.0
+                if abs(new_rate - rate) <= self.tol * (1.0 + abs(rate)):
+                    if new_rate < BRACKET_LOW:
+                        break
+                    self._seed = new_rate
+                    return XirrResult(new_rate, it, evaluations, 'newton')
+                rate = new_rate
+
+        result = solve_irr(self.years + [t_end], self.amounts + [terminal_value], self._seed, self.tol, self.max_iter)
+        result.evaluations += evaluations
+        if result.rate == result.rate:
+            self._seed = result.rate
+        if not all(math.isfinite(m) for m in self._moments):
+            # An iterate near -100% overflowed the moments; rebuild them at the next seed
+            self._recenter(self._seed)
+        return result
+
+
+class WindowXirr:
+    # XIRR of a sliding window of cash flows plus a terminal value, with each window measured
+    # from its own first flow (as if solved on its own). Flows enter on the right and expire on
+    # the left; both update power sums M_k = sum(cf * u**k * (1 + c)**-u), u = t - anchor, in
+    # O(MOMENTS), the same expansion PrefixXirr uses. A window starting s years after the anchor
+    # has NPV (1 + rate)**s * sum_k M_k * (-d)**k / k! plus its terminal term, so a Newton
+    # iterate costs O(MOMENTS) too. Re-centring (one O(window) pass, which also moves the anchor
+    # to the window's first flow) happens when u_max * |d| exceeds RECENTER_SPAN.
+    MOMENTS = 16
+    RECENTER_SPAN = 0.25
+
+    def __init__(self, tol: float = 1e-12, max_iter: int = 50):
+        self.flows: deque = deque()
+        self.tol = tol
+        self.max_iter = max_iter
+        self.recenters = 0
+        self._negatives = 0
+        self._anchor: Optional[float] = None
+        self._center = 0.1
+        self._moments = [0.0] * (self.MOMENTS + 1)
+
+    def __len__(self) -> int:
+        return len(self.flows)
+
+    def _accumulate(self, t: float, amount: float, sign: float) -> None:
+        u = t - self._anchor
+        term = sign * amount * math.exp(-u * math.log1p(self._center))
+        for k in range(len(self._moments)):
+            self._moments[k] += term
+            term *= u
+
+    def push(self, t: float, amount: float) -> None:
+        if self._anchor is None:
+            self._anchor = t
+        self.flows.append((t, amount))
+        self._negatives += amount < 0
+        self._accumulate(t, amount, 1.0)
+
+    def pop(self) -> Tuple[float, float]:
+        t, amount = self.flows.popleft()
+        self._negatives -= amount < 0
+        self._accumulate(t, amount, -1.0)
+        return t, amount
+
+    def _recenter(self, rate: float) -> None:
+        self.recenters += 1
+        self._center = rate
+        self._anchor = self.flows[0][0]
+        self._moments = [0.0] * (self.MOMENTS + 1)
+        for t, amount in self.flows:
+            self._accumulate(t, amount, 1.0)
+
+    def _window_sums(self, rate: float) -> Tuple[float, float]:
+        # sum(cf * (1 + rate)**-u) and sum(-u * cf * (1 + rate)**-u) over the window
+        shift = math.log1p(rate) - math.log1p(self._center)
+        if abs(shift) * (self.flows[-1][0] - self._anchor) > self.RECENTER_SPAN:
+            self._recenter(rate)
+            shift = 0.0
+        total = 0.0
+        d_total = 0.0
+        coef = 1.0
+        for k in range(self.MOMENTS):
+            total += coef * self._moments[k]
+            d_total -= coef * self._moments[k + 1]
+            coef *= -shift / (k + 1)
+        return total, d_total
+
+    def solve(self, t_end: float, terminal_value: float, guess: float = 0.1) -> XirrResult:
+        # Newton steps identical to solve_irr's on the rebased window; anything Newton cannot
+        # settle goes to solve_irr itself (Brent on the reference bracket)
+        if not self.flows:
+            return XirrResult(float('nan'), 0, 0, 'none')
+        t0 = self.flows[0][0]
+        if self._negatives and terminal_value > 0:
+            span = t_end - t0
+            rate = guess
+            for it in range(1, self.max_iter + 1):
+                total, d_total = self._window_sums(rate)
+                log_base = math.log1p(rate)
+                offset = t0 - self._anchor
+                scale = math.exp(offset * log_base)
+                term = terminal_value * math.exp(-span * log_base)
+                f = scale * total + term
+                df = (scale * (offset * total + d_total) - span * term) / (1.0 + rate)
+                if f == 0.0:
+                    new_rate = rate
+                    break
+                if df == 0.0 or not math.isfinite(f) or not math.isfinite(df):
+                    new_rate = None
+                    break
+                new_rate = rate - f / df
+                if new_rate <= -1.0:
+                    new_rate = (rate - 1.0) / 2.0
+                if abs(new_rate - rate) <= self.tol * (1.0 + abs(rate)):
+                    break
+                rate = new_rate
+            else:
+                new_rate = None
+            if new_rate is not None and new_rate >= BRACKET_LOW:
+                return XirrResult(new_rate, it, it, 'newton')
+            if not all(math.isfinite(m) for m in self._moments):
+                self._recenter(guess)
+
+        years = [t - t0 for t, _ in self.flows]
+        years.append(t_end - t0)
+        amounts = [amount for _, amount in self.flows]
+        amounts.append(terminal_value)
+        return solve_irr(years, amounts, guess, self.tol, self.max_iter)
+
+
+def convergence_report(csv_path: str) -> None:
+    # Compare solver cost on every month-end XIRR prefix of an index history
+    from compute_sip_markdown import compute_monthly_sip, read_prices, xirr_result
+
+    records, _, _, _ = compute_monthly_sip(read_prices(csv_path), 1000.0)
+    prefix: List[Tuple[datetime, float]] = []
+    totals = {'bisect': [0, 0], 'newton': [0, 0]}
+    max_diff = 0.0
+    for r in records:
+        prefix.append((r.sip_date, -1000.0))
+        cashflows = prefix + [(r.month_end, r.portfolio_value)]
+        results = {m: xirr_result(cashflows, method=m) for m in totals}
+        for m, res in results.items():
+            totals[m][0] += res.iterations
+            totals[m][1] += res.evaluations
+        a, b = results['bisect'].rate, results['newton'].rate
+        if a == a and b == b:
+            max_diff = max(max_diff, abs(a - b))
+    print(f"Cash-flow sets: {len(records)}")
+    for m, (iterations, evaluations) in totals.items():
+        print(f"{m:>7}: {iterations} iterations, {evaluations} NPV evaluations")
+    print(f"Max abs rate difference: {max_diff:.3e}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Report XIRR solver convergence cost on an index history.')
+    parser.add_argument('--csv', dest='csv_path', default='./NIFTY500_VALUE_50_combined.csv', help='Path to CSV input file')
+    args = parser.parse_args()
+    convergence_report(args.csv_path)